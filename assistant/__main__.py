@@ -1,15 +1,20 @@
-import argparse
-import logging
 import time
 
-import inquirer
+_STARTED_AT = time.perf_counter()
+
+import argparse
+import atexit
+import logging
+import sys
 
 from . import ascii_art
-from .api_validation import check_api_key
-from .api_wrapper import AssistantAPIWrapper
+from .cli import add_subcommands, run_command
 from .config_manager import read_config, reset_config, save_config
-from .dashboard import dashboard
-from .ui_utils import clear_screen, console, welcome_user
+from .router import add_transition_hook, goto, log_transition, run
+from .ui_utils import clear_screen, console
+
+# Heavy modules (openai, inquirer, halo, PIL) are imported inside the
+# functions that need them so the banner shows before they load.
 
 
 def prompt_user_details():
@@ -17,6 +22,10 @@ def prompt_user_details():
     Prompts the user for API key and name, validates the API key,
     and returns the entered details.
     """
+    import inquirer
+
+    from .api_validation import check_api_key
+
     response = inquirer.prompt(
         [
             inquirer.Text(
@@ -36,6 +45,10 @@ def handle_existing_config(config):
     change, or check the API key.
     Returns the API key and user's name.
     """
+    import inquirer
+
+    from .api_validation import check_api_key
+
     api_key = config["api_key"]
     name = config["name"]
 
@@ -58,38 +71,89 @@ def main():
     """
     Entry point of the program.
     Manages configuration, user details, and launches the dashboard.
+    The saved API key is re-checked in the background once its last check
+    is older than the validation TTL, so launching makes no API calls.
     """
-    config = read_config()
-
-    if config is None:
-        api_key, name = prompt_user_details()
-        if api_key and name:
-            clear_screen()
-            save_config(api_key, name)
-    else:
+    while True:
+        config = read_config()
+
+        if config is None:
+            api_key, name = prompt_user_details()
+            if api_key and name:
+                clear_screen()
+                # The key was checked as it was entered.
+                save_config(api_key, name, validated_at=time.time())
+            config = read_config() or {}
+            break
+
         api_key, name = handle_existing_config(config)
-        if api_key is None:
-            return main()
+        if api_key is not None:
+            config = read_config() or config
+            break
 
-    clear_screen()
-    welcome_user(name)
-    time.sleep(1)
+    from .api_validation import validate_in_background
+    from .api_wrapper import AssistantAPIWrapper
+    from .dashboard import dashboard
 
     api = AssistantAPIWrapper(api_key, name)
-    dashboard(api)
+    validate_in_background(api, config)
+    run(goto(dashboard, api))
 
 
 if __name__ == "__main__":
-    console.print(ascii_art.ascii_welcome)
-    time.sleep(1)
-    clear_screen()
-
     # Argument parsing
     parser = argparse.ArgumentParser(description="Run the assistant program.")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print an import-time breakdown and exit",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Time API calls, renders and screens and write a Chrome trace to FILE",
+    )
+    parser.add_argument(
+        "--trace-summary",
+        action="store_true",
+        help="Print per-endpoint, render and screen timings on exit",
+    )
+    add_subcommands(parser)
     args = parser.parse_args()
 
     if args.debug:
         logging.basicConfig(level=logging.INFO)
+        add_transition_hook(log_transition)
+
+    if args.trace or args.trace_summary:
+        from .tracing import get_tracer, trace_transition
+
+        tracer = get_tracer()
+        tracer.enabled = True
+        add_transition_hook(trace_transition)
+
+        @atexit.register
+        def report_trace():
+            if args.trace:
+                tracer.export_chrome_trace(args.trace)
+            if args.trace_summary:
+                tracer.print_summary()
+
+    if args.profile_startup:
+        from .startup import profile_startup
+
+        sys.exit(profile_startup(_STARTED_AT))
+
+    # Subcommands run headless: no banner, no prompts, no pauses.
+    if args.command:
+        sys.exit(run_command(args))
+
+    # Keep the welcome banner up while the heavy modules load instead of
+    # sleeping for a fixed time.
+    console.print(ascii_art.ascii_welcome)
+    import inquirer  # noqa: F401
+    from . import dashboard  # noqa: F401
+    clear_screen()
 
     main()
@@ -0,0 +1,146 @@
+from .run_metrics import RunMetrics, get_metrics_store
+from .search_index import get_search_index
+from .stream_renderer import StreamRenderer, create_renderer
+from .ui_utils import console
+
+# Page size used by the paginated list accessors unless told otherwise.
+DEFAULT_PAGE_SIZE = 20
+
+
+def has_more(page, page_size):
+    """
+    Whether a list page has a next page. SDK versions without `has_more`
+    fall back to checking for a full page.
+    """
+    more = getattr(page, "has_more", None)
+    if more is not None:
+        return more
+    return len(page.data) >= page_size
+
+
+def page_params(params, page_size, cursor=None):
+    """
+    Returns the parameters of one `list` call of a paginated endpoint.
+    """
+    kwargs = dict(params, limit=page_size)
+    if cursor:
+        kwargs["after"] = cursor
+    return kwargs
+
+
+def missing_file_ids(file_cache, file_ids):
+    """
+    Returns the file IDs that are not in the cache, without duplicates.
+    """
+    return list(dict.fromkeys(file_cache.missing(file_ids)))
+
+
+def filenames(files, file_ids):
+    """
+    Returns the filenames of resolved files, labelling the IDs that could
+    not be resolved.
+
+    Args:
+        files (list): File objects, or None for unresolved ones, as returned
+            by `resolve_files`.
+        file_ids (list): The IDs the files were resolved from.
+    """
+    return [
+        file.filename if file is not None else f"{file_id} (unavailable)"
+        for file, file_id in zip(files, file_ids)
+    ]
+
+
+class ConsoleOutput:
+    """
+    Renders the events of a streamed run to the console. The sync and async
+    event handlers forward their callbacks here.
+    """
+
+    def __init__(self, renderer=None):
+        """
+        Args:
+            renderer (optional): Renderer of the reply text. Defaults to one
+                writing to the console.
+        """
+        self.renderer = renderer or create_renderer()
+        self.code_renderer = StreamRenderer(style=None)
+
+    def text_created(self):
+        self.renderer.flush()
+        console.print(
+            f"\n[bold blue]Assistant:[/bold blue]\n",
+            end="",
+        )
+
+    def text_delta(self, delta):
+        self.renderer.write(delta.value)
+
+    def text_done(self):
+        self.renderer.end_message()
+
+    def end(self):
+        self.renderer.close()
+        self.code_renderer.close()
+
+    def tool_call_created(self, tool_call):
+        self.renderer.end_message()
+        console.print(
+            f"\n[bold blue]Assistant:[/bold blue] {tool_call.type}\n",
+        )
+
+    def tool_call_delta(self, delta):
+        if delta.type == "code_interpreter":
+            if delta.code_interpreter.input:
+                self.code_renderer.write(delta.code_interpreter.input)
+            if delta.code_interpreter.outputs:
+                self.code_renderer.flush()
+                console.print(
+                    f"\n\noutput >",
+                )
+                for output in delta.code_interpreter.outputs:
+                    if output.type == "logs":
+                        console.print(
+                            f"\n{output.logs}",
+                        )
+
+
+class StreamRecorder:
+    """
+    The side effects of streaming a run, the same for both wrappers: the
+    run's metrics are recorded however the stream ends, and the messages
+    of a completed stream are added to the search index.
+    """
+
+    def __init__(self, thread_id, assistant_id, metrics_store=None, search_index=None):
+        """
+        Args:
+            thread_id (str): The ID of the thread.
+            assistant_id (str): The ID of the assistant.
+            metrics_store (MetricsStore, optional): Defaults to the
+                process-wide one.
+            search_index (SearchIndex, optional): Defaults to the
+                process-wide one.
+        """
+        self.assistant_id = assistant_id
+        self.metrics = RunMetrics(thread_id, assistant_id)
+        self.metrics_store = metrics_store or get_metrics_store()
+        self.search_index = search_index or get_search_index()
+
+    def observe(self, event):
+        """
+        Notes a stream event.
+        """
+        self.metrics.observe(event)
+
+    def finish(self, run, messages=()):
+        """
+        Records the end of the stream.
+
+        Args:
+            run: The last run seen on the stream, or None if it never started.
+            messages: The final messages of the stream; empty if it failed.
+        """
+        self.metrics_store.record(self.metrics.finish(run))
+        if messages:
+            self.search_index.add_messages(messages, self.assistant_id)
@@ -1,19 +1,50 @@
-import time
+import threading
+
 import openai
 from halo import Halo
-from openai import OpenAI
+
+from .client_factory import create_client
+from .config_manager import (
+    is_api_key_validated,
+    mark_api_key_validated,
+    reset_config,
+)
 from .ui_utils import logger
 
 
-def check_api_key(api_key):
+def validate_api_key(client):
+    """
+    Checks the API key of a client by listing the models.
+
+    Args:
+        client (OpenAI): The client whose key is checked.
+
+    Returns:
+        bool: True if the API key is valid, False if it was rejected.
+        Other errors, e.g. from the network, are raised.
+    """
+    try:
+        client.models.list()
+    except openai.AuthenticationError as e:
+        # Logged for debugging only; this may run behind another screen.
+        logger.info(e)
+        return False
+    return True
+
+
+def check_api_key(api_key, client=None):
     """
     Validates the provided OpenAI API key.
 
     This function attempts to list the models using the given API key to check its validity.
     It uses a spinner to indicate progress and logs any authentication errors encountered.
+    A valid saved key is recorded as validated, so later launches skip the check.
 
     Args:
         api_key (str): The API key to be validated.
+        client (OpenAI, optional): A client for the key to check it with,
+            e.g. the API wrapper's. Defaults to a client on the shared
+            connection pool, which the wrapper then reuses.
 
     Returns:
         bool: True if the API key is valid, False otherwise.
@@ -21,16 +52,51 @@ def check_api_key(api_key):
     spinner = Halo(text="Checking API key", spinner="dots")
     spinner.start()
 
-    client = OpenAI(api_key=api_key)
+    if client is None:
+        client = create_client(api_key)
 
-    try:
-        # Attempt to list models to verify the API key.
-        client.models.list()
-    except openai.AuthenticationError as e:
+    if not validate_api_key(client):
         spinner.fail("Invalid API key!")
-        logger.error(e)  # Log the error for debugging purposes.
         return False
-    else:
-        spinner.succeed("API key is valid 🎉")
-        time.sleep(1)  # Short pause for user readability.
-        return True
+
+    spinner.succeed("API key is valid 🎉")
+    mark_api_key_validated(api_key)
+    return True
+
+
+def validate_in_background(api, config):
+    """
+    Checks the saved API key with the wrapper's client in a daemon thread,
+    unless it was found valid within the validation TTL.
+
+    The outcome is left in `api.api_key_valid`: None while unknown, True or
+    False once the check is done. A rejected key is removed from the
+    configuration so the next launch asks for a new one; a check that fails
+    for another reason is retried on the next launch.
+
+    Args:
+        api: API object to interact with the backend.
+        config (dict): The saved configuration.
+
+    Returns:
+        threading.Thread: The running check, or None if no check is needed.
+    """
+    if is_api_key_validated(config):
+        api.api_key_valid = True
+        return None
+
+    def check():
+        try:
+            valid = validate_api_key(api.client)
+        except Exception as e:
+            logger.info(f"Could not check the API key: {e}")
+            return
+        api.api_key_valid = valid
+        if valid:
+            mark_api_key_validated(api.client.api_key)
+        else:
+            reset_config()
+
+    thread = threading.Thread(target=check, name="api-key-check", daemon=True)
+    thread.start()
+    return thread
@@ -1,49 +1,120 @@
-import time
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
-from halo import Halo
-from openai import AssistantEventHandler, OpenAI
+from openai import AssistantEventHandler, NotFoundError
 from typing_extensions import override
 
-from .ui_utils import clear_screen, console
+from .api_common import (
+    DEFAULT_PAGE_SIZE,
+    ConsoleOutput,
+    StreamRecorder,
+    has_more,
+    filenames,
+    missing_file_ids,
+    page_params,
+)
+from .assistant_catalogue import get_assistant_catalogue
+from .client_factory import create_client
+from .file_metadata import FileMetadataCache
+from .message_store import MessageStore, is_settled, settled_prefix
+from .run_metrics import get_metrics_store
+from .run_poller import RunPoller
+from .search_index import get_search_index
+
+# Upper bound on concurrent `files.retrieve` calls when resolving file IDs.
+FILE_RESOLVE_WORKERS = 8
+# Page size used when pulling new messages into a thread's message store.
+MESSAGE_SYNC_PAGE_SIZE = 100
+# Number of messages shown per page of a thread's history.
+HISTORY_PAGE_SIZE = int(os.environ.get("ASSISTANT_GPT_HISTORY_MESSAGES", 20))
+
+
+def paginate(
+    list_page, page_size=DEFAULT_PAGE_SIZE, prefetch=False, after=None, **params
+):
+    """
+    Lazily yields the items of a cursor-paginated list endpoint.
+
+    Args:
+        list_page (Callable): An SDK `list` method, e.g. `client.beta.assistants.list`.
+        page_size (int): Number of items requested per page.
+        prefetch (bool): Whether to fetch the next page in the background
+            while the current one is being consumed.
+        after (str, optional): Cursor to start after.
+        **params: Extra parameters passed to every `list_page` call.
+
+    Yields:
+        The items of every page, in the order returned by the API.
+    """
+
+    def fetch(cursor):
+        return list_page(**page_params(params, page_size, cursor))
+
+    def is_last(page):
+        return not has_more(page, page_size)
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        page = fetch(after)
+        while True:
+            last = not page.data or is_last(page)
+            next_page = None
+            if not last and executor:
+                next_page = executor.submit(fetch, page.data[-1].id)
+
+            yield from page.data
+
+            if last:
+                return
+            page = next_page.result() if next_page else fetch(page.data[-1].id)
+    finally:
+        if executor:
+            executor.shutdown(wait=False)
 
 
 class EventHandler(AssistantEventHandler):
+    def __init__(self, renderer=None):
+        super().__init__()
+        self.output = ConsoleOutput(renderer)
+
     @override
     def on_text_created(self, text) -> None:
-        clear_screen()
-        console.print(
-            f"\n[bold blue]Assistant:[/bold blue]\n",
-            end="",
-        )
+        self.output.text_created()
 
     @override
     def on_text_delta(self, delta, snapshot):
-        console.print(
-            f"[italic blue]{delta.value}[/italic blue]",
-            end="",
-        )
+        self.output.text_delta(delta)
+
+    @override
+    def on_text_done(self, text):
+        self.output.text_done()
+
+    @override
+    def on_end(self):
+        self.output.end()
 
     def on_tool_call_created(self, tool_call):
-        console.print(
-            f"\n[bold blue]Assistant:[/bold blue] {tool_call.type}\n",
-        )
+        self.output.tool_call_created(tool_call)
 
     def on_tool_call_delta(self, delta, snapshot):
-        if delta.type == "code_interpreter":
-            if delta.code_interpreter.input:
-                console.print(
-                    delta.code_interpreter.input,
-                    end="",
-                )
-            if delta.code_interpreter.outputs:
-                console.print(
-                    f"\n\noutput >",
-                )
-                for output in delta.code_interpreter.outputs:
-                    if output.type == "logs":
-                        console.print(
-                            f"\n{output.logs}",
-                        )
+        self.output.tool_call_delta(delta)
+
+
+class StdoutEventHandler(AssistantEventHandler):
+    """
+    Writes streamed text deltas straight to stdout, without any styling.
+    """
+
+    @override
+    def on_text_delta(self, delta, snapshot):
+        sys.stdout.write(delta.value)
+        sys.stdout.flush()
+
+    @override
+    def on_text_done(self, text):
+        sys.stdout.write("\n")
+        sys.stdout.flush()
 
 
 class AssistantAPIWrapper:
@@ -51,15 +122,55 @@ class AssistantAPIWrapper:
     A wrapper class for the OpenAI API, managing the assistant, threads, and messages.
     """
 
-    def __init__(self, api_key, username, assistant_id=None):
+    def __init__(self, api_key, username, assistant_id=None, base_url=None):
         """
         Initializes the API client and sets up basic parameters.
+        The client uses the process-wide connection pool of `client_factory`,
+        whose requests go through the request scheduler and the tracer.
+
+        Args:
+            base_url (str, optional): The API to talk to, e.g. a local mock
+                server. Defaults to `OPENAI_BASE_URL` or the OpenAI API.
         """
-        self.client = OpenAI(api_key=api_key)
+        self.client = create_client(api_key, base_url=base_url)
         self.thread = None
         self.assistant = None
         self.run = None
         self.username = username
+        # Whether the API key is valid; None until it has been checked.
+        self.api_key_valid = None
+        self.file_cache = FileMetadataCache()
+        self.catalogue = get_assistant_catalogue(api_key)
+        self.search_index = get_search_index()
+        self.metrics = get_metrics_store()
+        self.message_stores = {}
+        self.run_poller = RunPoller(self.client)
+        self._aio = None
+
+    @property
+    def aio(self):
+        """
+        The async twin of this wrapper, created on first use. It shares the
+        API key, base URL and the file metadata cache with this instance.
+        """
+        from .async_api_wrapper import AsyncAssistantAPIWrapper
+
+        if self._aio is None:
+            self._aio = AsyncAssistantAPIWrapper(
+                self.client.api_key,
+                self.username,
+                file_cache=self.file_cache,
+                base_url=self.client.base_url,
+            )
+        return self._aio
+
+    def run_async(self, coroutine):
+        """
+        Runs a coroutine of `aio` from synchronous code and returns its result.
+        """
+        from .async_api_wrapper import run_sync
+
+        return run_sync(coroutine)
 
     def create_assistant(
         self,
@@ -81,6 +192,7 @@ class AssistantAPIWrapper:
             instructions=instructions,
             tools=tools,
         )
+        self.catalogue.put(self.assistant)
 
     def edit_assistant(
         self,
@@ -103,18 +215,82 @@ class AssistantAPIWrapper:
             instructions=instructions,
             tools=tools,
         )
+        self.catalogue.put(self.assistant)
+
+    def delete_assistant(self, assistant_id):
+        """
+        Deletes an assistant and drops it from the catalogue.
+        """
+        self.client.beta.assistants.delete(assistant_id=assistant_id)
+        self.catalogue.remove(assistant_id)
 
     def list_assistants(self):
         """
-        Retrieves a list of all assistants.
+        Retrieves the first page of assistants. Use `iter_assistants` to get all of them.
         """
         return self.client.beta.assistants.list()
 
+    def iter_assistants(self, page_size=DEFAULT_PAGE_SIZE, prefetch=False):
+        """
+        Lazily yields every assistant, fetching pages as they are consumed.
+        """
+        return paginate(
+            self.client.beta.assistants.list, page_size=page_size, prefetch=prefetch
+        )
+
     def get_assistants(self, assistant_id):
         """
         Retrieves a assistants.
         """
-        return self.client.beta.assistants.retrieve(assistant_id=assistant_id)
+        assistant = self.client.beta.assistants.retrieve(assistant_id=assistant_id)
+        self.catalogue.put(assistant)
+        return assistant
+
+    def resolve_files(self, file_ids):
+        """
+        Resolves file IDs to file objects, in the order given.
+
+        Cached entries are used as-is. When several IDs are missing, a single
+        `files.list` page is fetched first and whatever it did not cover is
+        retrieved concurrently. Files that no longer exist resolve to None.
+        """
+        file_ids = list(file_ids)
+        missing = missing_file_ids(self.file_cache, file_ids)
+
+        if len(missing) > 1:
+            self.file_cache.put_many(
+                self.client.files.list(purpose="assistants").data
+            )
+            missing = self.file_cache.missing(missing)
+
+        if missing:
+            with ThreadPoolExecutor(
+                max_workers=min(FILE_RESOLVE_WORKERS, len(missing))
+            ) as executor:
+                self.file_cache.put_many(
+                    file
+                    for file in executor.map(self._retrieve_file, missing)
+                    if file is not None
+                )
+
+        return [self.file_cache.get(file_id) for file_id in file_ids]
+
+    def get_filenames(self, file_ids):
+        """
+        Returns the filenames of the given file IDs, in the order given.
+        Files that could not be resolved are labelled "<id> (unavailable)".
+        """
+        file_ids = list(file_ids)
+        return filenames(self.resolve_files(file_ids), file_ids)
+
+    def _retrieve_file(self, file_id):
+        """
+        Retrieves a file object, or None if the file no longer exists.
+        """
+        try:
+            return self.client.files.retrieve(file_id)
+        except NotFoundError:
+            return None
 
     def get_thread(self, thread_id):
         """
@@ -132,12 +308,13 @@ class AssistantAPIWrapper:
         """
         Adds a message to the current thread.
         """
-        self.client.beta.threads.messages.create(
+        message = self.client.beta.threads.messages.create(
             thread_id=self.thread.id,
             role=role,
             content=message,
             file_ids=files,
         )
+        self._index_messages([message])
 
     def send_message(self):
         """
@@ -148,45 +325,179 @@ class AssistantAPIWrapper:
             assistant_id=self.assistant.id,
         )
 
-    def send_message_and_stream(self):
+    def send_message_and_stream(
+        self, event_handler=None, thread_id=None, assistant_id=None
+    ):
         """
         Sends a message via the assistant in the current thread and streams the response.
+        Pass a thread and an assistant explicitly to stream on several
+        threads at once, as the session manager does. The run's latency and
+        token usage are recorded in the metrics store, also when the stream
+        fails.
+
+        Args:
+            event_handler (optional): Handler for the stream events. Defaults
+                to one that renders the response to the console.
+            thread_id (str, optional): The thread to run. Defaults to the current one.
+            assistant_id (str, optional): The assistant to run. Defaults to
+                the current one.
+
+        Returns:
+            The event handler, from which the final run and messages can be read.
         """
-        with self.client.beta.threads.runs.create_and_stream(
-            thread_id=self.thread.id,
-            assistant_id=self.assistant.id,
-            event_handler=EventHandler(),
-        ) as stream:
-            stream.until_done()
+        thread_id = thread_id or self.thread.id
+        assistant_id = assistant_id or self.assistant.id
+        recorder = StreamRecorder(
+            thread_id, assistant_id, self.metrics, self.search_index
+        )
+        stream, messages = None, ()
+        try:
+            with self.client.beta.threads.runs.create_and_stream(
+                thread_id=thread_id,
+                assistant_id=assistant_id,
+                event_handler=event_handler or EventHandler(),
+            ) as stream:
+                for event in stream:
+                    recorder.observe(event)
+            messages = stream.get_final_messages()
+        finally:
+            recorder.finish(stream and stream.current_run, messages)
+        return stream
 
     def get_messages(self):
         """
-        Retrieves all messages from the current thread.
+        Retrieves the first page of messages from the current thread.
+        Use `iter_messages` to get all of them.
         """
         return self.client.beta.threads.messages.list(thread_id=self.thread.id)
 
-    def _check_run_status(self):
+    def iter_messages(
+        self,
+        thread_id=None,
+        order="asc",
+        after=None,
+        page_size=DEFAULT_PAGE_SIZE,
+        prefetch=False,
+    ):
+        """
+        Lazily yields every message of a thread, defaulting to the current one.
         """
-        !Depreciated: Use send_message_and_stream instead.
+        return paginate(
+            self.client.beta.threads.messages.list,
+            page_size=page_size,
+            prefetch=prefetch,
+            after=after,
+            thread_id=thread_id or self.thread.id,
+            order=order,
+        )
 
-        Checks and waits for the run status to complete, with a spinner for user feedback.
+    def get_message_store(self, thread_id=None):
         """
-        run = self.client.beta.threads.runs.retrieve(
-            thread_id=self.thread.id,
-            run_id=self.run.id,
+        Returns the local message store of a thread, creating it if needed.
+        Defaults to the current thread.
+        """
+        thread_id = thread_id or self.thread.id
+        if thread_id not in self.message_stores:
+            self.message_stores[thread_id] = MessageStore(thread_id)
+        return self.message_stores[thread_id]
+
+    def iter_new_messages(self):
+        """
+        Lazily yields messages created after the newest one in the current
+        thread's store, appending each to the store as it arrives.
+
+        An empty store is seeded with the latest HISTORY_PAGE_SIZE messages
+        only; older ones are left to `get_older_messages`. Iteration stops at
+        a message still being written by a run (e.g. one streaming in the
+        background): neither it nor anything after it is yielded or stored,
+        so the next sync picks them up once it is complete and every message
+        is yielded exactly once.
+        """
+        store = self.get_message_store()
+        if store.last_message_id is None:
+            page = self.client.beta.threads.messages.list(
+                thread_id=store.thread_id, order="desc", limit=HISTORY_PAGE_SIZE
+            )
+            settled = settled_prefix(page.data[::-1])
+            store.append(settled)
+            self._index_messages(settled)
+            store.has_older = store.has_older or has_more(page, HISTORY_PAGE_SIZE)
+            yield from settled
+            return
+
+        for message in self.iter_messages(
+            after=store.last_message_id,
+            page_size=MESSAGE_SYNC_PAGE_SIZE,
+            prefetch=True,
+        ):
+            if not is_settled(message):
+                return
+            store.append([message])
+            self._index_messages([message])
+            yield message
+
+    def get_older_messages(self, before_id, limit=HISTORY_PAGE_SIZE):
+        """
+        Fetches the page of messages right before a message of the current
+        thread. The messages are not added to the store.
+
+        Args:
+            before_id (str): The ID of the message to page back from.
+            limit (int): The number of messages to fetch.
+
+        Returns:
+            tuple: The messages in chronological order, and whether there
+            are even older ones.
+        """
+        # Newest-first, the messages "after" the cursor are the older ones.
+        page = self.client.beta.threads.messages.list(
+            thread_id=self.thread.id, order="desc", after=before_id, limit=limit
+        )
+        self._index_messages(page.data)
+        return page.data[::-1], has_more(page, limit)
+
+    def _index_messages(self, messages):
+        """
+        Adds messages of the current thread to the local search index.
+        """
+        self.search_index.add_messages(
+            messages, self.assistant.id if self.assistant else None
         )
+
+    def sync_messages(self):
+        """
+        Pulls new messages into the current thread's store and returns them
+        in chronological order.
+        """
+        return list(self.iter_new_messages())
+
+    def _check_run_status(self, timeout=None, cancel_event=None):
+        """
+        Waits for the current run to finish, with a spinner for user feedback.
+        Interactive use should prefer send_message_and_stream.
+
+        Args:
+            timeout (float, optional): Seconds to wait before giving up.
+            cancel_event (threading.Event, optional): Set it to abort the wait
+                and cancel the run.
+        """
+        from halo import Halo
+
         spinner = Halo(text="Thinking...", spinner="dots")
         spinner.start()
 
-        counter = 0
-        while run.status in ["in_progress", "queued"]:
-            if counter % 10 == 0:
-                run = self.client.beta.threads.runs.retrieve(
-                    thread_id=self.thread.id,
-                    run_id=self.run.id,
-                )
-                time.sleep(5)
-            counter += 1
+        try:
+            run = self.run_poller.wait(
+                self.thread.id,
+                self.run.id,
+                timeout=timeout,
+                cancel_event=cancel_event,
+                cancel_runs=True,
+            )
+        except Exception:
+            spinner.fail("Error")
+            raise
+        self.run = run
 
         if run.status == "completed":
             spinner.succeed("Done")
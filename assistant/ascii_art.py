@@ -1,4 +1,15 @@
-from pyfiglet import Figlet
+import functools
+import hashlib
+import os
+
+from .paths import cache_dir
+
+# Banners exposed as module attributes, rendered on first access.
+_BANNERS = {
+    "ascii_logo": "Assistant-GPT",
+    "ascii_welcome": "Welcome!",
+    "ascii_goodbye": "Goodbye!",
+}
 
 
 def generate_ascii_art(text, font="slant"):
@@ -12,10 +23,46 @@ def generate_ascii_art(text, font="slant"):
     Returns:
         str: The ASCII art representation of the input text.
     """
+    from pyfiglet import Figlet
+
     figlet = Figlet(font=font)
     return figlet.renderText(text)
 
 
-ascii_logo = generate_ascii_art("Assistant-GPT")
-ascii_welcome = generate_ascii_art("Welcome!")
-ascii_goodbye = generate_ascii_art("Goodbye!")
+@functools.lru_cache(maxsize=None)
+def banner(text, font="slant"):
+    """
+    Returns the ASCII art for a text, rendering it at most once per machine.
+
+    Rendered banners are kept in the application cache directory, so later
+    launches read a small file instead of importing and running pyfiglet.
+
+    Args:
+        text (str): The text to be converted into ASCII art.
+        font (str, optional): The font style to use. Defaults to "slant".
+    """
+    key = hashlib.sha1(f"{font}\0{text}".encode()).hexdigest()
+    try:
+        path = os.path.join(cache_dir("banners"), f"{key}.txt")
+    except OSError:
+        return generate_ascii_art(text, font)
+
+    try:
+        with open(path, "r") as file:
+            return file.read()
+    except OSError:
+        pass
+
+    art = generate_ascii_art(text, font)
+    try:
+        with open(path, "w") as file:
+            file.write(art)
+    except OSError:
+        pass
+    return art
+
+
+def __getattr__(name):
+    if name in _BANNERS:
+        return banner(_BANNERS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .ui_utils import logger
+
+# JSON file mirroring an account's assistants, keyed by assistant ID. There
+# is one file per API key, so changing the key never lists another account's
+# assistants.
+ASSISTANT_CATALOGUE = os.path.expanduser("~/.assistant-gpt-assistants-{key}.json")
+# Seconds after a full sync before the catalogue is revalidated again.
+CATALOGUE_MAX_AGE = float(os.environ.get("ASSISTANT_GPT_CATALOGUE_MAX_AGE", 60))
+
+
+def catalogue_path(api_key):
+    """
+    Returns the path of the catalogue of the account an API key belongs to.
+    The key itself is not written to disk, only a digest of it.
+    """
+    digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return ASSISTANT_CATALOGUE.format(key=digest)
+
+
+def _to_assistant(data):
+    from openai.types.beta import Assistant
+
+    return Assistant.model_validate(data)
+
+
+class AssistantCatalogue:
+    """
+    A local mirror of the account's assistants, keyed by ID, so listings can
+    be shown without waiting for the API.
+
+    The mirror is revalidated against the API in the background once it is
+    older than CATALOGUE_MAX_AGE. Assistants written locally while a
+    revalidation is in flight are kept, so the (older) listing it fetched
+    cannot undo them.
+    """
+
+    def __init__(self, path, max_age=CATALOGUE_MAX_AGE):
+        """
+        Args:
+            path (str): Path of the JSON file backing the catalogue.
+            max_age (float): Seconds before the catalogue is considered stale.
+        """
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._sync_thread = None
+        self.last_changes = None
+        try:
+            with open(path, "r") as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            state = {}
+        self.synced_at = state.get("synced_at", 0)
+        # assistant ID -> {"assistant": dict, "written_at": float}
+        self._entries = state.get("assistants", {})
+
+    def _save_locked(self):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path))
+        with os.fdopen(fd, "w") as file:
+            json.dump({"synced_at": self.synced_at, "assistants": self._entries}, file)
+        os.replace(tmp_path, self.path)
+
+    def all(self):
+        """
+        Returns the cached assistants, newest first like the API lists them.
+        """
+        with self._lock:
+            entries = [entry["assistant"] for entry in self._entries.values()]
+        entries.sort(key=lambda assistant: assistant.get("created_at") or 0, reverse=True)
+        return [_to_assistant(data) for data in entries]
+
+    def get(self, assistant_id):
+        """
+        Returns a cached assistant, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(assistant_id)
+        return _to_assistant(entry["assistant"]) if entry else None
+
+    def get_fresh(self, assistant_id):
+        """
+        Returns a cached assistant written less than `max_age` seconds ago,
+        or None.
+        """
+        with self._lock:
+            entry = self._entries.get(assistant_id)
+        if entry is None or time.time() - entry["written_at"] > self.max_age:
+            return None
+        return _to_assistant(entry["assistant"])
+
+    def put(self, assistant):
+        """
+        Records a created, edited or retrieved assistant.
+        """
+        with self._lock:
+            self._entries[assistant.id] = {
+                "assistant": assistant.model_dump(mode="json"),
+                "written_at": time.time(),
+            }
+            self._save_locked()
+
+    def put_many(self, assistants):
+        """
+        Records assistants fetched from a listing.
+        """
+        now = time.time()
+        with self._lock:
+            for assistant in assistants:
+                self._entries[assistant.id] = {
+                    "assistant": assistant.model_dump(mode="json"),
+                    "written_at": now,
+                }
+            self._save_locked()
+
+    def remove(self, assistant_id):
+        """
+        Drops a deleted assistant.
+        """
+        with self._lock:
+            if self._entries.pop(assistant_id, None) is not None:
+                self._save_locked()
+
+    def is_stale(self):
+        return time.time() - self.synced_at > self.max_age
+
+    def reconcile(self, assistants, started_at):
+        """
+        Replaces the catalogue with a full listing fetched since `started_at`.
+
+        Entries written locally after `started_at` are kept as they are.
+
+        Args:
+            assistants (Iterable): Every assistant of the account.
+            started_at (float): `time.time()` when the listing was requested.
+
+        Returns:
+            dict: The IDs that were `added`, `updated` and `removed`.
+        """
+        fetched = {
+            assistant.id: assistant.model_dump(mode="json") for assistant in assistants
+        }
+        changes = {"added": [], "updated": [], "removed": []}
+        with self._lock:
+            for assistant_id, entry in list(self._entries.items()):
+                if entry["written_at"] > started_at or assistant_id in fetched:
+                    continue
+                del self._entries[assistant_id]
+                changes["removed"].append(assistant_id)
+            for assistant_id, data in fetched.items():
+                entry = self._entries.get(assistant_id)
+                if entry is None:
+                    changes["added"].append(assistant_id)
+                elif entry["written_at"] > started_at:
+                    continue
+                elif entry["assistant"] != data:
+                    changes["updated"].append(assistant_id)
+                self._entries[assistant_id] = {"assistant": data, "written_at": started_at}
+            self.synced_at = started_at
+            self.last_changes = changes
+            self._save_locked()
+        return changes
+
+    def revalidate(self, api):
+        """
+        Fetches every assistant and reconciles the catalogue with them.
+        """
+        started_at = time.time()
+        return self.reconcile(api.iter_assistants(prefetch=True), started_at)
+
+    def revalidate_in_background(self, api, force=False):
+        """
+        Starts a background revalidation if the catalogue is stale and none
+        is running already.
+
+        Returns:
+            threading.Thread or None: The running revalidation, if any.
+        """
+        with self._lock:
+            if self._sync_thread is not None and self._sync_thread.is_alive():
+                return self._sync_thread
+            if not force and not self.is_stale():
+                return None
+
+            def run():
+                try:
+                    self.revalidate(api)
+                except Exception as e:
+                    logger.info(f"Assistant catalogue revalidation failed: {e}")
+
+            self._sync_thread = threading.Thread(target=run, daemon=True)
+            self._sync_thread.start()
+            return self._sync_thread
+
+    def wait_for_revalidation(self, timeout=None):
+        """
+        Waits for a running background revalidation to finish.
+        """
+        thread = self._sync_thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+_catalogues = {}
+_catalogues_lock = threading.Lock()
+
+
+def get_assistant_catalogue(api_key):
+    """
+    Returns the process-wide catalogue of an API key's account, loading it
+    on first use.
+
+    Args:
+        api_key (str): The OpenAI API key.
+    """
+    path = catalogue_path(api_key)
+    with _catalogues_lock:
+        if path not in _catalogues:
+            _catalogues[path] = AssistantCatalogue(path)
+        return _catalogues[path]
@@ -1,14 +1,23 @@
+import collections
+import itertools
 import json
-import time
 from typing import Callable
 
 import inquirer
+import openai
 from halo import Halo
 from rich.prompt import Prompt
 import re
 
 from .error_handling import handleError
-from .ui_utils import clear_screen, console
+from .router import goto
+from .uploads import upload_file as upload_file_in_parts
+from .ui_utils import clear_screen, console, pause
+
+# Number of assistants offered per page on the selection screen.
+ASSISTANT_PAGE_SIZE = 20
+LOAD_MORE_ASSISTANTS = "Load more..."
+REFRESH_ASSISTANTS = "Refresh"
 
 
 def _input_tools(tools=None):
@@ -74,14 +83,14 @@ def create_assistant(api):
             assistant_tools,
         )
     except Exception as e:
-        handleError(e, assistant_dashboard, [api])
+        return handleError(e, assistant_dashboard, [api])
     else:
         console.print(
             f"[bold green]Assistant '{assistant_name}' created successfully.[/bold green]"
         )
-        time.sleep(1)
+        pause()
         clear_screen()
-        assistant_dashboard(api)
+        return goto(assistant_dashboard, api)
 
 
 def assistant_dashboard(api):
@@ -91,14 +100,21 @@ def assistant_dashboard(api):
     Args:
         api: API object to interact with the backend.
     """
-    from .thread_management import threads_dashboard
-
     clear_screen()
     # Display assistant details
-    display_assistant_details(api)
+    try:
+        display_assistant_details(api)
+    except openai.NotFoundError:
+        # A cached assistant that was deleted remotely before the
+        # catalogue's revalidation noticed.
+        api.catalogue.remove(api.assistant.id)
+        console.print("[yellow]That assistant no longer exists.[/yellow]")
+        pause()
+        api.assistant = None
+        return goto(select_assistant, api)
 
     # Handle user options for assistant management
-    manage_assistant_options(api)
+    return manage_assistant_options(api)
 
 
 def display_assistant_details(api):
@@ -108,6 +124,18 @@ def display_assistant_details(api):
     Args:
         api: API object to interact with the backend.
     """
+    # An assistant the catalogue got from the API moments ago is shown as
+    # is; otherwise it is retrieved again. Either way the filenames are
+    # resolved from the file IDs of the assistant being shown.
+    cached = api.catalogue.get_fresh(api.assistant.id)
+    if cached is not None:
+        api.assistant, filenames = cached, api.get_filenames(cached.file_ids)
+    else:
+        api.assistant, filenames = api.run_async(
+            api.aio.get_assistant_details(api.assistant.id)
+        )
+        api.catalogue.put(api.assistant)
+
     console.print(f"[bold green]Assistant[/bold green]: {api.assistant.name}")
     console.print(f"[bold green]Assistant ID[/bold green]: {api.assistant.id}")
     console.print(f"[bold green]Description[/bold green]: {api.assistant.description}")
@@ -116,21 +144,20 @@ def display_assistant_details(api):
         f"[bold green]Instructions[/bold green]: {api.assistant.instructions}"
     )
     console.print(f"[bold green]Tools[/bold green]: {api.assistant.tools}")
-    display_uploaded_files(api)
+    display_uploaded_files(api, filenames)
 
 
-def display_uploaded_files(api):
+def display_uploaded_files(api, filenames=None):
     """
     Display the list of uploaded files for the assistant.
 
     Args:
         api: API object to interact with the backend.
+        filenames (List[str], optional): Already resolved filenames.
     """
     if api.assistant.file_ids:
-        filenames = [
-            api.client.files.retrieve(file_id).filename
-            for file_id in api.assistant.file_ids
-        ]
+        if filenames is None:
+            filenames = api.get_filenames(api.assistant.file_ids)
         console.print(
             f"[bold green]Files uploaded[/bold green]: {', '.join(filenames)}"
         )
@@ -161,18 +188,18 @@ def manage_assistant_options(api):
     )
 
     if selected_option == options[0]:
-        threads_dashboard(api)
+        return goto(threads_dashboard, api)
     elif selected_option == options[1]:
-        edit_assistant(api)
+        return goto(edit_assistant, api)
     elif selected_option == options[2]:
         # Manage files
         clear_screen()
-        files_dashboard(api, assistant_dashboard)
+        return goto(files_dashboard, api, assistant_dashboard)
     elif selected_option == options[3]:
-        delete_assistant(api)
+        return goto(delete_assistant, api)
     elif selected_option == options[4]:
         api.assistant = None
-        select_assistant(api)
+        return goto(select_assistant, api)
 
 
 def edit_assistant(api):
@@ -200,10 +227,10 @@ def edit_assistant(api):
         console.print(
             f"[bold green]Assistant '{api.assistant.name}' edited successfully![/bold green]"
         )
-        time.sleep(1)
-        assistant_dashboard(api)
+        pause()
+        return goto(assistant_dashboard, api)
     except Exception as e:
-        handleError(e, assistant_dashboard, [api])
+        return handleError(e, assistant_dashboard, [api])
 
 
 def delete_assistant(api):
@@ -214,13 +241,13 @@ def delete_assistant(api):
         api: API object to interact with the backend.
     """
 
-    api.client.beta.assistants.delete(assistant_id=api.assistant.id)
+    api.delete_assistant(api.assistant.id)
     console.print(
         f"[bold green]Assistant '{api.assistant.name}' deleted successfully![/bold green]"
     )
     api.assistant = None
-    time.sleep(1)
-    select_assistant(api)
+    pause()
+    return goto(select_assistant, api)
 
 
 def files_dashboard(api, back: Callable = assistant_dashboard):
@@ -234,7 +261,7 @@ def files_dashboard(api, back: Callable = assistant_dashboard):
     clear_screen()
     assert api.assistant is not None, "No assistant selected"
 
-    manage_file_options(api, back)
+    return manage_file_options(api, back)
 
 
 def manage_file_options(api, back: Callable):
@@ -246,17 +273,19 @@ def manage_file_options(api, back: Callable):
         back (Callable): Function to call when navigating back.
     """
     list_files = get_uploaded_files(api)
-    choices = ["New File", "Back", *["Remove file: " + file[0] + ' (' + 'id: ' + file[1] + ')' for file in list_files]]
+    choices = ["New File", "Bulk ingest directory", "Back", *["Remove file: " + file[0] + ' (' + 'id: ' + file[1] + ')' for file in list_files]]
     selected_option = inquirer.list_input(
         "Please select an option", choices=choices, carousel=True
     )
 
     if selected_option == "New File":
-        upload_new_file(api, back)
+        return goto(upload_new_file, api, back)
+    elif selected_option == "Bulk ingest directory":
+        return goto(ingest_directory, api, back)
     elif selected_option == "Back":
-        back(api)
+        return goto(back, api)
     else:
-        remove_selected_file(api, selected_option, back)
+        return goto(remove_selected_file, api, selected_option, back)
 
 
 def get_uploaded_files(api):
@@ -275,10 +304,8 @@ def get_uploaded_files(api):
 
     api.assistant.file_ids = [file.id for file in files]
 
-    return [
-        (api.client.files.retrieve(file_id).filename, file_id)
-        for file_id in api.assistant.file_ids
-    ]
+    filenames = api.get_filenames(api.assistant.file_ids)
+    return list(zip(filenames, api.assistant.file_ids))
 
 
 def upload_new_file(api, back: Callable):
@@ -304,32 +331,54 @@ def upload_new_file(api, back: Callable):
             )
 
     except Exception as e:
-        handleError(e, files_dashboard, [api, back])
         api.assistant = api.get_assistants(assistant_id=api.assistant.id)
-    finally:
-        time.sleep(1)
-        files_dashboard(api, back)
+        return handleError(e, files_dashboard, [api, back])
+
+    pause()
+    return goto(files_dashboard, api, back)
+
+
+def ingest_directory(api, back: Callable):
+    """
+    Uploads every file in a directory (or matching a glob) and attaches them
+    to the assistant. Content that was uploaded before is not sent again.
+
+    Args:
+        api: API object to interact with the backend.
+        back (Callable): Function to call when navigating back.
+    """
+    from .ingest import ingest, print_ingest_summary
+
+    pattern = Prompt.ask("Please enter a directory or glob")
+    try:
+        summary = ingest(
+            api.client,
+            pattern,
+            assistant_id=api.assistant.id,
+            attached_file_ids=api.assistant.file_ids,
+            file_cache=api.file_cache,
+        )
+    except Exception as e:
+        return handleError(e, files_dashboard, [api, back])
+
+    print_ingest_summary(summary)
+    input("Press enter to continue...")
+    return goto(files_dashboard, api, back)
 
 
 def upload_file(api, file_path):
     """
-    Uploads a file to the assistant.
+    Uploads a file to the assistant, showing byte-level progress.
+    Large files are uploaded in resumable parallel parts.
 
     Args:
         api: API object to interact with the backend.
         file_path (str): Path of the file to be uploaded.
     """
-    with Halo(text="Uploading file...", spinner="dots") as spinner:
-        try:
-            file = api.client.files.create(
-                file=open(file_path, "rb"), purpose="assistants"
-            )
-            spinner.succeed("File uploaded successfully!")
-
-            return file
-        except Exception as e:
-            spinner.fail("Error:")
-            raise e
+    file = upload_file_in_parts(api.client, file_path)
+    api.file_cache.put(file)
+    console.print("[bold green]File uploaded successfully![/bold green]")
+    return file
 
 
 def remove_selected_file(api, selected_option, back: Callable):
@@ -348,50 +397,111 @@ def remove_selected_file(api, selected_option, back: Callable):
             assistant_id=api.assistant.id,
             file_id=file_id
         )
+        api.file_cache.invalidate(file_id)
         console.print(
             f"[bold green]File '{file_name}' removed successfully![/bold green]"
         )
     except Exception as e:
-        handleError(e, files_dashboard, [api, back])
-    finally:
-        time.sleep(1)
-        files_dashboard(api, back)
+        return handleError(e, files_dashboard, [api, back])
+
+    pause()
+    return goto(files_dashboard, api, back)
 
 
 def select_assistant(api):
     """
     Allows the user to select an assistant from the list of available assistants.
 
+    The list is shown from the local assistant catalogue and revalidated in
+    the background. Only the very first visit waits for the API.
+
     Args:
         api: API object to interact with the backend.
     """
-    from .dashboard import dashboard
-
-    assistants = api.list_assistants()
     clear_screen()
-    handle_assistant_selection(api, assistants)
+    cached = api.catalogue.all()
+    if not cached and not api.catalogue.synced_at:
+        assistants = api.iter_assistants(page_size=ASSISTANT_PAGE_SIZE, prefetch=True)
+        return handle_assistant_selection(api, assistants)
+
+    api.catalogue.revalidate_in_background(api)
+    return handle_cached_assistant_selection(api, cached)
 
 
 def handle_assistant_selection(api, assistants):
     """
     Handles the assistant selection process.
 
+    The selection is offered as soon as the first page has arrived; further
+    pages are only pulled when the user asks for more. Fetched pages are
+    recorded in the assistant catalogue.
+
     Args:
         api: API object to interact with the backend.
-        assistants: List of available assistants.
+        assistants: Iterator over the available assistants.
     """
     from .dashboard import dashboard
 
-    if not assistants.data:
-        handle_no_assistants_available(api)
-        return
+    loaded_assistants = []
+    peeked = []
+    while True:
+        # Pull one assistant past the page to know whether there are more;
+        # a full last page must not offer to load an empty one.
+        fetched = peeked + list(
+            itertools.islice(assistants, ASSISTANT_PAGE_SIZE + 1 - len(peeked))
+        )
+        page, peeked = fetched[:ASSISTANT_PAGE_SIZE], fetched[ASSISTANT_PAGE_SIZE:]
+        api.catalogue.put_many(page)
+        loaded_assistants.extend(page)
+        if not loaded_assistants:
+            return handle_no_assistants_available(api)
+
+        has_more = bool(peeked)
+        selected_assistant = choose_assistant(loaded_assistants, has_more)
+        if selected_assistant != LOAD_MORE_ASSISTANTS:
+            break
 
-    selected_assistant = choose_assistant(assistants)
     if selected_assistant == "Back":
-        return dashboard(api)
+        return goto(dashboard, api)
+
+    set_selected_assistant(api, loaded_assistants, selected_assistant)
+    return goto(assistant_dashboard, api)
+
+
+def handle_cached_assistant_selection(api, assistants):
+    """
+    Handles the assistant selection from the assistant catalogue.
+
+    Choosing an assistant that a background revalidation found to be
+    deleted shows the reconciled list again.
 
-    set_selected_assistant(api, assistants, selected_assistant)
-    assistant_dashboard(api)
+    Args:
+        api: API object to interact with the backend.
+        assistants: The cached assistants to offer first.
+    """
+    from .dashboard import dashboard
+
+    while True:
+        if not assistants:
+            api.catalogue.wait_for_revalidation()
+            assistants = api.catalogue.all()
+            if not assistants:
+                return handle_no_assistants_available(api)
+
+        selected_assistant = choose_assistant(assistants, refresh=True)
+        if selected_assistant == "Back":
+            return goto(dashboard, api)
+        if selected_assistant == REFRESH_ASSISTANTS:
+            with Halo(text="Refreshing assistants...", spinner="dots"):
+                api.catalogue.revalidate_in_background(api, force=True)
+                api.catalogue.wait_for_revalidation()
+        else:
+            # The catalogue holds the latest copy the revalidation found.
+            api.assistant = api.catalogue.get(selected_assistant)
+            if api.assistant is not None:
+                return goto(assistant_dashboard, api)
+            console.print("[yellow]That assistant no longer exists.[/yellow]")
+        assistants = api.catalogue.all()
 
 
 def handle_no_assistants_available(api):
@@ -401,6 +511,8 @@ def handle_no_assistants_available(api):
     Args:
         api: API object to interact with the backend.
     """
+    from .dashboard import dashboard
+
     console.print("[yellow]No assistants available. Please create a new one.[/yellow]")
     response = inquirer.list_input(
         "What would you like to do?",
@@ -408,38 +520,52 @@ def handle_no_assistants_available(api):
         carousel=True,
     )
     if response == "Back":
-        assistant_dashboard(api)
+        return goto(dashboard, api)
 
 
-def choose_assistant(assistants):
+def choose_assistant(assistants, has_more=False, refresh=False):
     """
     Prompts the user to choose an assistant.
 
     Args:
         assistants: List of available assistants.
+        has_more (bool): Whether to offer loading the next page of assistants.
+        refresh (bool): Whether to offer refreshing the list.
 
     Returns:
-        str: The name of the selected assistant or 'Back'.
-    """
+        str: The ID of the selected assistant, 'Back', or the load-more or
+        refresh option.
+    """
+    names = collections.Counter(assistant.name for assistant in assistants)
+    choices = [
+        (
+            assistant.name
+            if names[assistant.name] == 1
+            else f"{assistant.name} ({assistant.id})",
+            assistant.id,
+        )
+        for assistant in assistants
+    ]
+    if has_more:
+        choices.append((LOAD_MORE_ASSISTANTS, LOAD_MORE_ASSISTANTS))
+    if refresh:
+        choices.append((REFRESH_ASSISTANTS, REFRESH_ASSISTANTS))
     return inquirer.list_input(
         "Please select an assistant:",
-        choices=[*[assistant.name for assistant in assistants], "Back"],
+        choices=[*choices, ("Back", "Back")],
         carousel=True,
     )
 
 
-def set_selected_assistant(api, assistants, selected_assistant_name):
+def set_selected_assistant(api, assistants, selected_assistant_id):
     """
     Sets the selected assistant in the API object.
 
     Args:
         api: API object to interact with the backend.
         assistants: List of available assistants.
-        selected_assistant_name (str): Name of the selected assistant.
+        selected_assistant_id (str): ID of the selected assistant.
     """
-    selected_assistant = [
-        assistant
-        for assistant in assistants
-        if assistant.name == selected_assistant_name
-    ][0]
-    api.assistant = selected_assistant
+    api.assistant = next(
+        assistant for assistant in assistants if assistant.id == selected_assistant_id
+    )
@@ -0,0 +1,364 @@
+import asyncio
+import threading
+
+from openai import AsyncAssistantEventHandler, NotFoundError
+from typing_extensions import override
+
+from .api_common import (
+    DEFAULT_PAGE_SIZE,
+    ConsoleOutput,
+    StreamRecorder,
+    has_more,
+    filenames,
+    missing_file_ids,
+    page_params,
+)
+from .client_factory import create_async_client
+from .file_metadata import FileMetadataCache
+
+# Upper bound on concurrent `files.retrieve` calls when resolving file IDs.
+FILE_RESOLVE_CONCURRENCY = 8
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    """
+    Returns the event loop shared by all sync callers, starting it in a
+    daemon thread on first use. Keeping a single long-lived loop lets the
+    async client reuse its connection pool across calls.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="assistant-async", daemon=True
+            ).start()
+        return _loop
+
+
+def run_sync(coroutine):
+    """
+    Runs a coroutine on the shared event loop and blocks until it is done.
+
+    Args:
+        coroutine: The coroutine to run.
+
+    Returns:
+        The result of the coroutine.
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, _get_loop()).result()
+
+
+async def paginate(
+    list_page, page_size=DEFAULT_PAGE_SIZE, prefetch=False, after=None, **params
+):
+    """
+    Lazily yields the items of a cursor-paginated list endpoint.
+
+    Args:
+        list_page (Callable): An async SDK `list` method.
+        page_size (int): Number of items requested per page.
+        prefetch (bool): Whether to fetch the next page concurrently while
+            the current one is being consumed.
+        after (str, optional): Cursor to start after.
+        **params: Extra parameters passed to every `list_page` call.
+
+    Yields:
+        The items of every page, in the order returned by the API.
+    """
+
+    async def fetch(cursor):
+        return await list_page(**page_params(params, page_size, cursor))
+
+    def is_last(page):
+        return not has_more(page, page_size)
+
+    page = await fetch(after)
+    next_page = None
+    try:
+        while True:
+            last = not page.data or is_last(page)
+            if not last and prefetch:
+                next_page = asyncio.ensure_future(fetch(page.data[-1].id))
+
+            for item in page.data:
+                yield item
+
+            if last:
+                return
+            page = await (next_page or fetch(page.data[-1].id))
+            next_page = None
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+
+
+class AsyncEventHandler(AsyncAssistantEventHandler):
+    def __init__(self, renderer=None):
+        super().__init__()
+        self.output = ConsoleOutput(renderer)
+
+    @override
+    async def on_text_created(self, text) -> None:
+        self.output.text_created()
+
+    @override
+    async def on_text_delta(self, delta, snapshot):
+        self.output.text_delta(delta)
+
+    @override
+    async def on_text_done(self, text):
+        self.output.text_done()
+
+    @override
+    async def on_end(self):
+        self.output.end()
+
+    async def on_tool_call_created(self, tool_call):
+        self.output.tool_call_created(tool_call)
+
+    async def on_tool_call_delta(self, delta, snapshot):
+        self.output.tool_call_delta(delta)
+
+
+class AsyncAssistantAPIWrapper:
+    """
+    An asyncio twin of AssistantAPIWrapper built on AsyncOpenAI.
+
+    All requests of one instance go through a single AsyncOpenAI client and
+    therefore a single connection pool, so independent calls can be awaited
+    together with `asyncio.gather`.
+    """
+
+    def __init__(
+        self, api_key, username, file_cache=None, http_client=None, base_url=None
+    ):
+        """
+        Initializes the API client and sets up basic parameters.
+
+        Args:
+            api_key (str): The OpenAI API key.
+            username (str): The name of the user.
+            file_cache (FileMetadataCache, optional): A cache to share with a
+                sync wrapper.
+            http_client (httpx.AsyncClient, optional): A pre-configured client.
+                Defaults to the process-wide async connection pool.
+            base_url (str, optional): The API to talk to. Defaults to
+                `OPENAI_BASE_URL` or the OpenAI API.
+        """
+        self.client = create_async_client(
+            api_key, base_url=base_url, http_client=http_client
+        )
+        self.thread = None
+        self.assistant = None
+        self.run = None
+        self.username = username
+        self.file_cache = file_cache or FileMetadataCache()
+
+    async def create_assistant(
+        self,
+        name,
+        description=None,
+        model="gpt-4-vision-preview",
+        instructions=None,
+        tools=None,
+    ):
+        """
+        Creates a new assistant with the specified parameters.
+        """
+        if tools is None:
+            tools = []
+        self.assistant = await self.client.beta.assistants.create(
+            name=name,
+            description=description,
+            model=model,
+            instructions=instructions,
+            tools=tools,
+        )
+
+    async def edit_assistant(
+        self,
+        name,
+        description=None,
+        model="gpt-4-vision-preview",
+        instructions=None,
+        tools=None,
+    ):
+        """
+        Edits the existing assistant with new parameters.
+        """
+        if tools is None:
+            tools = []
+        self.assistant = await self.client.beta.assistants.update(
+            assistant_id=self.assistant.id,
+            name=name,
+            description=description,
+            model=model,
+            instructions=instructions,
+            tools=tools,
+        )
+
+    async def list_assistants(self):
+        """
+        Retrieves the first page of assistants. Use `iter_assistants` to get all of them.
+        """
+        return await self.client.beta.assistants.list()
+
+    def iter_assistants(self, page_size=DEFAULT_PAGE_SIZE, prefetch=False):
+        """
+        Lazily yields every assistant, fetching pages as they are consumed.
+        """
+        return paginate(
+            self.client.beta.assistants.list, page_size=page_size, prefetch=prefetch
+        )
+
+    async def get_assistants(self, assistant_id):
+        """
+        Retrieves a assistants.
+        """
+        return await self.client.beta.assistants.retrieve(assistant_id=assistant_id)
+
+    async def get_assistant_details(self, assistant_id):
+        """
+        Retrieves an assistant together with the filenames of its files, as
+        listed by the retrieved assistant.
+
+        Returns:
+            tuple: The assistant and the list of its filenames.
+        """
+        assistant = await self.get_assistants(assistant_id)
+        return assistant, await self.get_filenames(assistant.file_ids)
+
+    async def resolve_files(self, file_ids):
+        """
+        Resolves file IDs to file objects, in the order given.
+
+        Cached entries are used as-is. When several IDs are missing, a single
+        `files.list` page is fetched first and whatever it did not cover is
+        retrieved concurrently. Files that no longer exist resolve to None.
+        """
+        file_ids = list(file_ids)
+        missing = missing_file_ids(self.file_cache, file_ids)
+
+        if len(missing) > 1:
+            page = await self.client.files.list(purpose="assistants")
+            self.file_cache.put_many(page.data)
+            missing = self.file_cache.missing(missing)
+
+        if missing:
+            semaphore = asyncio.Semaphore(FILE_RESOLVE_CONCURRENCY)
+
+            async def retrieve(file_id):
+                async with semaphore:
+                    try:
+                        return await self.client.files.retrieve(file_id)
+                    except NotFoundError:
+                        return None
+
+            files = await asyncio.gather(*[retrieve(file_id) for file_id in missing])
+            self.file_cache.put_many(file for file in files if file is not None)
+
+        return [self.file_cache.get(file_id) for file_id in file_ids]
+
+    async def get_filenames(self, file_ids):
+        """
+        Returns the filenames of the given file IDs, in the order given.
+        Files that could not be resolved are labelled "<id> (unavailable)".
+        """
+        file_ids = list(file_ids)
+        return filenames(await self.resolve_files(file_ids), file_ids)
+
+    async def get_thread(self, thread_id):
+        """
+        Retrieves a specific thread by its ID.
+        """
+        return await self.client.beta.threads.retrieve(thread_id=thread_id)
+
+    async def create_thread(self):
+        """
+        Creates a new thread and stores it in the instance variable.
+        """
+        self.thread = await self.client.beta.threads.create()
+
+    async def add_message_to_thread(self, message, role="user", files=[]):
+        """
+        Adds a message to the current thread.
+        """
+        await self.client.beta.threads.messages.create(
+            thread_id=self.thread.id,
+            role=role,
+            content=message,
+            file_ids=files,
+        )
+
+    async def send_message(self):
+        """
+        Sends a message via the assistant in the current thread.
+        """
+        self.run = await self.client.beta.threads.runs.create(
+            thread_id=self.thread.id,
+            assistant_id=self.assistant.id,
+        )
+
+    async def send_message_and_stream(
+        self, event_handler=None, thread_id=None, assistant_id=None
+    ):
+        """
+        Sends a message via the assistant in the current thread and streams the response.
+
+        Args:
+            event_handler (optional): Handler for the stream events. Defaults
+                to one that renders the response to the console.
+            thread_id (str, optional): The thread to run. Defaults to the current one.
+            assistant_id (str, optional): The assistant to run. Defaults to
+                the current one.
+
+        Returns:
+            The event handler, from which the final run and messages can be read.
+        """
+        thread_id = thread_id or self.thread.id
+        assistant_id = assistant_id or self.assistant.id
+        recorder = StreamRecorder(thread_id, assistant_id)
+        stream, messages = None, ()
+        try:
+            async with self.client.beta.threads.runs.create_and_stream(
+                thread_id=thread_id,
+                assistant_id=assistant_id,
+                event_handler=event_handler or AsyncEventHandler(),
+            ) as stream:
+                async for event in stream:
+                    recorder.observe(event)
+            messages = await stream.get_final_messages()
+        finally:
+            recorder.finish(stream and stream.current_run, messages)
+        return stream
+
+    async def get_messages(self):
+        """
+        Retrieves the first page of messages from the current thread.
+        Use `iter_messages` to get all of them.
+        """
+        return await self.client.beta.threads.messages.list(thread_id=self.thread.id)
+
+    def iter_messages(
+        self,
+        thread_id=None,
+        order="asc",
+        after=None,
+        page_size=DEFAULT_PAGE_SIZE,
+        prefetch=False,
+    ):
+        """
+        Lazily yields every message of a thread, defaulting to the current one.
+        """
+        return paginate(
+            self.client.beta.threads.messages.list,
+            page_size=page_size,
+            prefetch=prefetch,
+            after=after,
+            thread_id=thread_id or self.thread.id,
+            order=order,
+        )
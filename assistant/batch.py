@@ -0,0 +1,208 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .percentiles import summarize
+from .run_poller import RunPoller
+
+# Number of prompts processed at the same time unless told otherwise.
+DEFAULT_BATCH_CONCURRENCY = 8
+
+
+def read_prompts(input_path):
+    """
+    Reads prompts from a JSONL file.
+
+    Every line is an object with a `prompt` and an optional `id`; lines
+    without an `id` are identified by their line number.
+
+    Args:
+        input_path (str): Path of the JSONL file.
+
+    Returns:
+        list: The prompt records, each with an `id`.
+    """
+    prompts = []
+    with open(input_path, "r") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record.setdefault("id", str(line_number))
+            prompts.append(record)
+    return prompts
+
+
+def completed_ids(output_path):
+    """
+    Returns the IDs of prompts that already completed in a previous run.
+
+    Args:
+        output_path (str): Path of the results JSONL file.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r") as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # A partial line left behind by an interrupted run.
+                continue
+            if result.get("status") == "completed":
+                done.add(result["id"])
+    return done
+
+
+def _ends_with_newline(path):
+    """
+    Returns whether a file is empty or ends with a newline, i.e. whether a
+    record appended to it starts on a line of its own.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+
+def run_prompt(client, assistant_id, record, poller, timeout=None):
+    """
+    Runs a single prompt on a fresh thread and waits for the reply.
+
+    Args:
+        client: The OpenAI client.
+        assistant_id (str): The ID of the assistant.
+        record (dict): The prompt record.
+        poller (RunPoller): The poller used to wait for the run.
+        timeout (float, optional): Seconds to wait for the run.
+
+    Returns:
+        dict: The result record.
+    """
+    started = time.perf_counter()
+    result = {"id": record["id"]}
+    try:
+        thread = client.beta.threads.create(
+            messages=[{"role": "user", "content": record["prompt"]}]
+        )
+        run = client.beta.threads.runs.create(
+            thread_id=thread.id, assistant_id=assistant_id
+        )
+        run = poller.wait(thread.id, run.id, timeout=timeout, cancel_runs=True)
+        result.update(thread_id=thread.id, run_id=run.id, status=run.status)
+        if run.status == "completed":
+            messages = client.beta.threads.messages.list(
+                thread_id=thread.id, order="asc"
+            )
+            result["reply"] = "\n".join(
+                content.text.value
+                for message in messages.data
+                if message.role == "assistant" and message.run_id == run.id
+                for content in message.content
+                if content.type == "text"
+            )
+        elif run.last_error:
+            result["error"] = run.last_error.message
+    except Exception as e:
+        result.setdefault("status", "error")
+        result["error"] = str(e)
+    result["latency"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run_batch(
+    client,
+    assistant_id,
+    input_path,
+    output_path,
+    concurrency=DEFAULT_BATCH_CONCURRENCY,
+    timeout=None,
+    on_result=None,
+):
+    """
+    Runs every prompt of a JSONL file on its own thread, `concurrency` at a
+    time, appending results to `output_path` in completion order.
+
+    Prompts that already completed according to `output_path` are skipped,
+    so an interrupted batch can be resumed by running it again. Only
+    `concurrency` prompts are submitted at a time, so an interrupt (e.g.
+    Ctrl-C) waits for the prompts in flight, records them and starts no others.
+
+    Args:
+        client: The OpenAI client, shared by all workers.
+        assistant_id (str): The ID of the assistant.
+        input_path (str): Path of the prompts JSONL file.
+        output_path (str): Path of the results JSONL file.
+        concurrency (int): Maximum number of prompts in flight.
+        timeout (float, optional): Seconds to wait for each run.
+        on_result (Callable, optional): Called with every result record.
+
+    Returns:
+        dict: Batch statistics: counts, elapsed seconds, throughput and
+        latency percentiles of completed prompts.
+    """
+    done = completed_ids(output_path)
+    pending = [
+        record for record in read_prompts(input_path) if record["id"] not in done
+    ]
+    poller = RunPoller(client)
+    latencies = []
+    statuses = {}
+
+    def record_result(result):
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+        if result["status"] == "completed":
+            latencies.append(result["latency"])
+        if on_result:
+            on_result(result)
+
+    # A partial line left behind by a killed run must not swallow the next record.
+    needs_newline = not _ends_with_newline(output_path)
+    processed = 0
+    started = time.perf_counter()
+    with open(output_path, "a") as output, ThreadPoolExecutor(
+        max_workers=concurrency
+    ) as executor:
+        if needs_newline:
+            output.write("\n")
+        records = iter(pending)
+        in_flight = set()
+        try:
+            while True:
+                for record in records:
+                    in_flight.add(
+                        executor.submit(
+                            run_prompt, client, assistant_id, record, poller, timeout
+                        )
+                    )
+                    if len(in_flight) >= concurrency:
+                        break
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record_result(future.result())
+                    processed += 1
+        except BaseException:
+            # Nothing else is started; prompts already running are finished
+            # and recorded so a resumed batch does not pay for them again.
+            for future in in_flight:
+                if not future.cancel():
+                    record_result(future.result())
+                    processed += 1
+            raise
+    elapsed = time.perf_counter() - started
+
+    return {
+        "skipped": len(done),
+        "processed": processed,
+        "statuses": statuses,
+        "elapsed": round(elapsed, 3),
+        "throughput": round(processed / elapsed, 3) if elapsed else None,
+        "latency": summarize(latencies),
+    }
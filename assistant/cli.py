@@ -0,0 +1,343 @@
+import getpass
+import json
+import os
+import sys
+import time
+
+from .batch import DEFAULT_BATCH_CONCURRENCY, run_batch
+from .config_manager import read_config
+from .thread_store import get_thread_store
+
+# The API wrapper (and with it openai) is imported only once a subcommand
+# actually runs, so building the parser stays cheap.
+
+
+def add_subcommands(parser):
+    """
+    Adds the headless subcommands to the top-level argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The top-level parser.
+    """
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+
+    ask = subparsers.add_parser("ask", help="Send a prompt to an assistant")
+    ask.add_argument("prompt", nargs="*", help="The prompt; read from stdin if omitted")
+    ask.add_argument("--assistant", required=True, help="ID of the assistant")
+    ask.add_argument("--thread", help="ID of an existing thread to continue")
+    ask.add_argument("--json", action="store_true", help="Print the result as JSON")
+    ask.set_defaults(handler=ask_command)
+
+    batch = subparsers.add_parser("batch", help="Run a JSONL file of prompts")
+    batch.add_argument("input", help="JSONL file with one {'prompt', 'id'} per line")
+    batch.add_argument("--assistant", required=True, help="ID of the assistant")
+    batch.add_argument("--output", required=True, help="JSONL file to append results to")
+    batch.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_BATCH_CONCURRENCY,
+        help="Number of prompts in flight",
+    )
+    batch.add_argument("--timeout", type=float, help="Seconds to wait for each run")
+    batch.set_defaults(handler=batch_command)
+
+    threads = subparsers.add_parser("threads", help="Manage threads")
+    threads_commands = threads.add_subparsers(dest="subcommand", required=True)
+    threads_list = threads_commands.add_parser("list", help="List known threads")
+    threads_list.add_argument("--assistant", help="Only list threads of this assistant")
+    threads_list.add_argument("--json", action="store_true", help="Print JSON lines")
+    threads_list.set_defaults(handler=threads_list_command, local=True)
+
+    search = subparsers.add_parser(
+        "search", help="Search the transcripts of past threads locally"
+    )
+    search.add_argument("query", nargs="+", help="Words every matching message contains")
+    search.add_argument("--assistant", help="Only search threads of this assistant")
+    search.add_argument("--limit", type=int, default=20, help="Maximum number of threads")
+    search.add_argument("--json", action="store_true", help="Print JSON lines")
+    search.set_defaults(handler=search_command, local=True)
+
+    stats = subparsers.add_parser(
+        "stats", help="Show latency and token statistics per assistant and model"
+    )
+    stats.add_argument("--assistant", help="Only show runs of this assistant")
+    stats.add_argument("--days", type=float, help="Only show runs of the last DAYS days")
+    stats.add_argument("--json", action="store_true", help="Print JSON lines")
+    stats.set_defaults(handler=stats_command, local=True)
+
+    assistants = subparsers.add_parser("assistants", help="Manage assistants")
+    assistants_commands = assistants.add_subparsers(dest="subcommand", required=True)
+    assistants_list = assistants_commands.add_parser("list", help="List assistants")
+    assistants_list.add_argument("--json", action="store_true", help="Print JSON lines")
+    assistants_list.set_defaults(handler=assistants_list_command)
+
+    files = subparsers.add_parser("files", help="Manage files")
+    files_commands = files.add_subparsers(dest="subcommand", required=True)
+    files_upload = files_commands.add_parser("upload", help="Upload files")
+    files_upload.add_argument("paths", nargs="+", help="Files to upload")
+    files_upload.add_argument("--assistant", help="Attach the files to this assistant")
+    files_upload.add_argument("--json", action="store_true", help="Print JSON lines")
+    files_upload.set_defaults(handler=files_upload_command)
+    files_ingest = files_commands.add_parser(
+        "ingest", help="Upload a directory, skipping content uploaded before"
+    )
+    files_ingest.add_argument("path", help="A directory or a glob")
+    files_ingest.add_argument("--assistant", help="Attach the files to this assistant")
+    files_ingest.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    files_ingest.set_defaults(handler=files_ingest_command)
+
+
+def run_command(args):
+    """
+    Runs a headless subcommand. Subcommands that only read local stores
+    (`local=True`) are run without an API wrapper, so they need no API key.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        int: The process exit code.
+    """
+    try:
+        api = None if getattr(args, "local", False) else _headless_api()
+        return args.handler(api, args) or 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+def _headless_api():
+    """
+    Builds an API wrapper from OPENAI_API_KEY or the saved configuration.
+    """
+    from .api_wrapper import AssistantAPIWrapper
+
+    config = read_config() or {}
+    api_key = _api_key(config)
+    if not api_key:
+        raise RuntimeError(
+            "No API key found. Set OPENAI_API_KEY or run `python -m assistant` once."
+        )
+    return AssistantAPIWrapper(api_key, config.get("name") or getpass.getuser())
+
+
+def _api_key(config):
+    """
+    Returns OPENAI_API_KEY, or the API key of the saved configuration.
+    """
+    return os.environ.get("OPENAI_API_KEY") or config.get("api_key")
+
+
+def _print_records(records, as_json, columns):
+    """
+    Prints records as JSON lines or as tab-separated columns.
+    """
+    for record in records:
+        if as_json:
+            print(json.dumps(record))
+        else:
+            print("\t".join(str(record.get(column) or "") for column in columns))
+
+
+def _show_progress(args):
+    """
+    Whether to show progress bars: only for a person watching, i.e. when
+    stdout is a terminal and no machine-readable output was asked for.
+    """
+    return not getattr(args, "json", False) and sys.stdout.isatty()
+
+
+def _message_text(message):
+    """
+    Returns the concatenated text parts of a message.
+    """
+    return "".join(
+        content.text.value for content in message.content if content.type == "text"
+    )
+
+
+def ask_command(api, args):
+    """
+    Adds a prompt to a thread, runs the assistant and prints its reply.
+    The reply is streamed to stdout, or printed as one JSON object with --json.
+    """
+    from openai import AssistantEventHandler
+
+    from .api_wrapper import StdoutEventHandler
+
+    prompt = " ".join(args.prompt) if args.prompt else sys.stdin.read()
+    if not prompt.strip():
+        raise ValueError("Empty prompt")
+
+    api.assistant = api.get_assistants(args.assistant)
+    if args.thread:
+        api.thread = api.get_thread(args.thread)
+    else:
+        api.create_thread()
+        get_thread_store().add(
+            {
+                "assistant": api.assistant.id,
+                "thread": api.thread.id,
+                "thread_name": prompt.strip().splitlines()[0][:40],
+                "user": api.username,
+            }
+        )
+    api.add_message_to_thread(prompt)
+
+    handler = AssistantEventHandler() if args.json else StdoutEventHandler()
+    stream = api.send_message_and_stream(event_handler=handler)
+
+    if args.json:
+        run = stream.get_final_run()
+        print(
+            json.dumps(
+                {
+                    "thread_id": api.thread.id,
+                    "run_id": run.id,
+                    "status": run.status,
+                    "reply": "\n".join(
+                        _message_text(message)
+                        for message in stream.get_final_messages()
+                    ),
+                }
+            )
+        )
+
+
+def batch_command(api, args):
+    """
+    Runs a batch of prompts and prints its statistics as JSON.
+    Progress is reported on stderr.
+    """
+
+    def report(result):
+        print(f"{result['id']}: {result['status']}", file=sys.stderr)
+
+    stats = run_batch(
+        api.client,
+        args.assistant,
+        args.input,
+        args.output,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        on_result=report,
+    )
+    print(json.dumps(stats))
+
+
+def threads_list_command(api, args):
+    """
+    Prints the threads recorded in the local thread history.
+    """
+    store = get_thread_store()
+    records = store.list_threads(args.assistant) if args.assistant else store.all()
+    _print_records(records, args.json, ["thread", "assistant", "thread_name"])
+
+
+def search_command(api, args):
+    """
+    Prints the threads whose messages best match a query, with a snippet of
+    the best matching message. Only the local search index is read.
+    """
+    from .search_index import get_search_index
+
+    hits = get_search_index().search(
+        " ".join(args.query), limit=args.limit, assistant_id=args.assistant
+    )
+    _print_records(
+        ({**hit, "snippet": " ".join(hit["snippet"].split())} for hit in hits),
+        args.json,
+        ["thread", "thread_name", "snippet"],
+    )
+
+
+def stats_command(api, args):
+    """
+    Prints per-assistant and per-model run statistics from the local
+    metrics store, as a table or as JSON lines with --json.
+    """
+    from .run_metrics import get_metrics_store, print_stats
+
+    since = time.time() - args.days * 86400 if args.days else None
+    stats = get_metrics_store().stats(args.assistant, since)
+    if args.json:
+        _print_records(stats, True, [])
+    else:
+        print_stats(stats, _assistant_names())
+
+
+def _assistant_names():
+    """
+    Returns the names of the assistants in the local catalogue of the
+    configured API key, by ID. The API is not called.
+    """
+    from .assistant_catalogue import get_assistant_catalogue
+
+    api_key = _api_key(read_config() or {})
+    if not api_key:
+        return {}
+    return {
+        assistant.id: assistant.name
+        for assistant in get_assistant_catalogue(api_key).all()
+    }
+
+
+def assistants_list_command(api, args):
+    """
+    Prints every assistant of the account.
+    """
+    records = (
+        {"id": assistant.id, "name": assistant.name, "model": assistant.model}
+        for assistant in api.iter_assistants(prefetch=True)
+    )
+    _print_records(records, args.json, ["id", "name", "model"])
+
+
+def files_upload_command(api, args):
+    """
+    Uploads files and optionally attaches them to an assistant.
+    """
+    from .uploads import create_progress, upload_file
+
+    with create_progress(enabled=_show_progress(args)) as progress:
+        for path in args.paths:
+            uploaded = upload_file(api.client, path, progress=progress)
+            api.file_cache.put(uploaded)
+            if args.assistant:
+                api.client.beta.assistants.files.create(
+                    assistant_id=args.assistant, file_id=uploaded.id
+                )
+            _print_records(
+                [{"id": uploaded.id, "filename": uploaded.filename, "path": path}],
+                args.json,
+                ["id", "filename"],
+            )
+
+
+def files_ingest_command(api, args):
+    """
+    Uploads a directory or glob, skipping content uploaded before, and
+    optionally attaches the files to an assistant.
+    """
+    from .ingest import ingest, print_ingest_summary
+    from .uploads import create_progress
+
+    attached = []
+    if args.assistant:
+        attached = [
+            file.id
+            for file in api.client.beta.assistants.files.list(assistant_id=args.assistant)
+        ]
+    summary = ingest(
+        api.client,
+        args.path,
+        assistant_id=args.assistant,
+        attached_file_ids=attached,
+        file_cache=api.file_cache,
+        progress=create_progress(enabled=_show_progress(args)),
+    )
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print_ingest_summary(summary)
+    return 1 if summary["failed"] else 0
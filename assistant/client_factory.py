@@ -0,0 +1,124 @@
+import importlib.util
+import os
+import threading
+
+import httpx
+
+from .rate_limiter import (
+    AsyncRateLimitedTransport,
+    RateLimitedTransport,
+    get_request_scheduler,
+)
+from .tracing import AsyncTracingTransport, TracingTransport, get_tracer
+
+# Upper bound on open connections to the API.
+MAX_CONNECTIONS = int(os.environ.get("ASSISTANT_GPT_MAX_CONNECTIONS", 20))
+# Idle connections kept open for reuse, and for how many seconds.
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("ASSISTANT_GPT_MAX_KEEPALIVE", 10))
+KEEPALIVE_EXPIRY = float(os.environ.get("ASSISTANT_GPT_KEEPALIVE_EXPIRY", 60))
+# Seconds allowed to open a connection and to wait for a response. Runs are
+# streamed, so reads may legitimately take minutes.
+CONNECT_TIMEOUT = float(os.environ.get("ASSISTANT_GPT_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.environ.get("ASSISTANT_GPT_READ_TIMEOUT", 600))
+# Whether to negotiate HTTP/2; it is only used when `h2` is installed.
+HTTP2 = os.environ.get("ASSISTANT_GPT_HTTP2", "1") != "0"
+
+HTTP_TIMEOUT = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+HTTP_LIMITS = httpx.Limits(
+    max_connections=MAX_CONNECTIONS,
+    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=KEEPALIVE_EXPIRY,
+)
+
+_lock = threading.Lock()
+_http_client = None
+_async_http_client = None
+
+
+def http2_enabled():
+    """
+    Returns whether connections negotiate HTTP/2: it is wanted and the
+    optional `h2` package is installed.
+    """
+    return HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def get_http_client():
+    """
+    Returns the process-wide httpx client, creating it on first use.
+
+    Every sync OpenAI client shares its connection pool, so calls reuse warm
+    TLS connections. Requests go through the request scheduler, which owns
+    throttling and retries, and every attempt is timed by the tracer.
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            transport = httpx.HTTPTransport(limits=HTTP_LIMITS, http2=http2_enabled())
+            _http_client = httpx.Client(
+                transport=RateLimitedTransport(
+                    get_request_scheduler(), TracingTransport(get_tracer(), transport)
+                ),
+                timeout=HTTP_TIMEOUT,
+            )
+        return _http_client
+
+
+def get_async_http_client():
+    """
+    Returns the process-wide async httpx client, creating it on first use.
+
+    Its connections belong to the event loop they were opened on, so it is
+    meant for the loop shared by the async wrappers (see `run_sync`).
+    """
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None:
+            transport = httpx.AsyncHTTPTransport(
+                limits=HTTP_LIMITS, http2=http2_enabled()
+            )
+            _async_http_client = httpx.AsyncClient(
+                transport=AsyncRateLimitedTransport(
+                    get_request_scheduler(),
+                    AsyncTracingTransport(get_tracer(), transport),
+                ),
+                timeout=HTTP_TIMEOUT,
+            )
+        return _async_http_client
+
+
+def create_client(api_key, base_url=None):
+    """
+    Returns an OpenAI client on the shared connection pool.
+
+    Args:
+        api_key (str): The OpenAI API key.
+        base_url (str, optional): The API to talk to. Defaults to
+            `OPENAI_BASE_URL` or the OpenAI API.
+    """
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key=api_key, base_url=base_url, max_retries=0, http_client=get_http_client()
+    )
+
+
+def create_async_client(api_key, base_url=None, http_client=None):
+    """
+    Returns an AsyncOpenAI client on the shared async connection pool.
+
+    Args:
+        api_key (str): The OpenAI API key.
+        base_url (str, optional): The API to talk to. Defaults to
+            `OPENAI_BASE_URL` or the OpenAI API.
+        http_client (httpx.AsyncClient, optional): A client to use instead
+            of the shared one.
+    """
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=0,
+        http_client=http_client or get_async_http_client(),
+    )
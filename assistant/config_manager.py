@@ -1,27 +1,76 @@
 import json
 import os
+import tempfile
+import time
 from .error_handling import handleError
+from .ui_utils import logger
 
 # Path to the configuration file
 CONFIG_FILE = os.path.expanduser("~/.assistant-gpt-key.json")
+# Seconds a successful API key check is trusted before the key is checked again.
+KEY_VALIDATION_TTL = float(os.environ.get("ASSISTANT_GPT_KEY_TTL", 24 * 3600))
 
 
-def save_config(api_key, name):
+def _write_config(config):
+    """
+    Writes the configuration atomically, so a concurrent reader never sees
+    a partial file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(CONFIG_FILE))
+    with os.fdopen(fd, "w") as config_file:
+        json.dump(config, config_file)
+    os.replace(tmp_path, CONFIG_FILE)
+
+
+def save_config(api_key, name, validated_at=None):
     """
     Saves the configuration to a JSON file.
 
     Args:
         api_key (str): The API key to be saved.
         name (str): The name associated with the API key.
+        validated_at (float, optional): When the key was last found valid.
     """
     config = {"api_key": api_key, "name": name}
+    if validated_at is not None:
+        config["validated_at"] = validated_at
     try:
-        with open(CONFIG_FILE, "w") as config_file:
-            json.dump(config, config_file)
+        _write_config(config)
     except Exception as e:
         handleError(e, "Error saving configuration")
 
 
+def mark_api_key_validated(api_key):
+    """
+    Records that the saved API key was just found valid. Nothing is recorded
+    if the saved key has changed since the check started. Meant for
+    background checks, so failures are logged instead of shown.
+
+    Args:
+        api_key (str): The API key that was checked.
+    """
+    config = read_config()
+    if config is None or config.get("api_key") != api_key:
+        return
+    config["validated_at"] = time.time()
+    try:
+        _write_config(config)
+    except OSError as e:
+        logger.info(f"Could not record the API key check: {e}")
+
+
+def is_api_key_validated(config):
+    """
+    Returns whether the key of a configuration was found valid within the
+    last KEY_VALIDATION_TTL seconds.
+
+    Args:
+        config (dict): The configuration.
+    """
+    validated_at = config.get("validated_at")
+    return validated_at is not None and time.time() - validated_at < KEY_VALIDATION_TTL
+
+
 def read_config():
     """
     Reads the configuration from a JSON file.
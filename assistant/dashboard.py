@@ -1,7 +1,9 @@
 import inquirer
 from .api_wrapper import AssistantAPIWrapper
-from .ui_utils import app_exit, clear_screen
+from .router import goto
+from .ui_utils import app_exit, clear_screen, console, welcome_user
 from .assistant_operations import create_assistant, select_assistant
+from .thread_management import search_threads
 
 
 def dashboard(api: AssistantAPIWrapper):
@@ -13,27 +15,44 @@ def dashboard(api: AssistantAPIWrapper):
         api (AssistantAPIWrapper): An instance of the API wrapper to interact with the backend.
     """
     clear_screen()
-    manage_dashboard_options(api)
+    welcome_user(api.username)
+    if api.api_key_valid is False:
+        console.print(
+            "[bold red]Your API key was rejected. You will be asked for a new one "
+            "the next time you start the app.[/bold red]"
+        )
+    return manage_dashboard_options(api)
 
 
 def manage_dashboard_options(api: AssistantAPIWrapper):
     """
-    Manages the options in the dashboard for creating, selecting, or quitting the application.
+    Manages the options in the dashboard for creating, selecting, searching
+    conversations, showing run statistics, or quitting the application.
 
     Args:
         api (AssistantAPIWrapper): An instance of the API wrapper.
     """
-    options = ["Create a new assistant", "Manage an existent assistant", "Quit"]
+    options = [
+        "Create a new assistant",
+        "Manage an existent assistant",
+        "Search conversations",
+        "Run statistics",
+        "Quit",
+    ]
     selected_option = inquirer.list_input(
         "Please select an option", choices=options, carousel=True
     )
 
     if selected_option == options[0]:
-        handle_create_new_assistant(api)
+        return handle_create_new_assistant(api)
     elif selected_option == options[1]:
-        handle_manage_existing_assistant(api)
+        return handle_manage_existing_assistant(api)
     elif selected_option == options[2]:
-        handle_app_quit()
+        return handle_search_conversations(api)
+    elif selected_option == options[3]:
+        return handle_run_statistics(api)
+    elif selected_option == options[4]:
+        return handle_app_quit()
 
 
 def handle_create_new_assistant(api: AssistantAPIWrapper):
@@ -43,8 +62,7 @@ def handle_create_new_assistant(api: AssistantAPIWrapper):
     Args:
         api (AssistantAPIWrapper): An instance of the API wrapper.
     """
-    create_assistant(api)
-    clear_screen()
+    return goto(create_assistant, api)
 
 
 def handle_manage_existing_assistant(api: AssistantAPIWrapper):
@@ -54,8 +72,49 @@ def handle_manage_existing_assistant(api: AssistantAPIWrapper):
     Args:
         api (AssistantAPIWrapper): An instance of the API wrapper.
     """
-    select_assistant(api)
+    return goto(select_assistant, api)
+
+
+def handle_search_conversations(api: AssistantAPIWrapper):
+    """
+    Handles the search of past conversations.
+
+    Args:
+        api (AssistantAPIWrapper): An instance of the API wrapper.
+    """
+    return goto(search_threads, api)
+
+
+def handle_run_statistics(api: AssistantAPIWrapper):
+    """
+    Handles showing the latency and token statistics of past runs.
+
+    Args:
+        api (AssistantAPIWrapper): An instance of the API wrapper.
+    """
+    return goto(show_run_statistics, api)
+
+
+def show_run_statistics(api: AssistantAPIWrapper):
+    """
+    Displays percentiles of time to first token, run time and tokens per
+    second, and token totals, per assistant and model. Only the local
+    metrics store is read.
+
+    Args:
+        api (AssistantAPIWrapper): An instance of the API wrapper.
+    """
+    from .run_metrics import print_stats
+
     clear_screen()
+    stats = api.metrics.stats()
+    if stats:
+        names = {assistant.id: assistant.name for assistant in api.catalogue.all()}
+        print_stats(stats, names)
+    else:
+        console.print("[yellow]No runs recorded yet.[/yellow]")
+    input("Press enter to continue...")
+    return goto(dashboard, api)
 
 
 def handle_app_quit():
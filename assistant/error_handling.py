@@ -1,16 +1,23 @@
 from typing import Callable, Any
+from .router import Route, goto
 from .ui_utils import clear_screen, console
 
 
-def handleError(exception: Exception, recovery_function: Callable, args: list = None):
+def handleError(
+    exception: Exception, recovery_function: Callable, args: list = None
+) -> Route:
     """
-    Handles exceptions by displaying an error message and then calling a recovery function.
+    Handles exceptions by displaying an error message and returning the route
+    to a recovery function.
 
     Args:
         exception (Exception): The exception that occurred.
         recovery_function (Callable): A function to call to recover from the error.
         args (list, optional): A list of arguments to pass to the recovery function. Defaults to None.
 
+    Returns:
+        Route: The route to the recovery function, for the caller to return.
+
     Note:
         The recovery function is intended to be a screen or similar callable that can reset the
         user's context and allow them to continue using the application after an error.
@@ -21,8 +28,8 @@ def handleError(exception: Exception, recovery_function: Callable, args: list =
     # Wait for user acknowledgment
     input("Press enter to continue...")
 
-    # Clear the screen and call the recovery function
+    # Clear the screen and hand the recovery function back to the router
     clear_screen()
     if args is None:
         args = []
-    recovery_function(*args)
+    return goto(recovery_function, *args)
@@ -0,0 +1,83 @@
+import threading
+import time
+
+# How long resolved file metadata is trusted before it is fetched again.
+DEFAULT_FILE_METADATA_TTL = 300
+
+
+class FileMetadataCache:
+    """
+    An in-process map of file ID to file metadata with TTL eviction.
+
+    The cache only stores what the API returned; resolving missing IDs is
+    left to the API wrapper so that the same cache can back every lookup.
+    """
+
+    def __init__(self, ttl=DEFAULT_FILE_METADATA_TTL):
+        """
+        Args:
+            ttl (float): Seconds an entry stays valid after it was stored.
+        """
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, file_id):
+        """
+        Returns the cached metadata for a file, or None if absent or expired.
+
+        Args:
+            file_id (str): The ID of the file.
+        """
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is None:
+                return None
+            stored_at, file = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[file_id]
+                return None
+            return file
+
+    def put(self, file):
+        """
+        Stores the metadata of a single file object.
+
+        Args:
+            file: A file object as returned by the files API.
+        """
+        self.put_many([file])
+
+    def put_many(self, files):
+        """
+        Stores the metadata of several file objects at once.
+
+        Args:
+            files: An iterable of file objects.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for file in files:
+                self._entries[file.id] = (now, file)
+
+    def missing(self, file_ids):
+        """
+        Returns the IDs from `file_ids` that have no valid cache entry.
+
+        Args:
+            file_ids (Iterable[str]): The IDs to check.
+        """
+        return [file_id for file_id in file_ids if self.get(file_id) is None]
+
+    def invalidate(self, file_id=None):
+        """
+        Drops a single entry, or the whole cache when no ID is given.
+
+        Args:
+            file_id (str, optional): The ID of the file to forget.
+        """
+        with self._lock:
+            if file_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(file_id, None)
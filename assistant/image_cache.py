@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .paths import cache_dir
+from .ui_utils import logger
+
+# Disk space the image cache may use before least recently used images go.
+IMAGE_CACHE_MAX_BYTES = (
+    int(os.environ.get("ASSISTANT_GPT_IMAGE_CACHE_MB", 256)) * 1024 * 1024
+)
+# Number of images downloaded in parallel in the background.
+IMAGE_DOWNLOAD_WORKERS = 4
+
+
+class ImageCache:
+    """
+    A content-addressed disk cache for images produced by assistants.
+
+    Images are stored once per content hash as `<sha256>.png`, and an index
+    maps file IDs to hashes. The modification time of an image is bumped
+    whenever it is read, and the least recently used images are evicted once
+    the cache grows beyond `max_bytes`. The directory is scanned once per
+    process; after that, sizes and recency are tracked in memory. The image
+    stored last is never evicted, so one image larger than `max_bytes` is
+    still kept until the next one arrives.
+    """
+
+    def __init__(self, directory=None, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        """
+        Args:
+            directory (str, optional): Where to keep the images. Defaults to
+                the `images` directory of the application cache.
+            max_bytes (int): Size the cache is trimmed down to.
+        """
+        self.directory = directory or cache_dir("images")
+        self.max_bytes = max_bytes
+        self._index_path = os.path.join(self.directory, "index.json")
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=IMAGE_DOWNLOAD_WORKERS)
+        self._pending = {}
+        # Content hash -> size of the images on disk, least recently used
+        # first, and their total size. Loaded on first use.
+        self._blobs = None
+        self._total_bytes = 0
+        try:
+            with open(self._index_path, "r") as file:
+                self._index = json.load(file)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.directory, f"{content_hash}.png")
+
+    def path_for(self, file_id):
+        """
+        Returns the local path of a cached image, or None if it is not cached.
+
+        Args:
+            file_id (str): The ID of the image file.
+        """
+        with self._lock:
+            content_hash = self._index.get(file_id)
+        if content_hash is None:
+            return None
+        path = self._blob_path(content_hash)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        with self._lock:
+            blobs = self._blobs_locked()
+            if content_hash in blobs:
+                blobs.move_to_end(content_hash)
+        return path
+
+    def store(self, file_id, content):
+        """
+        Adds an image to the cache and returns its local path.
+
+        Args:
+            file_id (str): The ID of the image file.
+            content (bytes): The image data.
+        """
+        content_hash = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(content_hash)
+        if not os.path.exists(path):
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, "wb") as file:
+                file.write(content)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            blobs = self._blobs_locked()
+            if content_hash not in blobs:
+                blobs[content_hash] = len(content)
+                self._total_bytes += len(content)
+            blobs.move_to_end(content_hash)
+            self._index[file_id] = content_hash
+            self._evict_locked()
+            self._save_index_locked()
+        return path
+
+    def fetch_async(self, file_id, download, on_ready=None):
+        """
+        Downloads an image in the background unless it is already cached or
+        being downloaded.
+
+        Args:
+            file_id (str): The ID of the image file.
+            download (Callable): Returns the image data when called.
+            on_ready (Callable, optional): Called with the local path once
+                the image is in the cache.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the local path.
+        """
+
+        def fetch():
+            path = self.path_for(file_id) or self.store(file_id, download())
+            if on_ready:
+                on_ready(path)
+            return path
+
+        def done(future):
+            with self._lock:
+                self._pending.pop(file_id, None)
+            if future.exception():
+                logger.error(f"Error downloading image {file_id}: {future.exception()}")
+
+        with self._lock:
+            if file_id in self._pending:
+                return self._pending[file_id]
+            future = self._executor.submit(fetch)
+            self._pending[file_id] = future
+        future.add_done_callback(done)
+        return future
+
+    def _blobs_locked(self):
+        """
+        Returns the images on disk by content hash, scanning the directory
+        on first use.
+        """
+        if self._blobs is None:
+            blobs = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(".png"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                blobs.append((stat.st_mtime, name[: -len(".png")], stat.st_size))
+            self._blobs = OrderedDict(
+                (content_hash, size) for _, content_hash, size in sorted(blobs)
+            )
+            self._total_bytes = sum(self._blobs.values())
+        return self._blobs
+
+    def _evict_locked(self):
+        """
+        Removes least recently used images, except the most recent one,
+        until the cache fits `max_bytes`.
+        """
+        blobs = self._blobs_locked()
+        evicted = set()
+        while self._total_bytes > self.max_bytes and len(blobs) > 1:
+            content_hash, size = blobs.popitem(last=False)
+            try:
+                os.remove(self._blob_path(content_hash))
+            except FileNotFoundError:
+                pass
+            evicted.add(content_hash)
+            self._total_bytes -= size
+
+        if evicted:
+            self._index = {
+                file_id: content_hash
+                for file_id, content_hash in self._index.items()
+                if content_hash not in evicted
+            }
+
+    def _save_index_locked(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "w") as file:
+            json.dump(self._index, file)
+        os.replace(tmp_path, self._index_path)
+
+
+_cache = None
+
+
+def get_image_cache():
+    """
+    Returns the process-wide image cache, creating it on first use.
+    """
+    global _cache
+    if _cache is None:
+        _cache = ImageCache()
+    return _cache
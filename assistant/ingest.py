@@ -0,0 +1,232 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import openai
+from rich.table import Table
+
+from .ui_utils import console
+from .uploads import create_progress, upload_file
+
+# Maps content hashes to the IDs of files already uploaded with that content.
+FILE_INDEX = os.path.expanduser("~/.assistant-gpt-file-index.json")
+# Number of files hashed or uploaded at the same time.
+INGEST_WORKERS = int(os.environ.get("ASSISTANT_GPT_INGEST_WORKERS", 4))
+
+
+class FileHashIndex:
+    """
+    A local map of SHA-256 content hash to uploaded file, used to skip
+    uploading content that is already on the account.
+    """
+
+    def __init__(self, path=FILE_INDEX):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r") as file:
+                self._entries = json.load(file)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, content_hash):
+        """
+        Returns the `{"file_id", "filename"}` entry for a hash, or None.
+        """
+        with self._lock:
+            return self._entries.get(content_hash)
+
+    def put(self, content_hash, file):
+        """
+        Records an uploaded file and saves the index.
+        """
+        with self._lock:
+            self._entries[content_hash] = {"file_id": file.id, "filename": file.filename}
+            self._save_locked()
+
+    def remove(self, content_hash):
+        """
+        Forgets the file of a hash, e.g. because it was deleted remotely.
+        """
+        with self._lock:
+            if self._entries.pop(content_hash, None) is not None:
+                self._save_locked()
+
+    def _save_locked(self):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path))
+        with os.fdopen(fd, "w") as index_file:
+            json.dump(self._entries, index_file)
+        os.replace(tmp_path, self.path)
+
+
+def collect_paths(pattern):
+    """
+    Expands a directory (walked recursively) or a glob into file paths,
+    skipping hidden files and directories.
+
+    Args:
+        pattern (str): A directory or a glob such as `docs/**/*.md`.
+
+    Returns:
+        list: The sorted file paths.
+    """
+    pattern = os.path.expanduser(pattern)
+    if os.path.isdir(pattern):
+        paths = []
+        for root, dirs, files in os.walk(pattern):
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            paths.extend(
+                os.path.join(root, name) for name in files if not name.startswith(".")
+            )
+    else:
+        paths = [path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)]
+    return sorted(paths)
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """
+    Returns the SHA-256 hex digest of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ingest(
+    client,
+    pattern,
+    assistant_id=None,
+    attached_file_ids=(),
+    index=None,
+    file_cache=None,
+    progress=None,
+):
+    """
+    Uploads every file matching `pattern` whose content has not been uploaded
+    before, and attaches the files to an assistant.
+
+    Files are hashed locally first; content found in the hash index, or seen
+    earlier in the same run, is not uploaded again. An indexed file that
+    turns out to be deleted from the account is dropped from the index and
+    uploaded again. Uploads and attachments run concurrently.
+
+    Args:
+        client: The OpenAI client.
+        pattern (str): A directory or a glob.
+        assistant_id (str, optional): The assistant to attach the files to.
+        attached_file_ids (Iterable[str]): Files already attached to it.
+        index (FileHashIndex, optional): The hash index to use.
+        file_cache (FileMetadataCache, optional): Cache to record uploaded
+            files in.
+        progress (rich.progress.Progress, optional): The progress display to
+            show uploads in, e.g. a disabled one for scripts. Defaults to a
+            new one.
+
+    Returns:
+        dict: Lists of `uploaded`, `attached`, `skipped` and `failed` entries
+        plus `bytes` uploaded and `elapsed` seconds.
+    """
+    index = index or FileHashIndex()
+    attached_file_ids = set(attached_file_ids)
+    started = time.perf_counter()
+    summary = {"uploaded": [], "attached": [], "skipped": [], "failed": []}
+    uploaded_bytes = 0
+
+    paths = collect_paths(pattern)
+    with ThreadPoolExecutor(max_workers=INGEST_WORKERS) as executor:
+        hashes = list(executor.map(hash_file, paths))
+
+    # One job per distinct content; later paths with the same content are skipped.
+    jobs = {}
+    for path, content_hash in zip(paths, hashes):
+        if content_hash in jobs:
+            summary["skipped"].append({"path": path, "reason": "duplicate"})
+        else:
+            jobs[content_hash] = path
+
+    def upload(content_hash, path):
+        uploaded = upload_file(client, path, progress=progress)
+        index.put(content_hash, uploaded)
+        if file_cache is not None:
+            file_cache.put(uploaded)
+        return uploaded, {"file_id": uploaded.id, "filename": uploaded.filename}
+
+    def file_exists(file_id):
+        try:
+            client.files.retrieve(file_id)
+        except openai.NotFoundError:
+            return False
+        return True
+
+    def process(content_hash, path):
+        entry = index.get(content_hash)
+        uploaded = None
+        if entry is None:
+            uploaded, entry = upload(content_hash, path)
+        attached = False
+        if assistant_id and entry["file_id"] not in attached_file_ids:
+            try:
+                client.beta.assistants.files.create(
+                    assistant_id=assistant_id, file_id=entry["file_id"]
+                )
+            except openai.NotFoundError:
+                # Only a file from the index can be gone; the assistant may be.
+                if uploaded is not None or file_exists(entry["file_id"]):
+                    raise
+                index.remove(content_hash)
+                uploaded, entry = upload(content_hash, path)
+                client.beta.assistants.files.create(
+                    assistant_id=assistant_id, file_id=entry["file_id"]
+                )
+            attached = True
+        return entry, uploaded, attached
+
+    with progress or create_progress() as progress, ThreadPoolExecutor(
+        max_workers=INGEST_WORKERS
+    ) as executor:
+        futures = {
+            executor.submit(process, content_hash, path): path
+            for content_hash, path in jobs.items()
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                entry, uploaded, attached = future.result()
+            except Exception as e:
+                summary["failed"].append({"path": path, "error": str(e)})
+                continue
+            record = {"path": path, "file_id": entry["file_id"]}
+            if uploaded:
+                summary["uploaded"].append(record)
+                uploaded_bytes += os.path.getsize(path)
+            else:
+                summary["skipped"].append({**record, "reason": "already uploaded"})
+            if attached:
+                summary["attached"].append(record)
+
+    summary["bytes"] = uploaded_bytes
+    summary["elapsed"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def print_ingest_summary(summary):
+    """
+    Prints the outcome of `ingest` as a table, followed by any failures.
+    """
+    table = Table(title="Ingest summary")
+    table.add_column("Result")
+    table.add_column("Files", justify="right")
+    for key in ("uploaded", "attached", "skipped", "failed"):
+        table.add_row(key.capitalize(), str(len(summary[key])))
+    table.add_row("MB uploaded", f"{summary['bytes'] / (1024 * 1024):.1f}")
+    table.add_row("Seconds", f"{summary['elapsed']:.1f}")
+    console.print(table)
+    for failure in summary["failed"]:
+        console.print(f"[bold red]{failure['path']}: {failure['error']}[/bold red]")
@@ -0,0 +1,79 @@
+import os
+
+# Messages kept in memory per thread; older ones are fetched again on demand.
+MAX_STORED_MESSAGES = int(os.environ.get("ASSISTANT_GPT_MAX_STORED_MESSAGES", 200))
+
+
+def is_settled(message):
+    """
+    Returns whether a message is final. A message of a run that is still
+    streaming is `in_progress` and its text is partial.
+    """
+    return getattr(message, "status", None) != "in_progress"
+
+
+def settled_prefix(messages):
+    """
+    Returns the messages before the first unsettled one.
+
+    Args:
+        messages (list): Messages in ascending creation order.
+    """
+    for index, message in enumerate(messages):
+        if not is_settled(message):
+            return messages[:index]
+    return messages
+
+
+class MessageStore:
+    """
+    A local, chronologically ordered copy of the most recent messages of one
+    thread.
+
+    The store remembers the newest message ID it has seen so that refreshes
+    only need to ask the API for messages created after it. It holds at most
+    `max_messages`; `has_older` tells whether the thread has messages before
+    the oldest one kept.
+
+    Only settled messages may be appended: the store never asks for a message
+    again once its ID is behind `last_message_id`.
+    """
+
+    def __init__(self, thread_id, max_messages=MAX_STORED_MESSAGES):
+        """
+        Args:
+            thread_id (str): The ID of the thread the messages belong to.
+            max_messages (int): How many messages to keep at most.
+        """
+        self.thread_id = thread_id
+        self.max_messages = max_messages
+        self.messages = []
+        self.last_message_id = None
+        self.has_older = False
+
+    def append(self, messages):
+        """
+        Appends messages that are newer than everything already stored,
+        dropping the oldest ones beyond `max_messages`.
+
+        Args:
+            messages (list): Messages in ascending creation order.
+        """
+        for message in messages:
+            self.messages.append(message)
+            self.last_message_id = message.id
+        if len(self.messages) > self.max_messages:
+            del self.messages[: -self.max_messages]
+            self.has_older = True
+
+    def index(self, message_id):
+        """
+        Returns the position of a stored message, or None.
+        """
+        for index, message in enumerate(self.messages):
+            if message.id == message_id:
+                return index
+        return None
+
+    def __len__(self):
+        return len(self.messages)
@@ -0,0 +1,18 @@
+import os
+
+
+def cache_dir(*parts):
+    """
+    Returns a directory under the user's XDG cache directory, creating it
+    if needed.
+
+    Args:
+        *parts (str): Path components below the application cache directory.
+
+    Returns:
+        str: The absolute path of the directory.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    path = os.path.join(base, "assistant-gpt", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,40 @@
+import math
+
+
+def percentile(values, pct):
+    """
+    Returns the `pct`th percentile of `values` using the nearest-rank method.
+
+    Args:
+        values (Sequence[float]): The sample; does not need to be sorted.
+        pct (float): The percentile, between 0 and 100.
+
+    Returns:
+        float or None: The percentile, or None for an empty sample.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values, percentiles=(50, 90, 99)):
+    """
+    Summarises a sample with its count, mean, max and a few percentiles.
+
+    Args:
+        values (Sequence[float]): The sample.
+        percentiles (Iterable[float]): The percentiles to include.
+
+    Returns:
+        dict: Keys `count`, `mean`, `max` and `p<N>` for every percentile.
+    """
+    summary = {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        "max": max(values) if values else None,
+    }
+    for pct in percentiles:
+        summary[f"p{pct}"] = percentile(values, pct)
+    return summary
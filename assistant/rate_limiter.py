@@ -0,0 +1,395 @@
+import asyncio
+import email.utils
+import os
+import random
+import re
+import threading
+import time
+
+import httpx
+
+from .ui_utils import logger
+
+# Client-side limits; an unset or zero tokens-per-minute limit disables it.
+REQUESTS_PER_MINUTE = int(os.environ.get("ASSISTANT_GPT_RPM", 500))
+TOKENS_PER_MINUTE = int(os.environ.get("ASSISTANT_GPT_TPM", 0))
+# Retry policy for rate-limited, overloaded and failed requests.
+MAX_RETRIES = int(os.environ.get("ASSISTANT_GPT_MAX_RETRIES", 5))
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+# Methods that can be sent twice without doing the work twice.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Errors raised before the request reached the server.
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value):
+    """
+    Parses durations as sent in rate-limit reset headers, e.g. "1s", "6m0s"
+    or "20ms".
+
+    Returns:
+        float or None: The duration in seconds, or None if it cannot be parsed.
+    """
+    parts = _DURATION_PART.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_retry_after(headers):
+    """
+    Reads how long the server asked us to wait from `retry-after-ms` or
+    `retry-after` (seconds or an HTTP date).
+
+    Returns:
+        float or None: The delay in seconds, or None if no usable header is set.
+    """
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        date = email.utils.parsedate_to_datetime(retry_after)
+        return max(0.0, date.timestamp() - time.time()) if date else None
+
+
+def can_resend(request, error):
+    """
+    Returns whether a request that failed at the transport level may be
+    sent again. A POST (creating a run, a message or an upload part) may
+    have been accepted before a read error, so it is only resent when it
+    never reached the server or carries an idempotency key.
+
+    Args:
+        request (httpx.Request): The request.
+        error (httpx.TransportError): The error it failed with.
+    """
+    return (
+        request.method in IDEMPOTENT_METHODS
+        or isinstance(error, CONNECT_ERRORS)
+        or "idempotency-key" in request.headers
+    )
+
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously at `per_minute` tokens a minute.
+
+    Callers reserve tokens up front and are told how long to wait before
+    using them, which lets sync and async callers share one bucket.
+    """
+
+    def __init__(self, per_minute):
+        """
+        Args:
+            per_minute (float): Refill rate and capacity of the bucket.
+        """
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill_locked(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount=1):
+        """
+        Takes `amount` tokens, going into debt if needed.
+
+        Returns:
+            float: Seconds to wait before the reserved tokens may be used.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill_locked(now)
+            self.tokens -= min(amount, self.capacity)
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def sync(self, remaining, reset_seconds):
+        """
+        Aligns the bucket with the limits reported by the server.
+
+        Args:
+            remaining (float): Tokens the server says are left.
+            reset_seconds (float, optional): Seconds until the server's
+                window resets.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill_locked(now)
+            self.tokens = min(self.tokens, remaining)
+            if remaining <= 0 and reset_seconds:
+                self.blocked_until = max(self.blocked_until, now + reset_seconds)
+
+
+class RequestScheduler:
+    """
+    Client-side request scheduler shared by every OpenAI client in the process.
+
+    Requests wait for a slot in the requests-per-minute and tokens-per-minute
+    buckets before they are sent. Responses update the buckets from the
+    server's rate-limit headers, and rate-limited or failed requests are
+    retried with backoff, honouring `Retry-After`.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute=REQUESTS_PER_MINUTE,
+        tokens_per_minute=TOKENS_PER_MINUTE,
+        max_retries=MAX_RETRIES,
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.retries = 0
+
+    def _estimate_tokens(self, request):
+        """
+        Roughly estimates the tokens a request consumes from its body size.
+        """
+        if request.method != "POST":
+            return 0
+        return max(1, int(request.headers.get("content-length") or 0) // 4)
+
+    def reserve(self, request):
+        """
+        Reserves a slot for a request.
+
+        Returns:
+            float: Seconds to wait before sending it.
+        """
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.reserve())
+        tokens = self._estimate_tokens(request)
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    def _enter_queue(self):
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def _leave_queue(self, waited):
+        with self._lock:
+            self.queue_depth -= 1
+            if waited:
+                self.waits += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+    def wait_for_slot(self, request):
+        """
+        Blocks until a request may be sent.
+        """
+        self._enter_queue()
+        wait = self.reserve(request)
+        try:
+            if wait:
+                logger.info(f"Throttling {request.method} {request.url.path} for {wait:.2f}s")
+                time.sleep(wait)
+        finally:
+            self._leave_queue(wait)
+
+    async def async_wait_for_slot(self, request):
+        """
+        Waits, without blocking the event loop, until a request may be sent.
+        """
+        self._enter_queue()
+        wait = self.reserve(request)
+        try:
+            if wait:
+                logger.info(f"Throttling {request.method} {request.url.path} for {wait:.2f}s")
+                await asyncio.sleep(wait)
+        finally:
+            self._leave_queue(wait)
+
+    def observe(self, response):
+        """
+        Updates the buckets from the rate-limit headers of a response.
+        """
+        headers = response.headers
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if bucket is None or remaining is None:
+                continue
+            try:
+                remaining = float(remaining)
+            except ValueError:
+                continue
+            bucket.sync(
+                remaining, parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            )
+
+    def retry_delay(self, attempt, response=None):
+        """
+        Decides whether to retry a request. A Retry-After from the server is
+        honoured exactly, and the request is given up on when it asks for
+        more than RETRY_MAX_DELAY.
+
+        Args:
+            attempt (int): Number of attempts made so far, starting at 0.
+            response (httpx.Response, optional): The response, or None if
+                the request failed at the transport level.
+
+        Returns:
+            float or None: Seconds to wait before retrying, or None to give up.
+        """
+        if attempt >= self.max_retries:
+            return None
+        if response is not None:
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                return None
+            if response.headers.get("x-should-retry") == "false":
+                return None
+            delay = parse_retry_after(response.headers)
+            if delay is not None:
+                # Never retry earlier than asked; give up if that is too long.
+                return delay if delay <= RETRY_MAX_DELAY else None
+        backoff = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt)
+        return backoff * random.uniform(0.75, 1.25)
+
+    def record_retry(self, request, delay, reason):
+        with self._lock:
+            self.retries += 1
+        logger.info(
+            f"Retrying {request.method} {request.url.path} in {delay:.2f}s ({reason})"
+        )
+
+    def stats(self):
+        """
+        Returns the scheduler's queue and wait statistics.
+        """
+        with self._lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "throttled_requests": self.waits,
+                "total_wait": round(self.total_wait, 3),
+                "mean_wait": round(self.total_wait / self.waits, 3) if self.waits else 0.0,
+                "max_wait": round(self.max_wait, 3),
+                "retries": self.retries,
+            }
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """
+    An httpx transport that sends every request through a RequestScheduler.
+    """
+
+    def __init__(self, scheduler, transport=None):
+        """
+        Args:
+            scheduler (RequestScheduler): The scheduler to use.
+            transport (httpx.BaseTransport, optional): The transport doing
+                the actual I/O.
+        """
+        self.scheduler = scheduler
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request):
+        attempt = 0
+        while True:
+            self.scheduler.wait_for_slot(request)
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as e:
+                delay = None
+                if can_resend(request, e):
+                    delay = self.scheduler.retry_delay(attempt)
+                if delay is None:
+                    raise
+                self.scheduler.record_retry(request, delay, type(e).__name__)
+            else:
+                self.scheduler.observe(response)
+                delay = self.scheduler.retry_delay(attempt, response)
+                if delay is None:
+                    return response
+                response.close()
+                self.scheduler.record_retry(request, delay, response.status_code)
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    The asyncio counterpart of RateLimitedTransport.
+    """
+
+    def __init__(self, scheduler, transport=None):
+        """
+        Args:
+            scheduler (RequestScheduler): The scheduler to use.
+            transport (httpx.AsyncBaseTransport, optional): The transport
+                doing the actual I/O.
+        """
+        self.scheduler = scheduler
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        attempt = 0
+        while True:
+            await self.scheduler.async_wait_for_slot(request)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                delay = None
+                if can_resend(request, e):
+                    delay = self.scheduler.retry_delay(attempt)
+                if delay is None:
+                    raise
+                self.scheduler.record_retry(request, delay, type(e).__name__)
+            else:
+                self.scheduler.observe(response)
+                delay = self.scheduler.retry_delay(attempt, response)
+                if delay is None:
+                    return response
+                await response.aclose()
+                self.scheduler.record_retry(request, delay, response.status_code)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_request_scheduler():
+    """
+    Returns the process-wide request scheduler, creating it on first use.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
@@ -0,0 +1,77 @@
+import time
+from typing import Callable, NamedTuple
+
+from .ui_utils import logger
+
+
+class Route(NamedTuple):
+    """
+    The next screen to show: a screen function and the arguments to call it with.
+
+    Screens never call each other directly. They return a Route (or None to
+    end the session) and `run` dispatches it, so the call stack stays one
+    screen deep however long the session lasts.
+    """
+
+    screen: Callable
+    args: tuple = ()
+
+
+def goto(screen: Callable, *args) -> Route:
+    """
+    Builds the route to a screen.
+
+    Args:
+        screen (Callable): The screen function to show next.
+        *args: The arguments to pass to the screen.
+    """
+    return Route(screen, args)
+
+
+# Callables invoked as hook(route, next_route, elapsed) after every screen.
+_transition_hooks = []
+
+
+def add_transition_hook(hook: Callable):
+    """
+    Registers a hook that is called after every screen with the route that
+    was shown, the route it returned and the seconds it took.
+
+    Args:
+        hook (Callable): The hook to register.
+    """
+    _transition_hooks.append(hook)
+
+
+def remove_transition_hook(hook: Callable):
+    """
+    Unregisters a hook added with `add_transition_hook`.
+
+    Args:
+        hook (Callable): The hook to remove.
+    """
+    _transition_hooks.remove(hook)
+
+
+def log_transition(route: Route, next_route: Route, elapsed: float):
+    """
+    A transition hook that logs screen names and timings.
+    """
+    next_name = next_route.screen.__name__ if next_route else "exit"
+    logger.info(f"{route.screen.__name__} -> {next_name} ({elapsed:.3f}s)")
+
+
+def run(route: Route):
+    """
+    Dispatches screens until one of them returns None.
+
+    Args:
+        route (Route): The first screen to show.
+    """
+    while route is not None:
+        start = time.perf_counter()
+        next_route = route.screen(*route.args)
+        elapsed = time.perf_counter() - start
+        for hook in _transition_hooks:
+            hook(route, next_route, elapsed)
+        route = next_route
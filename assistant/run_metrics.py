@@ -0,0 +1,284 @@
+import os
+import sqlite3
+import threading
+import time
+
+from rich.table import Table
+
+from .percentiles import summarize
+from .ui_utils import console
+
+# SQLite database holding one row of metrics per streamed run.
+METRICS_DB = os.path.expanduser("~/.assistant-gpt-metrics.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT,
+    thread TEXT NOT NULL,
+    assistant TEXT NOT NULL,
+    model TEXT,
+    status TEXT,
+    started_at REAL NOT NULL,
+    ttft_ms REAL,
+    total_ms REAL NOT NULL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    total_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_by_assistant_model
+    ON runs (assistant, model, started_at);
+"""
+
+_COLUMNS = (
+    "run_id",
+    "thread",
+    "assistant",
+    "model",
+    "status",
+    "started_at",
+    "ttft_ms",
+    "total_ms",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+)
+
+# Stream events that carry generated output: text or tool call deltas.
+_OUTPUT_EVENTS = {"thread.message.delta", "thread.run.step.delta"}
+# Statuses a stream can end on. A run in any other state when measuring
+# ends, or no run at all, means the stream broke off and is recorded as ERROR.
+_END_STATUSES = {
+    "completed",
+    "requires_action",
+    "failed",
+    "cancelled",
+    "expired",
+    "incomplete",
+}
+ERROR = "error"
+# Statuses counted as failed runs.
+FAILED_STATUSES = ("failed", "cancelled", "expired", "incomplete", ERROR)
+
+
+def tokens_per_second(record):
+    """
+    Returns the generation speed of a run: completion tokens over the time
+    from the first token to the end of the run, or None if unknown.
+    """
+    if not record["completion_tokens"] or record["ttft_ms"] is None:
+        return None
+    generating_ms = record["total_ms"] - record["ttft_ms"]
+    if generating_ms <= 0:
+        return None
+    return record["completion_tokens"] / (generating_ms / 1000)
+
+
+class RunMetrics:
+    """
+    Measures one streamed run from the events of its stream.
+
+    Times are taken from when the run was requested: time to first token
+    is the first text or tool call delta, the total is the end of the stream.
+    A stream that breaks off before its run ends is recorded with the
+    status ERROR.
+    """
+
+    def __init__(self, thread_id, assistant_id):
+        """
+        Args:
+            thread_id (str): The ID of the thread.
+            assistant_id (str): The ID of the assistant.
+        """
+        self.thread_id = thread_id
+        self.assistant_id = assistant_id
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.ttft = None
+        self.total = None
+
+    def observe(self, event):
+        """
+        Notes a stream event.
+        """
+        if self.ttft is None and event.event in _OUTPUT_EVENTS:
+            self.ttft = time.perf_counter() - self._start
+
+    def finish(self, run):
+        """
+        Ends the measurement and returns its record.
+
+        Args:
+            run: The last run seen on the stream, or None if it never started.
+
+        Returns:
+            dict: The metrics record, with the keys of the `runs` table.
+        """
+        self.total = time.perf_counter() - self._start
+        usage = getattr(run, "usage", None)
+        status = run.status if run else None
+        return {
+            "run_id": run.id if run else None,
+            "thread": self.thread_id,
+            "assistant": self.assistant_id,
+            "model": run.model if run else None,
+            "status": status if status in _END_STATUSES else ERROR,
+            "started_at": self.started_at,
+            "ttft_ms": self.ttft * 1000 if self.ttft is not None else None,
+            "total_ms": self.total * 1000,
+            "prompt_tokens": usage.prompt_tokens if usage else None,
+            "completion_tokens": usage.completion_tokens if usage else None,
+            "total_tokens": usage.total_tokens if usage else None,
+        }
+
+
+class MetricsStore:
+    """
+    Per-run latency and token metrics stored in SQLite, indexed by assistant
+    and model so the statistics of one of them touch only its runs.
+    """
+
+    def __init__(self, path=METRICS_DB):
+        """
+        Args:
+            path (str): Path of the SQLite database.
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def record(self, record):
+        """
+        Adds the metrics of a run.
+
+        Args:
+            record (dict): A record as returned by `RunMetrics.finish`.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO runs ({', '.join(_COLUMNS)})"
+                f" VALUES ({', '.join(':' + column for column in _COLUMNS)})",
+                {column: record.get(column) for column in _COLUMNS},
+            )
+
+    def runs(self, assistant_id=None, since=None):
+        """
+        Returns the recorded runs, oldest first.
+
+        Args:
+            assistant_id (str, optional): Only return runs of this assistant.
+            since (float, optional): Only return runs started after this time.
+        """
+        sql = "SELECT * FROM runs WHERE started_at >= ?"
+        params = [since or 0]
+        if assistant_id:
+            sql += " AND assistant = ?"
+            params.append(assistant_id)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY started_at", params).fetchall()
+        return [{column: row[column] for column in _COLUMNS} for row in rows]
+
+    def stats(self, assistant_id=None, since=None):
+        """
+        Summarises the recorded runs per assistant and model.
+
+        Args:
+            assistant_id (str, optional): Only summarise runs of this assistant.
+            since (float, optional): Only summarise runs started after this time.
+
+        Returns:
+            list: Dicts with the keys `assistant`, `model`, `runs`, `failed`,
+            `prompt_tokens` and `completion_tokens` (sums), and `ttft_ms`,
+            `total_ms` and `tokens_per_second`, each a `summarize` dict.
+        """
+        groups = {}
+        for record in self.runs(assistant_id, since):
+            groups.setdefault((record["assistant"], record["model"]), []).append(record)
+
+        stats = []
+        for (assistant, model), records in sorted(
+            groups.items(), key=lambda item: (item[0][0], item[0][1] or "")
+        ):
+            ttfts = [r["ttft_ms"] for r in records if r["ttft_ms"] is not None]
+            speeds = [tokens_per_second(r) for r in records]
+            stats.append(
+                {
+                    "assistant": assistant,
+                    "model": model,
+                    "runs": len(records),
+                    "failed": sum(
+                        1 for r in records if r["status"] in FAILED_STATUSES
+                    ),
+                    "prompt_tokens": sum(r["prompt_tokens"] or 0 for r in records),
+                    "completion_tokens": sum(
+                        r["completion_tokens"] or 0 for r in records
+                    ),
+                    "ttft_ms": summarize(ttfts),
+                    "total_ms": summarize([r["total_ms"] for r in records]),
+                    "tokens_per_second": summarize(
+                        [speed for speed in speeds if speed is not None]
+                    ),
+                }
+            )
+        return stats
+
+
+def _format(value, digits=0):
+    return "-" if value is None else f"{value:,.{digits}f}"
+
+
+def print_stats(stats, assistant_names=None, output=console):
+    """
+    Prints run statistics as a table.
+
+    Args:
+        stats (list): Statistics as returned by `MetricsStore.stats`.
+        assistant_names (dict, optional): Names to show for assistant IDs.
+        output (rich.console.Console): The console to print to.
+    """
+    assistant_names = assistant_names or {}
+    table = Table(title="Run statistics")
+    for column in ("Assistant", "Model"):
+        table.add_column(column)
+    for column in (
+        "Runs",
+        "Failed",
+        "TTFT p50 ms",
+        "TTFT p90 ms",
+        "Total p50 ms",
+        "Total p90 ms",
+        "Tok/s p50",
+        "Prompt tok",
+        "Output tok",
+    ):
+        table.add_column(column, justify="right")
+    for row in stats:
+        table.add_row(
+            assistant_names.get(row["assistant"]) or row["assistant"],
+            row["model"] or "-",
+            str(row["runs"]),
+            str(row["failed"]),
+            _format(row["ttft_ms"]["p50"]),
+            _format(row["ttft_ms"]["p90"]),
+            _format(row["total_ms"]["p50"]),
+            _format(row["total_ms"]["p90"]),
+            _format(row["tokens_per_second"]["p50"], 1),
+            _format(row["prompt_tokens"]),
+            _format(row["completion_tokens"]),
+        )
+    output.print(table)
+
+
+_store = None
+
+
+def get_metrics_store():
+    """
+    Returns the process-wide metrics store, opening it on first use.
+    """
+    global _store
+    if _store is None:
+        _store = MetricsStore()
+    return _store
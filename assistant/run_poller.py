@@ -0,0 +1,155 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+
+# Run statuses that can still change without any action from us.
+PENDING_RUN_STATUSES = {"queued", "in_progress", "cancelling"}
+
+
+class RunWaitTimeout(Exception):
+    """
+    Raised when runs are still pending at the deadline.
+    The runs that did finish are available as `results`.
+    """
+
+    def __init__(self, pending_run_ids, results):
+        super().__init__(f"Runs still pending at deadline: {', '.join(pending_run_ids)}")
+        self.pending_run_ids = pending_run_ids
+        self.results = results
+
+
+class RunWaitCancelled(Exception):
+    """
+    Raised when a wait is cancelled through its cancel event.
+    The runs that did finish are available as `results`.
+    """
+
+    def __init__(self, pending_run_ids, results):
+        super().__init__(f"Wait cancelled with runs pending: {', '.join(pending_run_ids)}")
+        self.pending_run_ids = pending_run_ids
+        self.results = results
+
+
+class RunPoller:
+    """
+    Waits for non-streaming runs to leave the queued/in-progress states.
+
+    Each run is polled on its own exponential backoff schedule with jitter.
+    All runs share one scheduler loop that sleeps until the next poll is due,
+    so waiting on many runs costs no more threads or CPU than waiting on one.
+    """
+
+    def __init__(
+        self,
+        client,
+        initial_delay=0.5,
+        max_delay=8.0,
+        multiplier=1.6,
+        jitter=0.2,
+    ):
+        """
+        Args:
+            client: The OpenAI client used to retrieve runs.
+            initial_delay (float): Seconds before the first re-check of a run.
+            max_delay (float): Upper bound on the delay between two checks.
+            multiplier (float): Factor the delay grows by after each check.
+            jitter (float): Relative random spread applied to every delay.
+        """
+        self.client = client
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def _jittered(self, delay):
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def wait(
+        self, thread_id, run_id, timeout=None, cancel_event=None, cancel_runs=False
+    ):
+        """
+        Waits for a single run and returns it in its final state.
+
+        Args:
+            thread_id (str): The ID of the thread the run belongs to.
+            run_id (str): The ID of the run.
+            timeout (float, optional): Seconds to wait before giving up.
+            cancel_event (threading.Event, optional): Set it to abort the wait.
+            cancel_runs (bool): Whether to cancel the run on the API when the
+                wait is aborted or times out.
+        """
+        return self.wait_many(
+            [(thread_id, run_id)], timeout, cancel_event, cancel_runs
+        )[run_id]
+
+    def wait_many(self, runs, timeout=None, cancel_event=None, cancel_runs=False):
+        """
+        Waits for several runs with a single scheduler.
+
+        Args:
+            runs (Iterable[tuple]): (thread_id, run_id) pairs.
+            timeout (float, optional): Seconds to wait before giving up.
+            cancel_event (threading.Event, optional): Set it to abort the wait.
+            cancel_runs (bool): Whether to cancel pending runs on the API when
+                the wait is aborted or times out.
+
+        Returns:
+            dict: The final run objects keyed by run ID.
+
+        Raises:
+            RunWaitTimeout: Some runs were still pending at the deadline.
+            RunWaitCancelled: The cancel event was set.
+        """
+        cancel_event = cancel_event or threading.Event()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        order = itertools.count()
+        now = time.monotonic()
+        schedule = [
+            (now, next(order), thread_id, run_id, self.initial_delay)
+            for thread_id, run_id in runs
+        ]
+        heapq.heapify(schedule)
+        results = {}
+
+        while schedule:
+            due, _, thread_id, run_id, delay = heapq.heappop(schedule)
+            if deadline is not None:
+                due = min(due, deadline)
+            if cancel_event.wait(max(0.0, due - time.monotonic())):
+                heapq.heappush(schedule, (due, next(order), thread_id, run_id, delay))
+                self._abort(schedule, cancel_runs)
+                raise RunWaitCancelled([entry[3] for entry in schedule], results)
+
+            run = self.client.beta.threads.runs.retrieve(
+                thread_id=thread_id, run_id=run_id
+            )
+            if run.status not in PENDING_RUN_STATUSES:
+                results[run_id] = run
+                continue
+
+            heapq.heappush(
+                schedule,
+                (
+                    time.monotonic() + self._jittered(delay),
+                    next(order),
+                    thread_id,
+                    run_id,
+                    min(delay * self.multiplier, self.max_delay),
+                ),
+            )
+            if deadline is not None and time.monotonic() >= deadline:
+                self._abort(schedule, cancel_runs)
+                raise RunWaitTimeout([entry[3] for entry in schedule], results)
+
+        return results
+
+    def _abort(self, schedule, cancel_runs):
+        """
+        Cancels the runs still in the schedule on the API, if requested.
+        """
+        if not cancel_runs:
+            return
+        for _, _, thread_id, run_id, _ in schedule:
+            self.client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run_id)
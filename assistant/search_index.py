@@ -0,0 +1,200 @@
+import os
+import re
+import sqlite3
+import threading
+
+from .message_store import is_settled
+from .thread_store import get_thread_store
+
+# SQLite database holding the full-text index of thread transcripts.
+SEARCH_DB = os.path.expanduser("~/.assistant-gpt-search.db")
+# Markers around the matched terms of a snippet.
+MATCH_START, MATCH_END = "«", "»"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed_messages (
+    message_id TEXT PRIMARY KEY,
+    thread TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS indexed_messages_by_thread
+    ON indexed_messages (thread);
+CREATE VIRTUAL TABLE IF NOT EXISTS message_text USING fts5(
+    text,
+    message_id UNINDEXED,
+    thread UNINDEXED,
+    assistant UNINDEXED,
+    role UNINDEXED,
+    created_at UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def message_text(message):
+    """
+    Returns the concatenated text parts of a message.
+    """
+    return "\n".join(
+        content.text.value for content in message.content if content.type == "text"
+    )
+
+
+def match_expression(query):
+    """
+    Turns free text into an FTS5 query matching messages that contain every
+    word, the last one as a prefix so results show up while typing. Quoting
+    the words keeps FTS5 operators in the input from being interpreted.
+
+    Returns:
+        str: The expression, or None if the query has no words.
+    """
+    terms = _TERM.findall(query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+class SearchIndex:
+    """
+    Full-text index of the messages seen by the CLI, in SQLite FTS5.
+
+    Messages are indexed once, when they are fetched or streamed, so
+    searching never calls the API. `indexed_messages` records which
+    messages are in the index, since FTS5 tables cannot have unique keys.
+    """
+
+    def __init__(self, path=SEARCH_DB):
+        """
+        Args:
+            path (str): Path of the SQLite database.
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add_messages(self, messages, assistant_id=None):
+        """
+        Indexes the text of messages that are not indexed yet. Messages
+        still being written are skipped, as their text is partial.
+
+        Args:
+            messages: An iterable of message objects.
+            assistant_id (str, optional): The assistant of the thread, used
+                for messages that do not name one.
+
+        Returns:
+            int: The number of messages added to the index.
+        """
+        rows = [
+            {
+                "message_id": message.id,
+                "thread": message.thread_id,
+                "assistant": getattr(message, "assistant_id", None) or assistant_id,
+                "role": message.role,
+                "created_at": message.created_at,
+                "text": message_text(message),
+            }
+            for message in messages
+            if is_settled(message)
+        ]
+        added = 0
+        with self._lock, self._conn:
+            for row in rows:
+                if not row["text"]:
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO indexed_messages (message_id, thread)"
+                    " VALUES (:message_id, :thread)",
+                    row,
+                )
+                if cursor.rowcount:
+                    self._conn.execute(
+                        "INSERT INTO message_text"
+                        " (text, message_id, thread, assistant, role, created_at)"
+                        " VALUES (:text, :message_id, :thread, :assistant, :role,"
+                        " :created_at)",
+                        row,
+                    )
+                    added += 1
+        return added
+
+    def search(self, query, limit=20, assistant_id=None):
+        """
+        Returns the threads whose messages best match a query, with the best
+        matching message of each.
+
+        Args:
+            query (str): Free text; every word must occur in the message.
+            limit (int): Maximum number of threads to return.
+            assistant_id (str, optional): Only search the threads of this assistant.
+
+        Returns:
+            list: Dicts with the keys `thread`, `thread_name`, `assistant`,
+            `message_id`, `role`, `created_at` and `snippet`, best match first.
+            Matched terms in the snippet are wrapped in MATCH_START and MATCH_END.
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+
+        sql = (
+            "SELECT thread, assistant, message_id, role, created_at,"
+            " snippet(message_text, 0, ?, ?, '…', 16) AS snippet"
+            " FROM message_text WHERE message_text MATCH ?"
+        )
+        params = [MATCH_START, MATCH_END, expression]
+        if assistant_id:
+            sql += " AND assistant = ?"
+            params.append(assistant_id)
+        sql += " ORDER BY rank"
+
+        hits = {}
+        with self._lock:
+            try:
+                cursor = self._conn.execute(sql, params)
+            except sqlite3.OperationalError:
+                return []
+            # Rows come best first; keep the best message of each thread.
+            for row in cursor:
+                if row["thread"] not in hits:
+                    hits[row["thread"]] = dict(row)
+                    if len(hits) == limit:
+                        break
+
+        store = get_thread_store()
+        for hit in hits.values():
+            record = store.get(hit["thread"])
+            hit["thread_name"] = record["thread_name"] if record else hit["thread"]
+            if record and not hit["assistant"]:
+                hit["assistant"] = record["assistant"]
+        return list(hits.values())
+
+    def delete_thread(self, thread_id):
+        """
+        Removes the messages of a thread from the index.
+
+        Args:
+            thread_id (str): The ID of the thread.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM message_text WHERE thread = ?", (thread_id,))
+            self._conn.execute(
+                "DELETE FROM indexed_messages WHERE thread = ?", (thread_id,)
+            )
+
+
+_index = None
+
+
+def get_search_index():
+    """
+    Returns the process-wide search index, opening it on first use.
+    """
+    global _index
+    if _index is None:
+        _index = SearchIndex()
+    return _index
@@ -0,0 +1,342 @@
+import os
+import threading
+import time
+
+from openai import AssistantEventHandler
+from rich.console import Group
+from rich.layout import Layout
+from rich.panel import Panel
+from rich.text import Text
+from typing_extensions import override
+
+from .ui_utils import logger
+
+# Characters of streamed output kept per session for display.
+SESSION_BUFFER_CHARS = int(os.environ.get("ASSISTANT_GPT_SESSION_BUFFER", 20000))
+# Most sessions shown side by side in the split view.
+MAX_PANES = 4
+
+STREAMING, DONE, FAILED = "streaming", "done", "failed"
+_STATUS_STYLES = {STREAMING: "yellow", DONE: "green", FAILED: "red"}
+
+
+class StreamSession:
+    """
+    A reply streaming on one thread in the background.
+
+    The streamed text is buffered instead of printed, so several sessions
+    can stream at once while the screen shows something else. Only the last
+    SESSION_BUFFER_CHARS characters are kept; the full reply is in the
+    thread and is synced when the thread is opened.
+    """
+
+    def __init__(self, thread_id, thread_name, assistant_id):
+        """
+        Args:
+            thread_id (str): The ID of the thread.
+            thread_name (str): The name of the thread, for display.
+            assistant_id (str): The ID of the assistant running on it.
+        """
+        self.thread_id = thread_id
+        self.thread_name = thread_name
+        self.assistant_id = assistant_id
+        self.status = STREAMING
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._chunks = []
+        self._length = 0
+
+    def write(self, text):
+        """
+        Appends streamed text to the buffer.
+        """
+        with self._lock:
+            self._chunks.append(text)
+            self._length += len(text)
+
+    @property
+    def text(self):
+        """
+        The buffered output, trimmed to the last SESSION_BUFFER_CHARS characters.
+        """
+        with self._lock:
+            text = "".join(self._chunks)
+            if self._length > SESSION_BUFFER_CHARS:
+                text = text[-SESSION_BUFFER_CHARS:]
+            self._chunks = [text]
+            self._length = len(text)
+        return text
+
+    def finish(self, error=None):
+        """
+        Marks the session as done, or as failed with an error.
+        """
+        self.error = error
+        self.finished_at = time.time()
+        self.status = FAILED if error else DONE
+
+    @property
+    def elapsed(self):
+        """
+        Seconds the session has been, or was, streaming.
+        """
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class SessionEventHandler(AssistantEventHandler):
+    """
+    Writes the events of a streamed run into a session's buffer.
+    """
+
+    def __init__(self, session):
+        super().__init__()
+        self.session = session
+
+    @override
+    def on_text_created(self, text) -> None:
+        self.session.write("\n")
+
+    @override
+    def on_text_delta(self, delta, snapshot):
+        self.session.write(delta.value)
+
+    def on_tool_call_created(self, tool_call):
+        self.session.write(f"\n[{tool_call.type}]\n")
+
+    def on_tool_call_delta(self, delta, snapshot):
+        if delta.type == "code_interpreter":
+            if delta.code_interpreter.input:
+                self.session.write(delta.code_interpreter.input)
+            if delta.code_interpreter.outputs:
+                self.session.write("\n\noutput >\n")
+                for output in delta.code_interpreter.outputs:
+                    if output.type == "logs":
+                        self.session.write(f"{output.logs}\n")
+
+
+class SessionManager:
+    """
+    Runs replies on several threads at once, one background thread per
+    stream, and keeps their sessions until they are dismissed.
+
+    The streams share the API wrapper's client, search index and metrics
+    store with the foreground. The client is thread-safe; each store opens
+    its SQLite connection with `check_same_thread=False` and serialises its
+    use with a lock of its own. The wrapper's current thread and message
+    stores are never touched from a stream.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def start(self, api, thread_id, thread_name, assistant_id):
+        """
+        Starts streaming a reply on a thread in the background.
+
+        Args:
+            api: API object to interact with the backend.
+            thread_id (str): The ID of the thread.
+            thread_name (str): The name of the thread, for display.
+            assistant_id (str): The ID of the assistant to run.
+
+        Returns:
+            StreamSession: The new session.
+
+        Raises:
+            ValueError: If a reply is already streaming on the thread.
+        """
+        with self._lock:
+            existing = self._sessions.get(thread_id)
+            if existing is not None and existing.status == STREAMING:
+                raise ValueError(f"A reply is already streaming on '{thread_name}'")
+            session = StreamSession(thread_id, thread_name, assistant_id)
+            # Re-inserted so the most recent session is listed last.
+            self._sessions.pop(thread_id, None)
+            self._sessions[thread_id] = session
+
+        def stream():
+            try:
+                api.send_message_and_stream(
+                    SessionEventHandler(session),
+                    thread_id=thread_id,
+                    assistant_id=assistant_id,
+                )
+            except Exception as e:
+                logger.info(f"Streaming on {thread_id} failed: {e}")
+                session.finish(e)
+            else:
+                session.finish()
+
+        threading.Thread(target=stream, name=f"stream-{thread_id}", daemon=True).start()
+        return session
+
+    def get(self, thread_id):
+        """
+        Returns the session of a thread, or None.
+        """
+        with self._lock:
+            return self._sessions.get(thread_id)
+
+    def all(self):
+        """
+        Returns every session, oldest first.
+        """
+        with self._lock:
+            return list(self._sessions.values())
+
+    def streaming(self):
+        """
+        Returns the sessions still streaming.
+        """
+        return [session for session in self.all() if session.status == STREAMING]
+
+    def dismiss_finished(self):
+        """
+        Forgets the sessions that are done or failed.
+        """
+        with self._lock:
+            for thread_id, session in list(self._sessions.items()):
+                if session.status != STREAMING:
+                    del self._sessions[thread_id]
+
+
+def _tail(text, console, width, height):
+    """
+    Returns the last `height` lines of a text wrapped to `width`.
+    """
+    if height <= 0:
+        return Text()
+    lines = Text(text).wrap(console, max(width, 1))
+    return Group(*lines[-height:])
+
+
+class SessionView:
+    """
+    A live view of the sessions, redrawn on every refresh of a rich Live.
+
+    In "split" mode the most recent sessions are shown side by side, each in
+    its own pane; in "tabs" mode the selected session fills the screen under
+    a tab bar. Each pane shows the end of its session's output.
+    """
+
+    def __init__(self, manager, mode="split"):
+        """
+        Args:
+            manager (SessionManager): The sessions to show.
+            mode (str): "split" or "tabs".
+        """
+        self.manager = manager
+        self.mode = mode
+        self.selected = 0
+
+    @property
+    def sessions(self):
+        return self.manager.all()
+
+    @property
+    def selected_session(self):
+        sessions = self.sessions
+        if not sessions:
+            return None
+        self.selected %= len(sessions)
+        return sessions[self.selected]
+
+    def move(self, step):
+        """
+        Selects the next (1) or previous (-1) session.
+        """
+        count = len(self.sessions)
+        if count:
+            self.selected = (self.selected + step) % count
+
+    def toggle_mode(self):
+        self.mode = "tabs" if self.mode == "split" else "split"
+
+    def _title(self, session, selected):
+        style = _STATUS_STYLES[session.status]
+        title = Text(
+            f" {session.thread_name} ", style="bold reverse" if selected else "bold"
+        )
+        title.append(f"{session.status} {session.elapsed:.0f}s ", style=style)
+        return title
+
+    def _pane(self, session, console, width, height, selected):
+        body = _tail(session.text, console, width - 4, height - 2)
+        if session.error:
+            body = Group(body, Text(str(session.error), style="bold red"))
+        return Panel(
+            body,
+            title=self._title(session, selected),
+            title_align="left",
+            border_style="bold" if selected else "dim",
+            height=height,
+        )
+
+    def _footer(self):
+        return Text(
+            "←/→ switch · s split/tabs · o open thread · d dismiss finished · q back",
+            style="dim",
+        )
+
+    def __rich_console__(self, console, options):
+        width = options.max_width
+        height = (options.height or console.height) - 1
+        sessions = self.sessions
+        selected = self.selected_session
+
+        layout = Layout()
+        layout.split_column(Layout(name="body"), Layout(self._footer(), size=1))
+        if not sessions:
+            layout["body"].update(Text("No replies are streaming.", style="dim"))
+        elif self.mode == "tabs":
+            tabs = Text()
+            for session in sessions:
+                tabs.append_text(self._title(session, session is selected))
+                tabs.append(" ")
+            layout["body"].split_column(
+                Layout(tabs, size=1),
+                Layout(self._pane(selected, console, width, height - 1, True)),
+            )
+        else:
+            # Keep the selected session in view when there are many.
+            shown = sessions[-MAX_PANES:]
+            if selected not in shown:
+                shown = [*shown[1:], selected]
+            columns = 2 if len(shown) > 2 else len(shown)
+            starts = range(0, len(shown), columns)
+            rows = [shown[start : start + columns] for start in starts]
+            pane_height = height // len(rows)
+            pane_width = width // columns
+            layout["body"].split_column(
+                *(
+                    Layout(name=f"row{row_index}", size=pane_height)
+                    for row_index in range(len(rows))
+                )
+            )
+            for row_index, row in enumerate(rows):
+                panes = [
+                    self._pane(
+                        session, console, pane_width, pane_height, session is selected
+                    )
+                    for session in row
+                ]
+                layout["body"][f"row{row_index}"].split_row(
+                    *(Layout(pane) for pane in panes)
+                )
+        yield layout
+
+
+_manager = None
+
+
+def get_session_manager():
+    """
+    Returns the process-wide session manager, creating it on first use.
+    """
+    global _manager
+    if _manager is None:
+        _manager = SessionManager()
+    return _manager
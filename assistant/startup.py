@@ -0,0 +1,73 @@
+import importlib
+import os
+import sys
+import time
+
+from rich.table import Table
+
+from .ui_utils import console
+
+# Time allowed from interpreter start until the first banner is on screen.
+STARTUP_BUDGET_MS = float(os.environ.get("ASSISTANT_GPT_STARTUP_BUDGET_MS", 300))
+
+# Modules imported on the way to the dashboard, in the order they are needed.
+STARTUP_MODULES = [
+    "rich",
+    "pyfiglet",
+    "inquirer",
+    "halo",
+    "httpx",
+    "openai",
+    "PIL",
+    "assistant.api_wrapper",
+    "assistant.dashboard",
+]
+
+
+def profile_startup(started_at):
+    """
+    Prints an import-time breakdown of the modules the CLI needs and checks
+    the time to the first banner against STARTUP_BUDGET_MS.
+
+    Import times are incremental: a module that was already pulled in by an
+    earlier one reports only what it added.
+
+    Args:
+        started_at (float): `time.perf_counter()` when `__main__` started.
+
+    Returns:
+        int: 0 if the first banner fits the budget, 1 otherwise.
+    """
+    from . import ascii_art
+
+    banner_start = time.perf_counter()
+    ascii_art.ascii_welcome
+    first_paint = time.perf_counter() - started_at
+    banner_time = time.perf_counter() - banner_start
+
+    table = Table(title="Startup profile")
+    table.add_column("Step")
+    table.add_column("ms", justify="right")
+    table.add_column("Note")
+    table.add_row("__main__ imports", f"{(banner_start - started_at) * 1000:.1f}", "")
+    table.add_row("Welcome banner", f"{banner_time * 1000:.1f}", "")
+
+    for name in STARTUP_MODULES:
+        note = "already loaded" if name in sys.modules else ""
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            note = f"not installed ({e.name})"
+        table.add_row(name, f"{(time.perf_counter() - start) * 1000:.1f}", note)
+
+    table.add_row("Total", f"{(time.perf_counter() - started_at) * 1000:.1f}", "")
+    console.print(table)
+
+    within_budget = first_paint * 1000 <= STARTUP_BUDGET_MS
+    colour = "green" if within_budget else "red"
+    console.print(
+        f"[{colour}]First banner after {first_paint * 1000:.1f}ms "
+        f"(budget {STARTUP_BUDGET_MS:.0f}ms)[/{colour}]"
+    )
+    return 0 if within_budget else 1
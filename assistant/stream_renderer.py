@@ -0,0 +1,290 @@
+import os
+import re
+import threading
+import time
+
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.text import Text
+
+from .tracing import get_tracer
+from .ui_utils import console, logger
+
+# Maximum number of terminal writes per second while streaming.
+DEFAULT_STREAM_FPS = float(os.environ.get("ASSISTANT_GPT_STREAM_FPS", 30))
+# Whether assistant replies are rendered as Markdown; set to 0 for plain text.
+RENDER_MARKDOWN = os.environ.get("ASSISTANT_GPT_MARKDOWN", "1") != "0"
+# Pygments theme for fenced code blocks.
+CODE_THEME = os.environ.get("ASSISTANT_GPT_CODE_THEME", "monokai")
+# Longest unfinished block re-rendered as Markdown; longer ones show as text.
+LIVE_MARKDOWN_LIMIT = 4000
+
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_HEADING = re.compile(r"^ {0,3}#{1,6}(\s|$)")
+
+
+class StreamRenderer:
+    """
+    Coalesces streamed text deltas into frame-rate-limited writes.
+
+    Deltas are buffered and written at most `fps` times a second as plain
+    text with a single style, so Rich does no markup parsing per token. A
+    timer flushes whatever is left when the stream pauses between frames.
+    """
+
+    def __init__(self, style="italic blue", fps=DEFAULT_STREAM_FPS, output=console):
+        """
+        Args:
+            style (str, optional): Rich style applied to every flush.
+            fps (float): Maximum flushes per second; 0 writes every delta.
+            output (rich.console.Console): The console to write to.
+        """
+        self.style = style
+        self.interval = 1 / fps if fps > 0 else 0
+        self.output = output
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._timer = None
+        self._last_flush = 0.0
+        self._started_at = None
+        self.deltas = 0
+        self.flushes = 0
+        self.render_time = 0.0
+
+    def write(self, text):
+        """
+        Buffers a delta, flushing if the current frame is over.
+
+        Args:
+            text (str): The text of the delta.
+        """
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = time.perf_counter()
+            self._buffer.append(text)
+            self.deltas += 1
+            wait = self._last_flush + self.interval - time.perf_counter()
+            if wait <= 0:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """
+        Writes everything buffered so far.
+        """
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        start = time.perf_counter()
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        self._render(text)
+        self._last_flush = time.perf_counter()
+        self.render_time += self._last_flush - start
+        get_tracer().record("flush", "render", start, self._last_flush - start)
+        self.flushes += 1
+
+    def _render(self, text):
+        """
+        Writes coalesced text to the output.
+        """
+        self.output.print(
+            text, style=self.style, end="", markup=False, highlight=False, soft_wrap=True
+        )
+
+    def end_message(self):
+        """
+        Finishes the current message before something else is printed.
+        """
+        self.flush()
+
+    def close(self):
+        """
+        Flushes the remaining text and logs throughput and render overhead.
+        """
+        self.end_message()
+        if self._started_at is None:
+            return
+        elapsed = time.perf_counter() - self._started_at
+        get_tracer().record(
+            "stream",
+            "render",
+            self._started_at,
+            elapsed,
+            deltas=self.deltas,
+            flushes=self.flushes,
+        )
+        logger.info(
+            f"Streamed {self.deltas} deltas in {elapsed:.2f}s "
+            f"({self.deltas / elapsed if elapsed else 0:.1f} tokens/s), "
+            f"{self.flushes} flushes, {self.render_time * 1000:.1f}ms rendering"
+        )
+
+
+class MarkdownBlocks:
+    """
+    Splits streamed Markdown into top-level blocks as the text arrives.
+
+    Every complete line is looked at once. A block is complete at a blank
+    line, after a heading, or when its fenced code block is closed; text
+    after the last complete block is the trailing block, still growing.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._scanned = 0
+        self._block_start = 0
+        self.fence = None
+
+    def feed(self, text):
+        """
+        Adds text and returns the blocks it completed.
+
+        Returns:
+            list: The source of every completed block, in order.
+        """
+        self.text += text
+        completed = []
+        while True:
+            line_end = self.text.find("\n", self._scanned)
+            if line_end < 0:
+                break
+            line_start, self._scanned = self._scanned, line_end + 1
+            block = self._end_block_at(self.text[line_start:self._scanned], line_start)
+            if block:
+                completed.append(block)
+
+        # Keep only the trailing block so the text does not grow with the reply.
+        self.text = self.text[self._block_start:]
+        self._scanned -= self._block_start
+        self._block_start = 0
+        return completed
+
+    def _end_block_at(self, line, line_start):
+        """
+        Updates the block state for a complete line and returns the block it
+        completes, if any.
+        """
+        if self.fence:
+            if line.strip().startswith(self.fence):
+                self.fence = None
+                return self._cut(self._scanned)
+            return None
+
+        fence = _FENCE.match(line)
+        if fence:
+            # A fence opens a block of its own.
+            previous = self._cut(line_start)
+            self.fence = fence.group(1)
+            return previous
+        if not line.strip() or _HEADING.match(line):
+            return self._cut(self._scanned)
+        return None
+
+    def _cut(self, end):
+        block = self.text[self._block_start:end]
+        self._block_start = end
+        return block if block.strip() else None
+
+    @property
+    def trailing(self):
+        """
+        The source of the block still being written.
+        """
+        return self.text[self._block_start:]
+
+    def finish(self):
+        """
+        Returns the trailing block as complete and resets the splitter.
+        """
+        block = self.trailing
+        self.__init__()
+        return block if block.strip() else None
+
+
+class MarkdownStreamRenderer(StreamRenderer):
+    """
+    Renders a streamed reply as Markdown at a cost that does not grow with
+    the length of the reply.
+
+    Completed blocks are rendered once and printed for good, fenced code
+    blocks with syntax highlighting. Only the trailing, unfinished block is
+    re-rendered on each frame, in a live region below the printed blocks;
+    an open code block, or a very long block, is shown as plain text until
+    it is complete.
+    """
+
+    def __init__(self, style="blue", fps=DEFAULT_STREAM_FPS, output=console):
+        """
+        Args:
+            style (str, optional): Rich style of the Markdown text.
+            fps (float): Maximum renders per second; 0 renders every delta.
+            output (rich.console.Console): The console to write to.
+        """
+        super().__init__(style=style, fps=fps, output=output)
+        self.blocks = MarkdownBlocks()
+        self._live = None
+        self._printed_blocks = 0
+
+    def _markdown(self, source):
+        return Markdown(source, code_theme=CODE_THEME, style=self.style or "none")
+
+    def _print_block(self, source):
+        if self._printed_blocks:
+            self.output.print()
+        self.output.print(self._markdown(source))
+        self._printed_blocks += 1
+
+    def _render(self, text):
+        for block in self.blocks.feed(text):
+            self._print_block(block)
+
+        trailing = self.blocks.trailing
+        if self.blocks.fence or len(trailing) > LIVE_MARKDOWN_LIMIT:
+            renderable = Text(trailing, style="dim")
+        else:
+            renderable = self._markdown(trailing)
+        if self._live is None:
+            if not trailing.strip():
+                return
+            self._live = Live(
+                console=self.output, auto_refresh=False, transient=True
+            )
+            self._live.start()
+        self._live.update(renderable, refresh=True)
+
+    def end_message(self):
+        """
+        Prints the trailing block for good and closes the live region.
+        """
+        with self._lock:
+            self._flush_locked()
+            if self._live is not None:
+                self._live.stop()
+                self._live = None
+            block = self.blocks.finish()
+            if block:
+                self._print_block(block)
+            self._printed_blocks = 0
+
+
+def create_renderer(**options):
+    """
+    Returns the renderer for assistant replies: Markdown unless disabled
+    with ASSISTANT_GPT_MARKDOWN=0.
+
+    Args:
+        **options: Passed to the renderer.
+    """
+    if RENDER_MARKDOWN:
+        return MarkdownStreamRenderer(**options)
+    return StreamRenderer(**options)
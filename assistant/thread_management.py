@@ -1,41 +1,50 @@
-import json
-import os
+import functools
 import time
 
 import inquirer
-from PIL import Image
+from rich.markdown import Markdown
+from rich.markup import escape
 from rich.prompt import Prompt
+from rich.segment import Segments
+from rich.text import Text
 
 from .error_handling import handleError
-from .ui_utils import clear_screen, console, logger
-
-THREAD_HISTORY = os.path.expanduser("~/.assistant-gpt-threads.json")
+from .image_cache import get_image_cache
+from .router import goto
+from .stream_renderer import CODE_THEME, RENDER_MARKDOWN
+from .thread_store import get_thread_store
+from .tracing import get_tracer
+from .ui_utils import clear_screen, console, logger, pause
+
+# Number of message texts whose rendered lines are kept for redraws.
+RENDER_CACHE_SIZE = 256
+LOAD_OLDER_MESSAGES = "Load older messages"
+# Number of threads listed per search.
+SEARCH_RESULTS = 20
+NEW_SEARCH = "New search"
+BACKGROUND_REPLIES = "Background replies"
+# Redraws per second of the background replies view.
+SESSION_VIEW_FPS = 8
 
 
 def thread_history_read():
     """
-    Reads the thread history from a JSON file.
+    Reads the thread history.
 
     Returns:
         list: A list of thread history records.
     """
-    if os.path.exists(THREAD_HISTORY):
-        with open(THREAD_HISTORY, "r") as file:
-            return json.load(file)
-    return []
+    return get_thread_store().all()
 
 
 def thread_history_write(new_thread):
     """
-    Writes a new thread record to the thread history JSON file.
+    Adds a new thread record to the thread history.
 
     Args:
         new_thread (dict): The new thread record to be added.
     """
-    thread_history = thread_history_read()
-    thread_history.append(new_thread)
-    with open(THREAD_HISTORY, "w") as file:
-        json.dump(thread_history, file)
+    get_thread_store().add(new_thread)
 
 
 def threads_dashboard(api):
@@ -45,10 +54,8 @@ def threads_dashboard(api):
     Args:
         api: API object to interact with the backend.
     """
-    from .assistant_operations import assistant_dashboard
-
     clear_screen()
-    manage_thread_options(api)
+    return manage_thread_options(api)
 
 
 def manage_thread_options(api):
@@ -60,24 +67,27 @@ def manage_thread_options(api):
     """
     from .assistant_operations import assistant_dashboard
 
-    list_threads = thread_history_read()
     list_threads_names = [
         thread["thread_name"]
-        for thread in list_threads
-        if thread["assistant"] == api.assistant.id
+        for thread in get_thread_store().list_threads(api.assistant.id)
     ]
     choices = ["New Chat", "Back", *list_threads_names]
+    background_replies = background_replies_choice()
+    if background_replies:
+        choices.insert(1, background_replies)
     selected_option = inquirer.list_input(
         "Please select an option", choices=choices, carousel=True
     )
 
     if selected_option == "New Chat":
-        handle_new_chat(api)
+        return goto(handle_new_chat, api)
+    elif selected_option == BACKGROUND_REPLIES:
+        return goto(watch_sessions, api)
     elif selected_option == "Back":
         clear_screen()
-        assistant_dashboard(api)
+        return goto(assistant_dashboard, api)
     else:
-        handle_existing_chat(api, list_threads, selected_option)
+        return goto(handle_existing_chat, api, selected_option)
 
 
 def handle_new_chat(api):
@@ -99,27 +109,155 @@ def handle_new_chat(api):
             "user": api.username,
         }
     )
-    chat(api)
+    return goto(chat, api)
 
 
-def handle_existing_chat(api, list_threads, selected_option):
+def handle_existing_chat(api, selected_option):
     """
     Handles interaction with an existing chat thread.
 
     Args:
         api: API object to interact with the backend.
-        list_threads: List of existing threads.
         selected_option: The selected thread name.
     """
-    selected_option_id = [
-        thread["thread"]
-        for thread in list_threads
-        if thread["thread_name"] == selected_option
-    ][0]
-    thread = api.get_thread(selected_option_id)
+    selected_thread = get_thread_store().find_by_name(api.assistant.id, selected_option)
+    thread = api.get_thread(selected_thread["thread"])
     api.thread = thread
     api.thread_name = selected_option
-    chat(api)
+    return goto(chat, api)
+
+
+def search_threads(api):
+    """
+    Searches the transcripts of every indexed thread and opens the chosen
+    one. The search runs on the local index and makes no API calls.
+
+    Args:
+        api: API object to interact with the backend.
+    """
+    from .dashboard import dashboard
+
+    clear_screen()
+    query = Prompt.ask(
+        "Search conversations (leave empty to go back)", default="", show_default=False
+    )
+    if not query.strip():
+        return goto(dashboard, api)
+
+    start = time.perf_counter()
+    hits = api.search_index.search(query, limit=SEARCH_RESULTS)
+    elapsed = (time.perf_counter() - start) * 1000
+    if not hits:
+        console.print(f"[bold yellow]No messages match '{escape(query)}'.[/bold yellow]")
+        pause()
+        return goto(search_threads, api)
+
+    console.print(f"[dim]{len(hits)} threads match ({elapsed:.1f} ms)[/dim]")
+    choices = [
+        (f"{hit['thread_name']}: {' '.join(hit['snippet'].split())}", index)
+        for index, hit in enumerate(hits)
+    ]
+    selected_option = inquirer.list_input(
+        "Please select a thread",
+        choices=[*choices, (NEW_SEARCH, NEW_SEARCH), ("Back", "Back")],
+        carousel=True,
+    )
+
+    if selected_option == NEW_SEARCH:
+        return goto(search_threads, api)
+    elif selected_option == "Back":
+        return goto(dashboard, api)
+    hit = hits[selected_option]
+    return goto(open_thread, api, hit["thread"], hit["thread_name"], hit["assistant"])
+
+
+def open_thread(api, thread_id, thread_name, assistant_id):
+    """
+    Selects a thread and its assistant, and opens the chat. Used to jump to
+    a thread from outside its assistant's thread list.
+
+    Args:
+        api: API object to interact with the backend.
+        thread_id (str): The ID of the thread.
+        thread_name (str): The name of the thread.
+        assistant_id (str): The ID of the thread's assistant.
+    """
+    from .dashboard import dashboard
+
+    try:
+        if not assistant_id:
+            raise ValueError(f"The assistant of thread {thread_id} is unknown")
+        if api.assistant is None or api.assistant.id != assistant_id:
+            api.assistant = api.catalogue.get(assistant_id) or api.get_assistants(
+                assistant_id
+            )
+        api.thread = api.get_thread(thread_id)
+    except Exception as e:
+        return handleError(e, dashboard, [api])
+    api.thread_name = thread_name
+    return goto(chat, api)
+
+
+def background_replies_choice():
+    """
+    Returns the menu choice for the background replies view, or None when
+    there are none.
+    """
+    from .sessions import STREAMING, get_session_manager
+
+    sessions = get_session_manager().all()
+    if not sessions:
+        return None
+    streaming = sum(1 for session in sessions if session.status == STREAMING)
+    label = f"{BACKGROUND_REPLIES} ({streaming} streaming, {len(sessions)} total)"
+    return (label, BACKGROUND_REPLIES)
+
+
+def watch_sessions(api):
+    """
+    Shows the replies streaming in the background side by side or as tabs,
+    until the user goes back or opens one of their threads. The replies
+    keep streaming either way.
+
+    Args:
+        api: API object to interact with the backend.
+    """
+    import readchar
+    from rich.live import Live
+
+    from .dashboard import dashboard
+    from .sessions import SessionView, get_session_manager
+
+    manager = get_session_manager()
+    view = SessionView(manager)
+    opened = None
+    with Live(
+        view, console=console, screen=True, refresh_per_second=SESSION_VIEW_FPS
+    ) as live:
+        while True:
+            key = readchar.readkey()
+            if key in (readchar.key.RIGHT, readchar.key.TAB):
+                view.move(1)
+            elif key == readchar.key.LEFT:
+                view.move(-1)
+            elif key == "s":
+                view.toggle_mode()
+            elif key == "d":
+                manager.dismiss_finished()
+            elif key == "o" and view.selected_session is not None:
+                opened = view.selected_session
+                break
+            elif key in ("q", readchar.key.ESC):
+                break
+            live.refresh()
+
+    if opened is not None:
+        return goto(
+            open_thread, api, opened.thread_id, opened.thread_name, opened.assistant_id
+        )
+    if api.assistant is not None:
+        return goto(threads_dashboard, api)
+    return goto(dashboard, api)
 
 
 def log_message_history(message_history, api):
@@ -127,30 +265,100 @@ def log_message_history(message_history, api):
     Logs the message history of a chat thread.
 
     Args:
-        message_history: The history of messages in the thread.
+        message_history: An iterable of the messages in the thread, oldest
+            first. Messages are rendered as soon as they are produced.
         api: API object to interact with the backend.
     """
     console.print("Message history:")
-    for message_object in message_history[::-1]:
+    log_new_messages(message_history, api)
+
+
+def log_new_messages(messages, api):
+    """
+    Appends messages to the chat output without redrawing the screen.
+
+    Args:
+        messages: An iterable of the messages to display, oldest first.
+        api: API object to interact with the backend.
+    """
+    for message_object in messages:
         logger.info(message_object)
         display_message_content(message_object, api)
 
 
-def chat(api):
+def chat(api, redraw=True):
     """
     Manages the chat interface for the selected thread.
 
+    Only messages newer than the thread's local message store are fetched.
+    With `redraw`, the latest page of the history is rendered from the
+    store and older pages are offered on demand; otherwise the new messages
+    are appended below what is already on screen.
+
     Args:
         api: API object to interact with the backend.
+        redraw (bool): Whether to clear the screen and render the history.
     """
+    from .api_wrapper import HISTORY_PAGE_SIZE
+
     assert api.assistant is not None, "No assistant selected"
     assert api.thread is not None, "No thread selected"
 
+    if redraw:
+        clear_screen()
+        display_chat_header(api)
+        display_background_reply_status(api)
+        api.sync_messages()
+        store = api.get_message_store()
+        if store.has_older or len(store) > HISTORY_PAGE_SIZE:
+            console.print(
+                f"[dim]Older messages are hidden. Choose '{LOAD_OLDER_MESSAGES}' "
+                "to see them.[/dim]"
+            )
+        log_message_history(store.messages[-HISTORY_PAGE_SIZE:], api)
+    else:
+        log_new_messages(api.iter_new_messages(), api)
+
+    return handle_chat_options(api)
+
+
+def show_older_messages(api, before_id):
+    """
+    Shows the page of messages right before a message, from the message
+    store when it holds them and from the API otherwise. Only one page is
+    kept in memory at a time.
+
+    Args:
+        api: API object to interact with the backend.
+        before_id (str): The ID of the oldest message shown so far.
+    """
+    from .api_wrapper import HISTORY_PAGE_SIZE
+
     clear_screen()
     display_chat_header(api)
-    log_message_history(api.get_messages().data, api)
 
-    handle_chat_options(api)
+    store = api.get_message_store()
+    index = store.index(before_id)
+    if index is not None and (index >= HISTORY_PAGE_SIZE or not store.has_older):
+        messages = store.messages[max(0, index - HISTORY_PAGE_SIZE) : index]
+        has_more = index > HISTORY_PAGE_SIZE or store.has_older
+    else:
+        try:
+            messages, has_more = api.get_older_messages(before_id)
+        except Exception as e:
+            return handleError(e, chat, [api])
+
+    log_message_history(messages, api)
+
+    choices = ["Back to latest"]
+    if messages and has_more:
+        choices.insert(0, LOAD_OLDER_MESSAGES)
+    selected_option = inquirer.list_input(
+        "Please select an option", choices=choices, carousel=True
+    )
+    if selected_option == LOAD_OLDER_MESSAGES:
+        return goto(show_older_messages, api, messages[0].id)
+    return goto(chat, api)
 
 
 def display_chat_header(api):
@@ -168,6 +376,24 @@ def display_chat_header(api):
     )
 
 
+def display_background_reply_status(api):
+    """
+    Tells the user when a reply is streaming on the current thread in the
+    background; it shows up in the history once it is done.
+
+    Args:
+        api: API object to interact with the backend.
+    """
+    from .sessions import STREAMING, get_session_manager
+
+    session = get_session_manager().get(api.thread.id)
+    if session is not None and session.status == STREAMING:
+        console.print(
+            f"[dim]A reply is streaming in the background. Choose "
+            f"'{BACKGROUND_REPLIES}' to watch it.[/dim]"
+        )
+
+
 def handle_chat_options(api):
     """
     Presents and handles the different chat options like adding messages, sending messages, etc.
@@ -175,29 +401,41 @@ def handle_chat_options(api):
     Args:
         api: API object to interact with the backend.
     """
+    from .api_wrapper import HISTORY_PAGE_SIZE
+
+    store = api.get_message_store()
+    window = store.messages[-HISTORY_PAGE_SIZE:]
+    has_older = bool(window) and (store.has_older or len(store) > len(window))
+
+    choices = ["Add message", "Send message", "Send in background"]
+    background_replies = background_replies_choice()
+    if background_replies:
+        choices.append(background_replies)
+    if has_older:
+        choices.append(LOAD_OLDER_MESSAGES)
     selected_option = inquirer.list_input(
         "Please select an option",
-        choices=[
-            "Add message",
-            "Send message",
-            "Rename thread",
-            "Delete thread",
-            "Back",
-        ],
+        choices=[*choices, "Rename thread", "Delete thread", "Back"],
         carousel=True,
     )
 
-    if selected_option == "Add message":
-        handle_add_message(api)
+    if selected_option == LOAD_OLDER_MESSAGES:
+        return goto(show_older_messages, api, window[0].id)
+    elif selected_option == "Add message":
+        return goto(handle_add_message, api)
     elif selected_option == "Send message":
-        handle_send_message(api)
+        return goto(handle_send_message, api)
+    elif selected_option == "Send in background":
+        return goto(handle_send_in_background, api)
+    elif selected_option == BACKGROUND_REPLIES:
+        return goto(watch_sessions, api)
     elif selected_option == "Rename thread":
-        handle_rename_thread(api)
+        return goto(handle_rename_thread, api)
     elif selected_option == "Delete thread":
-        handle_delete_thread(api)
+        return goto(handle_delete_thread, api)
     elif selected_option == "Back":
         api.thread_id = None
-        threads_dashboard(api)
+        return goto(threads_dashboard, api)
 
 
 def display_message_content(message_object, api):
@@ -209,10 +447,11 @@ def display_message_content(message_object, api):
         api: API object to interact with the backend.
     """
     # Display message based on its type
-    if message_object.role == "user":
-        display_user_message(message_object, api)
-    else:
-        display_assistant_message(message_object, api)
+    with get_tracer().span("message", "render", role=message_object.role):
+        if message_object.role == "user":
+            display_user_message(message_object, api)
+        else:
+            display_assistant_message(message_object, api)
 
 
 def display_user_message(message_object, api):
@@ -226,7 +465,7 @@ def display_user_message(message_object, api):
     console.print(f"\n[bold green]User:[/bold green]")
     for message_content in message_object.content:
         if message_content.type == "text":
-            console.print(f"[italic green]{message_content.text.value}[/italic green]")
+            console.print(render_text(message_content.text.value, "italic green"))
             display_attached_files(message_object, api)
 
 
@@ -241,11 +480,45 @@ def display_assistant_message(message_object, api):
     console.print(f"\n[bold blue]Assistant:[/bold blue]")
     for message_content in message_object.content:
         if message_content.type == "text":
-            console.print(f"[italic blue]{message_content.text.value}[/italic blue]")
+            if RENDER_MARKDOWN:
+                console.print(render_text(message_content.text.value, "blue", True))
+            else:
+                console.print(render_text(message_content.text.value, "italic blue"))
         elif message_content.type == "image_file":
             display_image_file(message_content, api)
 
 
+def render_text(value, style, markdown=False):
+    """
+    Returns a message text laid out for the current terminal width.
+
+    The lines are cached, so redrawing a history does not lay the same
+    messages out again. Message text is shown literally, not parsed as
+    Rich markup.
+
+    Args:
+        value (str): The message text.
+        style (str): The Rich style to show it in.
+        markdown (bool): Whether to render the text as Markdown.
+    """
+    return _render_lines(value, style, console.width, markdown)
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_lines(value, style, width, markdown):
+    if markdown:
+        renderable = Markdown(value, code_theme=CODE_THEME, style=style)
+    else:
+        renderable = Text(value, style=style)
+    lines = console.render_lines(
+        renderable,
+        console.options.update_width(width),
+        pad=False,
+        new_lines=True,
+    )
+    return Segments([segment for line in lines for segment in line])
+
+
 def handle_add_message(api):
     """
     Handles adding a new message to the chat thread.
@@ -262,10 +535,10 @@ def handle_add_message(api):
             f"[bold green]Message '{message}' added successfully![/bold green]"
         )
     except Exception as e:
-        handleError(e, chat, [api])
-    finally:
-        time.sleep(1)
-        chat(api)
+        return handleError(e, chat, [api])
+
+    pause()
+    return goto(chat, api, False)
 
 
 def handle_file_attachment(api):
@@ -298,23 +571,17 @@ def select_file_to_attach(api):
     Returns:
         List: A list containing the selected file ID.
     """
-    list_of_files = [
-        api.client.files.retrieve(file_id).filename
-        for file_id in api.assistant.file_ids
-    ]
-    if not list_of_files:
+    file_ids = api.assistant.file_ids
+    if not file_ids:
         console.print("[yellow]No files available to attach.[/yellow]")
-        time.sleep(1)
+        pause()
         return []
 
-    attached_file = inquirer.list_input(
-        "Please select a file", choices=list_of_files, carousel=True
+    choices = list(zip(api.get_filenames(file_ids), file_ids))
+    attached_file_id = inquirer.list_input(
+        "Please select a file", choices=choices, carousel=True
     )
-    return [
-        file_id
-        for file_id in api.assistant.file_ids
-        if api.client.files.retrieve(file_id).filename == attached_file
-    ]
+    return [attached_file_id]
 
 
 def handle_send_message(api):
@@ -328,10 +595,38 @@ def handle_send_message(api):
         # api.send_message()
         # api.check_run_status()
         api.send_message_and_stream()
+        # The reply has already been streamed to the screen.
+        api.sync_messages()
+        console.print()
     except Exception as e:
-        handleError(e, chat, [api])
-    finally:
-        chat(api)
+        return handleError(e, chat, [api])
+
+    return goto(chat, api, False)
+
+
+def handle_send_in_background(api):
+    """
+    Starts streaming the reply to the composed message in the background,
+    and goes back to the thread list so another thread can be used meanwhile.
+
+    Args:
+        api: API object to interact with the backend.
+    """
+    from .sessions import get_session_manager
+
+    try:
+        get_session_manager().start(
+            api, api.thread.id, api.thread_name, api.assistant.id
+        )
+    except Exception as e:
+        return handleError(e, chat, [api])
+
+    console.print(
+        f"[bold green]The reply is streaming in the background. Choose "
+        f"'{BACKGROUND_REPLIES}' to watch it.[/bold green]"
+    )
+    pause()
+    return goto(threads_dashboard, api)
 
 
 def handle_rename_thread(api):
@@ -346,9 +641,9 @@ def handle_rename_thread(api):
         update_thread_history(api.thread.id, new_name)
         api.thread_name = new_name
     except Exception as e:
-        handleError(e, chat, [api])
-    finally:
-        chat(api)
+        return handleError(e, chat, [api])
+
+    return goto(chat, api)
 
 
 def update_thread_history(thread_id, new_name):
@@ -359,13 +654,7 @@ def update_thread_history(thread_id, new_name):
         thread_id (str): The ID of the thread to be updated.
         new_name (str): The new name for the thread.
     """
-    thread_history = thread_history_read()
-    thread_history = [
-        thread if thread["thread"] != thread_id else {**thread, "thread_name": new_name}
-        for thread in thread_history
-    ]
-    with open(THREAD_HISTORY, "w") as file:
-        json.dump(thread_history, file)
+    get_thread_store().rename(thread_id, new_name)
 
 
 def handle_delete_thread(api):
@@ -377,17 +666,19 @@ def handle_delete_thread(api):
     """
     try:
         delete_thread_from_history(api.thread.id)
+        api.search_index.delete_thread(api.thread.id)
         api.client.beta.threads.delete(thread_id=api.thread.id)
+        api.message_stores.pop(api.thread.id, None)
         api.thread = None
         api.thread_name = None
         console.print(
             f"[bold green]Thread '{api.thread_name}' deleted successfully![/bold green]"
         )
     except Exception as e:
-        handleError(e, chat, [api])
-    finally:
-        time.sleep(1)
-        threads_dashboard(api)
+        return handleError(e, chat, [api])
+
+    pause()
+    return goto(threads_dashboard, api)
 
 
 def delete_thread_from_history(thread_id):
@@ -397,12 +688,7 @@ def delete_thread_from_history(thread_id):
     Args:
         thread_id (str): The ID of the thread to be deleted.
     """
-    thread_history = thread_history_read()
-    thread_history = [
-        thread for thread in thread_history if thread["thread"] != thread_id
-    ]
-    with open(THREAD_HISTORY, "w") as file:
-        json.dump(thread_history, file)
+    get_thread_store().delete(thread_id)
 
 
 def display_attached_files(message_object, api):
@@ -414,10 +700,7 @@ def display_attached_files(message_object, api):
         api: API object to interact with the backend.
     """
     if message_object.file_ids:
-        filenames = [
-            api.client.files.retrieve(file_id).filename
-            for file_id in message_object.file_ids
-        ]
+        filenames = api.get_filenames(message_object.file_ids)
         console.print(
             f"([bold green]Files attached:[/bold green] {', '.join(filenames)})"
         )
@@ -441,33 +724,38 @@ def display_image_file(message_content, api):
 
 def download_and_show_image(file_id, api):
     """
-    Downloads and shows an image file.
+    Shows an image file, straight from the image cache when possible.
+    Images that are not cached yet are downloaded in the background and
+    shown once they arrive, so rendering the history does not wait on them.
 
     Args:
         file_id (str): The ID of the file to download.
         api: API object to interact with the backend.
     """
-    try:
-        file_content = api.client.files.with_raw_response.retrieve_content(
-            file_id=file_id
-        ).content
-        file_path = f"{file_id}.png"
-        save_image_file(file_content, file_path)
-        open_image(file_path)
-    except Exception as e:
-        handleError(e, "Error handling image file")
+    image_cache = get_image_cache()
+    cached_path = image_cache.path_for(file_id)
+    if cached_path:
+        open_image(cached_path)
+        return
+
+    console.print("[italic blue]Downloading image in the background...[/italic blue]")
+    image_cache.fetch_async(
+        file_id, lambda: download_image(file_id, api), on_ready=open_image
+    )
 
 
-def save_image_file(file_content, file_path):
+def download_image(file_id, api):
     """
-    Saves the image file to the local filesystem.
+    Downloads the content of an image file.
 
     Args:
-        file_content: The content of the image file.
-        file_path (str): The path where the image will be saved.
+        file_id (str): The ID of the file to download.
+        api: API object to interact with the backend.
+
+    Returns:
+        bytes: The image data.
     """
-    with open(file_path, "wb") as file:
-        file.write(file_content)
+    return api.client.files.with_raw_response.retrieve_content(file_id=file_id).content
 
 
 def open_image(file_path):
@@ -477,6 +765,9 @@ def open_image(file_path):
     Args:
         file_path (str): The path of the image file to open.
     """
+    # PIL is only needed here, so it is not imported at startup.
+    from PIL import Image
+
     try:
         image = Image.open(file_path)
         image.show()
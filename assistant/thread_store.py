@@ -0,0 +1,167 @@
+import json
+import os
+import sqlite3
+import threading
+
+from .ui_utils import logger
+
+# SQLite database holding the thread history.
+THREAD_HISTORY_DB = os.path.expanduser("~/.assistant-gpt-threads.db")
+# JSON file used by earlier versions; migrated into the database once.
+LEGACY_THREAD_HISTORY = os.path.expanduser("~/.assistant-gpt-threads.json")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    id INTEGER PRIMARY KEY,
+    thread TEXT NOT NULL UNIQUE,
+    assistant TEXT NOT NULL,
+    thread_name TEXT NOT NULL,
+    user TEXT
+);
+CREATE INDEX IF NOT EXISTS threads_by_assistant_name
+    ON threads (assistant, thread_name);
+"""
+
+_COLUMNS = ("assistant", "thread", "thread_name", "user")
+
+
+class ThreadHistoryStore:
+    """
+    Thread history records stored in SQLite and indexed by thread ID and by
+    assistant and name, so lookups and updates touch a single record.
+
+    Records are plain dicts with the keys `assistant`, `thread`,
+    `thread_name` and `user`, the same shape the JSON history used.
+    """
+
+    def __init__(self, path=THREAD_HISTORY_DB, legacy_path=LEGACY_THREAD_HISTORY):
+        """
+        Args:
+            path (str): Path of the SQLite database.
+            legacy_path (str, optional): JSON history to migrate, if it exists.
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        if legacy_path and os.path.exists(legacy_path):
+            self._migrate_legacy(legacy_path)
+
+    def _migrate_legacy(self, legacy_path):
+        """
+        Imports the records of a JSON history file and renames it so the
+        migration only happens once.
+        """
+        with open(legacy_path, "r") as file:
+            records = json.load(file)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO threads (assistant, thread, thread_name, user)"
+                " VALUES (:assistant, :thread, :thread_name, :user)",
+                [
+                    {column: record.get(column) for column in _COLUMNS}
+                    for record in records
+                ],
+            )
+        os.replace(legacy_path, legacy_path + ".migrated")
+        logger.info(f"Migrated {len(records)} threads from {legacy_path}")
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{column: row[column] for column in _COLUMNS} for row in rows]
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).rowcount
+
+    def add(self, record):
+        """
+        Adds a thread record, replacing any record with the same thread ID.
+
+        Args:
+            record (dict): The thread record.
+        """
+        self._execute(
+            "INSERT OR REPLACE INTO threads (assistant, thread, thread_name, user)"
+            " VALUES (:assistant, :thread, :thread_name, :user)",
+            {column: record.get(column) for column in _COLUMNS},
+        )
+
+    def all(self):
+        """
+        Returns every thread record, oldest first.
+        """
+        return self._query("SELECT * FROM threads ORDER BY id")
+
+    def list_threads(self, assistant_id):
+        """
+        Returns the thread records of an assistant, oldest first.
+
+        Args:
+            assistant_id (str): The ID of the assistant.
+        """
+        return self._query(
+            "SELECT * FROM threads WHERE assistant = ? ORDER BY id", (assistant_id,)
+        )
+
+    def get(self, thread_id):
+        """
+        Returns the record of a thread, or None if it is unknown.
+
+        Args:
+            thread_id (str): The ID of the thread.
+        """
+        records = self._query("SELECT * FROM threads WHERE thread = ?", (thread_id,))
+        return records[0] if records else None
+
+    def find_by_name(self, assistant_id, thread_name):
+        """
+        Returns the first record of an assistant with the given thread name,
+        or None if there is none.
+
+        Args:
+            assistant_id (str): The ID of the assistant.
+            thread_name (str): The name of the thread.
+        """
+        records = self._query(
+            "SELECT * FROM threads WHERE assistant = ? AND thread_name = ?"
+            " ORDER BY id LIMIT 1",
+            (assistant_id, thread_name),
+        )
+        return records[0] if records else None
+
+    def rename(self, thread_id, new_name):
+        """
+        Renames a thread.
+
+        Args:
+            thread_id (str): The ID of the thread.
+            new_name (str): The new name for the thread.
+        """
+        self._execute(
+            "UPDATE threads SET thread_name = ? WHERE thread = ?", (new_name, thread_id)
+        )
+
+    def delete(self, thread_id):
+        """
+        Removes a thread record.
+
+        Args:
+            thread_id (str): The ID of the thread.
+        """
+        self._execute("DELETE FROM threads WHERE thread = ?", (thread_id,))
+
+
+_store = None
+
+
+def get_thread_store():
+    """
+    Returns the process-wide thread history store, opening it on first use.
+    """
+    global _store
+    if _store is None:
+        _store = ThreadHistoryStore()
+    return _store
@@ -0,0 +1,228 @@
+import contextlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+import httpx
+from rich.table import Table
+
+from .percentiles import summarize
+from .ui_utils import console
+
+# Maximum number of spans kept for the trace file; aggregates are unbounded.
+MAX_TRACE_EVENTS = int(os.environ.get("ASSISTANT_GPT_TRACE_EVENTS", 100_000))
+
+# Path segments that are object IDs, e.g. thread_abc, asst_abc or file-abc.
+_ID_SEGMENT = re.compile(r"/(?:[a-z]+_|file-)[A-Za-z0-9]+")
+
+
+def endpoint_name(request):
+    """
+    Names an API request by method and path, with object IDs replaced by
+    `{id}` so calls to the same endpoint aggregate together.
+    """
+    return f"{request.method} {_ID_SEGMENT.sub('/{id}', request.url.path)}"
+
+
+class Tracer:
+    """
+    Records timed spans and aggregates their durations per category and name.
+
+    Spans are kept (up to MAX_TRACE_EVENTS) for export as a Chrome trace,
+    which chrome://tracing and Perfetto can open. Nothing is recorded until
+    the tracer is enabled, so instrumented code costs a flag check otherwise.
+    """
+
+    def __init__(self, max_events=MAX_TRACE_EVENTS):
+        self.enabled = False
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._events = []
+        self._durations = defaultdict(list)
+
+    def record(self, name, category, start, duration, **args):
+        """
+        Records a finished span.
+
+        Args:
+            name (str): What was timed, e.g. an endpoint or a screen.
+            category (str): The kind of work: "api", "screen", "render"...
+            start (float): `time.perf_counter()` when the span started.
+            duration (float): Its length in seconds.
+            **args: Extra details shown in the trace viewer.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._durations[(category, name)].append(duration)
+            if len(self._events) < self.max_events:
+                self._events.append(
+                    {
+                        "name": name,
+                        "cat": category,
+                        "ph": "X",
+                        "ts": (start - self._origin) * 1e6,
+                        "dur": duration * 1e6,
+                        "pid": os.getpid(),
+                        "tid": threading.get_ident(),
+                        "args": args,
+                    }
+                )
+
+    @contextlib.contextmanager
+    def span(self, name, category="app", **args):
+        """
+        Times the body of a `with` block.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, time.perf_counter() - start, **args)
+
+    def export_chrome_trace(self, path):
+        """
+        Writes the recorded spans as a Chrome trace JSON file.
+        """
+        with self._lock:
+            events = list(self._events)
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def summary(self):
+        """
+        Returns duration statistics in milliseconds per (category, name).
+        """
+        with self._lock:
+            durations = {key: list(values) for key, values in self._durations.items()}
+        return {
+            key: summarize([value * 1000 for value in values])
+            for key, values in sorted(durations.items())
+        }
+
+    def print_summary(self):
+        """
+        Prints the duration statistics as a table.
+        """
+        table = Table(title="Trace summary (ms)")
+        for column in ("Category", "Name"):
+            table.add_column(column)
+        for column in ("Count", "Mean", "p50", "p90", "p99", "Max"):
+            table.add_column(column, justify="right")
+        for (category, name), stats in self.summary().items():
+            table.add_row(
+                category,
+                name,
+                str(stats["count"]),
+                *(
+                    f"{stats[key]:.1f}"
+                    for key in ("mean", "p50", "p90", "p99", "max")
+                ),
+            )
+        console.print(table)
+
+
+def trace_transition(route, next_route, elapsed):
+    """
+    A router transition hook that records every screen as a span.
+    """
+    next_name = next_route.screen.__name__ if next_route else "exit"
+    get_tracer().record(
+        route.screen.__name__,
+        "screen",
+        time.perf_counter() - elapsed,
+        elapsed,
+        next=next_name,
+    )
+
+
+class TracingTransport(httpx.BaseTransport):
+    """
+    An httpx transport that records every request as an "api" span, named
+    by endpoint. Streamed responses are timed up to their headers.
+    """
+
+    def __init__(self, tracer, transport=None):
+        """
+        Args:
+            tracer (Tracer): The tracer to record to.
+            transport (httpx.BaseTransport, optional): The transport doing
+                the actual I/O.
+        """
+        self.tracer = tracer
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request):
+        if not self.tracer.enabled:
+            return self._transport.handle_request(request)
+        start = time.perf_counter()
+        status = None
+        try:
+            response = self._transport.handle_request(request)
+            status = response.status_code
+            return response
+        finally:
+            self.tracer.record(
+                endpoint_name(request),
+                "api",
+                start,
+                time.perf_counter() - start,
+                status=status,
+            )
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncTracingTransport(httpx.AsyncBaseTransport):
+    """
+    The asyncio counterpart of TracingTransport.
+    """
+
+    def __init__(self, tracer, transport=None):
+        """
+        Args:
+            tracer (Tracer): The tracer to record to.
+            transport (httpx.AsyncBaseTransport, optional): The transport
+                doing the actual I/O.
+        """
+        self.tracer = tracer
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        if not self.tracer.enabled:
+            return await self._transport.handle_async_request(request)
+        start = time.perf_counter()
+        status = None
+        try:
+            response = await self._transport.handle_async_request(request)
+            status = response.status_code
+            return response
+        finally:
+            self.tracer.record(
+                endpoint_name(request),
+                "api",
+                start,
+                time.perf_counter() - start,
+                status=status,
+            )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+_tracer = Tracer()
+
+
+def get_tracer():
+    """
+    Returns the process-wide tracer.
+    """
+    return _tracer
@@ -8,6 +8,9 @@ from . import ascii_art
 console = Console()
 logger = logging.getLogger(__name__)
 
+# Seconds a confirmation message stays on screen before moving on.
+PAUSE_SECONDS = float(os.environ.get("ASSISTANT_GPT_PAUSE_SECONDS", 1))
+
 
 def clear_screen():
     """
@@ -33,11 +36,27 @@ def app_exit():
     """
     _clear_terminal()
     console.print(ascii_art.ascii_goodbye)
-    time.sleep(1)
+    pause()
     _clear_terminal()
     exit()
 
 
+def pause(seconds=None):
+    """
+    Leaves the screen as it is for a moment so the user can read it.
+    Pauses are traced so they can be told apart from slow work.
+
+    Args:
+        seconds (float, optional): How long to pause. Defaults to
+            PAUSE_SECONDS.
+    """
+    from .tracing import get_tracer
+
+    seconds = PAUSE_SECONDS if seconds is None else seconds
+    with get_tracer().span("pause", "pause"):
+        time.sleep(seconds)
+
+
 def _clear_terminal():
     """
     Clears the terminal screen based on the operating system.
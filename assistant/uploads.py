@@ -0,0 +1,304 @@
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+from openai.types import FileObject
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    DownloadColumn,
+    Progress,
+    TextColumn,
+    TimeRemainingColumn,
+    TransferSpeedColumn,
+)
+
+from .paths import cache_dir
+from .ui_utils import logger
+
+_MB = 1024 * 1024
+# Files at least this large go through the multipart Uploads API. The pinned
+# SDK predates its `client.uploads` resource, so the endpoints are called
+# through the client's generic request methods.
+MULTIPART_THRESHOLD = int(os.environ.get("ASSISTANT_GPT_MULTIPART_MB", 64)) * _MB
+# Size of each part; the API accepts parts of up to 64 MB.
+PART_SIZE = int(os.environ.get("ASSISTANT_GPT_PART_MB", 16)) * _MB
+# Number of parts uploaded at the same time.
+UPLOAD_WORKERS = int(os.environ.get("ASSISTANT_GPT_UPLOAD_WORKERS", 4))
+
+# Progress goes to stderr so it never mixes with output written to stdout.
+progress_console = Console(stderr=True)
+
+
+def create_progress(enabled=True):
+    """
+    Returns a progress display showing bytes sent and throughput, on stderr.
+
+    Args:
+        enabled (bool): Whether to show it at all; a disabled display can be
+            used like any other and renders nothing.
+    """
+    return Progress(
+        TextColumn("[bold blue]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+        console=progress_console,
+        disable=not enabled,
+        # Leave stdout alone: it may carry results, e.g. JSON lines.
+        redirect_stdout=False,
+    )
+
+
+class _ProgressFile(io.FileIO):
+    """
+    A file that reports how far into it has been read, once per byte.
+    Rewinds (e.g. when a request is retried) are not reported twice.
+    """
+
+    def __init__(self, path, on_progress):
+        super().__init__(path, "rb")
+        self._on_progress = on_progress
+        self._reported = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        position = self.tell()
+        if position > self._reported:
+            self._on_progress(position - self._reported)
+            self._reported = position
+        return chunk
+
+
+class _ProgressPart(io.RawIOBase):
+    """
+    A byte range of a file, read from disk as it is sent and reporting read
+    progress like `_ProgressFile`. Positions are relative to the range, so
+    the HTTP client can size it and rewind it for a retry.
+    """
+
+    def __init__(self, path, offset, size, on_progress):
+        super().__init__()
+        self._file = open(path, "rb")
+        self._offset = offset
+        self._size = size
+        self._position = 0
+        self._on_progress = on_progress
+        self._reported = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, position, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            position += self._position
+        elif whence == io.SEEK_END:
+            position += self._size
+        self._position = min(max(position, 0), self._size)
+        return self._position
+
+    def read(self, size=-1):
+        remaining = self._size - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        self._file.seek(self._offset + self._position)
+        chunk = self._file.read(size)
+        self._position += len(chunk)
+        if self._position > self._reported:
+            self._on_progress(self._position - self._reported)
+            self._reported = self._position
+        return chunk
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+class _StaleUpload(Exception):
+    """
+    Raised when a checkpointed upload can no longer be resumed.
+    """
+
+
+class UploadCheckpoint:
+    """
+    The state of a multipart upload, persisted after every part so that an
+    interrupted upload of the same, unchanged file can resume.
+    """
+
+    def __init__(self, file_path):
+        stat = os.stat(file_path)
+        key = hashlib.sha1(
+            f"{os.path.abspath(file_path)}\0{stat.st_size}\0{stat.st_mtime_ns}".encode()
+        ).hexdigest()
+        self.path = os.path.join(cache_dir("uploads"), f"{key}.json")
+        self._lock = threading.Lock()
+        self.state = {}
+        try:
+            with open(self.path, "r") as file:
+                self.state = json.load(file)
+        except (OSError, ValueError):
+            pass
+
+    def is_resumable(self, part_size):
+        """
+        Whether the checkpoint belongs to a live upload with the same part size.
+        """
+        return (
+            bool(self.state.get("upload_id"))
+            and self.state.get("part_size") == part_size
+            and self.state.get("expires_at", 0) > time.time() + 60
+        )
+
+    def start(self, upload, part_size):
+        with self._lock:
+            self.state = {
+                "upload_id": upload["id"],
+                "expires_at": upload["expires_at"],
+                "part_size": part_size,
+                "parts": {},
+            }
+            self._save_locked()
+
+    def completed_parts(self):
+        with self._lock:
+            return {int(index): part_id for index, part_id in self.state["parts"].items()}
+
+    def add_part(self, index, part_id):
+        with self._lock:
+            self.state["parts"][str(index)] = part_id
+            self._save_locked()
+
+    def _save_locked(self):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path))
+        with os.fdopen(fd, "w") as file:
+            json.dump(self.state, file)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def upload_file(client, file_path, purpose="assistants", progress=None):
+    """
+    Uploads a file, using resumable parallel multipart uploads for large files.
+
+    Args:
+        client: The OpenAI client.
+        file_path (str): Path of the file to upload.
+        purpose (str): The purpose of the file.
+        progress (rich.progress.Progress, optional): A running progress
+            display to add this upload to. A new one is shown otherwise.
+
+    Returns:
+        The uploaded file object.
+    """
+    if progress is None:
+        with create_progress() as progress:
+            return upload_file(client, file_path, purpose, progress)
+
+    size = os.path.getsize(file_path)
+    task = progress.add_task(os.path.basename(file_path), total=size)
+
+    def advance(amount):
+        progress.update(task, advance=amount)
+
+    if size < MULTIPART_THRESHOLD:
+        with _ProgressFile(file_path, advance) as file:
+            return client.files.create(
+                file=(os.path.basename(file_path), file), purpose=purpose
+            )
+    try:
+        return _multipart_upload(client, file_path, size, purpose, advance)
+    except _StaleUpload:
+        progress.reset(task)
+        return _multipart_upload(
+            client, file_path, size, purpose, advance, resume=False
+        )
+
+
+def _multipart_upload(client, file_path, size, purpose, advance, resume=True):
+    """
+    Uploads a large file in parts through the Uploads API, skipping the parts
+    a previous attempt already uploaded.
+
+    Raises:
+        _StaleUpload: The checkpointed upload has expired or was cancelled.
+    """
+    checkpoint = UploadCheckpoint(file_path)
+    part_count = -(-size // PART_SIZE)
+    resumed = resume and checkpoint.is_resumable(PART_SIZE)
+
+    if resumed:
+        logger.info(f"Resuming upload {checkpoint.state['upload_id']} of {file_path}")
+    else:
+        upload = client.post(
+            "/uploads",
+            body={
+                "bytes": size,
+                "filename": os.path.basename(file_path),
+                "mime_type": mimetypes.guess_type(file_path)[0]
+                or "application/octet-stream",
+                "purpose": purpose,
+            },
+            cast_to=object,
+        )
+        checkpoint.start(upload, PART_SIZE)
+
+    upload_id = checkpoint.state["upload_id"]
+    done = checkpoint.completed_parts()
+    for index in done:
+        advance(min(PART_SIZE, size - index * PART_SIZE))
+
+    def send_part(index):
+        offset = index * PART_SIZE
+        part_size = min(PART_SIZE, size - offset)
+        with _ProgressPart(file_path, offset, part_size, advance) as data:
+            part = client.post(
+                f"/uploads/{upload_id}/parts",
+                body={},
+                files=[("data", (f"part-{index}", data))],
+                options={"headers": {"Content-Type": "multipart/form-data"}},
+                cast_to=object,
+            )
+        checkpoint.add_part(index, part["id"])
+
+    missing = [index for index in range(part_count) if index not in done]
+    try:
+        with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+            # Consume the results so the first failure is raised here.
+            list(executor.map(send_part, missing))
+
+        parts = checkpoint.completed_parts()
+        upload = client.post(
+            f"/uploads/{upload_id}/complete",
+            body={"part_ids": [parts[index] for index in range(part_count)]},
+            cast_to=object,
+        )
+    except (openai.NotFoundError, openai.BadRequestError) as e:
+        # Expired or cancelled uploads are rejected; any other error, e.g. a
+        # rate limit that outlasted the retries, keeps the checkpoint.
+        if not resumed:
+            raise
+        logger.info(f"Upload {upload_id} cannot be resumed: {e}")
+        checkpoint.clear()
+        raise _StaleUpload() from e
+    checkpoint.clear()
+    return FileObject.model_validate(upload["file"])
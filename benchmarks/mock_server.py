@@ -0,0 +1,613 @@
+"""
+A localhost fake of the Assistants, Threads, Messages, Files, Uploads and
+streaming Runs endpoints, good enough to drive the CLI without an account.
+
+Run it standalone and point the CLI at it:
+
+    python -m benchmarks.mock_server --port 8080 --latency 50
+    OPENAI_BASE_URL=http://127.0.0.1:8080/v1 python -m assistant
+"""
+
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Path segments that are object IDs, collapsed when counting calls.
+_ID_SEGMENT = re.compile(r"/(?:[a-z]+_|file-)[A-Za-z0-9]+")
+_FILENAME = re.compile(rb'filename="([^"]*)"')
+
+
+def _words(size):
+    """
+    Returns about `size` characters of filler text.
+    """
+    text = "lorem ipsum dolor sit amet " * (size // 27 + 1)
+    return text[:size]
+
+
+class MockState:
+    """
+    In-memory objects of the fake API. IDs increase monotonically so that
+    cursor pagination orders by creation like the real API.
+    """
+
+    def __init__(
+        self,
+        payload_size=200,
+        stream_deltas=500,
+        delta_size=4,
+        delta_interval=0.0,
+        paragraph_deltas=50,
+    ):
+        """
+        Args:
+            payload_size (int): Characters of text in generated messages.
+            stream_deltas (int): Text deltas sent by a streamed run.
+            delta_size (int): Characters per delta.
+            delta_interval (float): Seconds between deltas.
+            paragraph_deltas (int): Deltas per paragraph of streamed text.
+        """
+        self.payload_size = payload_size
+        self.stream_deltas = stream_deltas
+        self.delta_size = delta_size
+        self.delta_interval = delta_interval
+        self.paragraph_deltas = paragraph_deltas
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.assistants = {}
+        self.assistant_files = {}
+        self.threads = {}
+        self.messages = {}
+        self.runs = {}
+        self.files = {}
+        self.file_contents = {}
+        self.uploads = {}
+
+    def new_id(self, prefix):
+        with self.lock:
+            return f"{prefix}{next(self._ids):012d}"
+
+    def create_assistant(self, name="Benchmark", **fields):
+        assistant = {
+            "id": self.new_id("asst_"),
+            "object": "assistant",
+            "created_at": int(time.time()),
+            "name": name,
+            "description": fields.get("description"),
+            "model": fields.get("model") or "gpt-4-1106-preview",
+            "instructions": fields.get("instructions"),
+            "tools": fields.get("tools") or [],
+            "file_ids": fields.get("file_ids") or [],
+            "metadata": fields.get("metadata") or {},
+        }
+        self.assistants[assistant["id"]] = assistant
+        self.assistant_files[assistant["id"]] = []
+        return assistant
+
+    def create_thread(self):
+        thread = {
+            "id": self.new_id("thread_"),
+            "object": "thread",
+            "created_at": int(time.time()),
+            "metadata": {},
+        }
+        self.threads[thread["id"]] = thread
+        self.messages[thread["id"]] = []
+        return thread
+
+    def create_message(self, thread_id, role="user", text="", file_ids=(), **fields):
+        message = {
+            "id": self.new_id("msg_"),
+            "object": "thread.message",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "role": role,
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+            "file_ids": list(file_ids),
+            "assistant_id": fields.get("assistant_id"),
+            "run_id": fields.get("run_id"),
+            "status": "completed",
+            "metadata": {},
+        }
+        self.messages[thread_id].append(message)
+        return message
+
+    def create_file(self, filename, content, purpose="assistants"):
+        file = {
+            "id": self.new_id("file-"),
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        self.files[file["id"]] = file
+        self.file_contents[file["id"]] = content
+        return file
+
+    def create_run(self, thread_id, assistant_id):
+        run = {
+            "id": self.new_id("run_"),
+            "object": "thread.run",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "assistant_id": assistant_id,
+            "status": "queued",
+            "model": self.assistants.get(assistant_id, {}).get("model", "gpt-4-1106-preview"),
+            "instructions": "",
+            "tools": [],
+            "file_ids": [],
+            "metadata": {},
+            "usage": None,
+        }
+        self.runs[run["id"]] = run
+        return run
+
+    def complete_run(self, run, text):
+        """
+        Adds the assistant's reply to the thread and marks the run completed.
+        """
+        message = self.create_message(
+            run["thread_id"],
+            role="assistant",
+            text=text,
+            assistant_id=run["assistant_id"],
+            run_id=run["id"],
+        )
+        run["status"] = "completed"
+        run["completed_at"] = int(time.time())
+        run["usage"] = {
+            "prompt_tokens": 10,
+            "completion_tokens": self.stream_deltas,
+            "total_tokens": 10 + self.stream_deltas,
+        }
+        return message
+
+    def seed_thread(self, message_count):
+        """
+        Creates a thread with `message_count` alternating messages.
+        """
+        thread = self.create_thread()
+        text = _words(self.payload_size)
+        for index in range(message_count):
+            self.create_message(thread["id"], role=("user", "assistant")[index % 2], text=text)
+        return thread
+
+    def seed_files(self, count, size=1024):
+        """
+        Creates `count` files of `size` bytes.
+        """
+        return [
+            self.create_file(f"document-{index}.txt", b"x" * size) for index in range(count)
+        ]
+
+    def seed_assistants(self, count):
+        return [self.create_assistant(f"Assistant {index}") for index in range(count)]
+
+
+def _page(items, query, default_order="desc"):
+    """
+    Applies `limit`, `order`, `after` and `before` like the real list endpoints.
+    """
+    limit = int(query.get("limit", 20))
+    order = query.get("order", default_order)
+    items = sorted(items, key=lambda item: item["id"], reverse=order == "desc")
+    ids = [item["id"] for item in items]
+    if query.get("before") in ids:
+        # The page right before the cursor; older items count as "more".
+        remaining = items[: ids.index(query["before"])]
+        data = remaining[-limit:]
+    else:
+        if query.get("after") in ids:
+            items = items[ids.index(query["after"]) + 1 :]
+        remaining = items
+        data = items[:limit]
+    return {
+        "object": "list",
+        "data": data,
+        "first_id": data[0]["id"] if data else None,
+        "last_id": data[-1]["id"] if data else None,
+        "has_more": len(remaining) > limit,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockAssistantsAPI"
+    # Headers and body go out in separate writes; do not let Nagle delay them.
+    disable_nagle_algorithm = True
+
+    # Set on the subclass created by MockServer.
+    mock = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        path = url.path.removeprefix("/v1")
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("content-length") or 0)
+        body = self.rfile.read(length) if length else b""
+        self.mock.record_call(f"{method} /v1{_ID_SEGMENT.sub('/{id}', path)}")
+        if self.mock.latency:
+            time.sleep(self.mock.latency)
+
+        for route_method, pattern, handler in _ROUTES:
+            match = pattern.fullmatch(path)
+            if route_method == method and match:
+                try:
+                    return handler(self, *match.groups(), query=query, body=body)
+                except KeyError:
+                    return self._json({"error": {"message": "No such object"}}, 404)
+        self._json({"error": {"message": f"Unknown route {method} {path}"}}, 404)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _json(self, payload, status=200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body_json(self, body):
+        return json.loads(body) if body else {}
+
+    def _multipart_file(self, body):
+        """
+        Extracts the filename and content of the single file in a multipart body.
+        """
+        header_end = body.find(b"\r\n\r\n", body.find(b'name="file"'))
+        if header_end < 0:
+            header_end = body.find(b"\r\n\r\n", body.find(b'name="data"'))
+        boundary = body[: body.find(b"\r\n")]
+        content = body[header_end + 4 : body.find(b"\r\n" + boundary, header_end)]
+        match = _FILENAME.search(body[:header_end])
+        return (match.group(1).decode() if match else "upload.bin"), content
+
+    # Assistants
+
+    def list_assistants(self, query, body):
+        self._json(_page(self.mock.state.assistants.values(), query))
+
+    def create_assistant(self, query, body):
+        self._json(self.mock.state.create_assistant(**self._body_json(body)))
+
+    def get_assistant(self, assistant_id, query, body):
+        self._json(self.mock.state.assistants[assistant_id])
+
+    def update_assistant(self, assistant_id, query, body):
+        assistant = self.mock.state.assistants[assistant_id]
+        assistant.update(self._body_json(body))
+        self._json(assistant)
+
+    def delete_assistant(self, assistant_id, query, body):
+        del self.mock.state.assistants[assistant_id]
+        self._json({"id": assistant_id, "object": "assistant.deleted", "deleted": True})
+
+    def list_assistant_files(self, assistant_id, query, body):
+        self._json(_page(self.mock.state.assistant_files[assistant_id], query))
+
+    def create_assistant_file(self, assistant_id, query, body):
+        file_id = self._body_json(body)["file_id"]
+        # Both must exist, as with the real API; a KeyError answers 404.
+        self.mock.state.assistants[assistant_id]
+        self.mock.state.files[file_id]
+        attachment = {
+            "id": file_id,
+            "object": "assistant.file",
+            "assistant_id": assistant_id,
+            "created_at": int(time.time()),
+        }
+        self.mock.state.assistant_files[assistant_id].append(attachment)
+        self.mock.state.assistants[assistant_id]["file_ids"].append(file_id)
+        self._json(attachment)
+
+    # Threads and messages
+
+    def create_thread(self, query, body):
+        self._json(self.mock.state.create_thread())
+
+    def get_thread(self, thread_id, query, body):
+        self._json(self.mock.state.threads[thread_id])
+
+    def list_messages(self, thread_id, query, body):
+        self._json(_page(self.mock.state.messages[thread_id], query))
+
+    def create_message(self, thread_id, query, body):
+        payload = self._body_json(body)
+        content = payload.get("content")
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content)
+        message = self.mock.state.create_message(
+            thread_id,
+            role=payload.get("role", "user"),
+            text=content or "",
+            file_ids=payload.get("file_ids") or [],
+        )
+        self._json(message)
+
+    # Runs
+
+    def create_run(self, thread_id, query, body):
+        payload = self._body_json(body)
+        state = self.mock.state
+        run = state.create_run(thread_id, payload.get("assistant_id"))
+        if not payload.get("stream"):
+            state.complete_run(run, _words(state.stream_deltas * state.delta_size))
+            return self._json(run)
+        self._stream_run(run)
+
+    def get_run(self, thread_id, run_id, query, body):
+        self._json(self.mock.state.runs[run_id])
+
+    def cancel_run(self, thread_id, run_id, query, body):
+        run = self.mock.state.runs[run_id]
+        run["status"] = "cancelled"
+        self._json(run)
+
+    def _send_event(self, event, data):
+        payload = data if isinstance(data, str) else json.dumps(data)
+        chunk = f"event: {event}\ndata: {payload}\n\n".encode()
+        self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+
+    def _stream_run(self, run):
+        """
+        Streams a run as server-sent events: the run and message lifecycle
+        around `stream_deltas` text deltas.
+        """
+        state = self.mock.state
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("transfer-encoding", "chunked")
+        self.end_headers()
+
+        self._send_event("thread.run.created", run)
+        run["status"] = "in_progress"
+        self._send_event("thread.run.in_progress", run)
+
+        message_id = state.new_id("msg_")
+        draft = {
+            "id": message_id,
+            "object": "thread.message",
+            "created_at": int(time.time()),
+            "thread_id": run["thread_id"],
+            "role": "assistant",
+            "content": [],
+            "file_ids": [],
+            "assistant_id": run["assistant_id"],
+            "run_id": run["id"],
+            "status": "in_progress",
+            "metadata": {},
+        }
+        self._send_event("thread.message.created", draft)
+
+        delta_text = _words(state.delta_size)
+        reply = []
+        for index in range(state.stream_deltas):
+            text = delta_text
+            if state.paragraph_deltas and (index + 1) % state.paragraph_deltas == 0:
+                text += "\n\n"
+            reply.append(text)
+            self._send_event(
+                "thread.message.delta",
+                {
+                    "id": message_id,
+                    "object": "thread.message.delta",
+                    "delta": {
+                        "content": [
+                            {
+                                "index": 0,
+                                "type": "text",
+                                "text": {"value": text, "annotations": []},
+                            }
+                        ]
+                    },
+                },
+            )
+            if state.delta_interval:
+                time.sleep(state.delta_interval)
+
+        message = state.complete_run(run, "".join(reply))
+        message["id"] = message_id
+        self._send_event("thread.message.completed", message)
+        self._send_event("thread.run.completed", run)
+        self._send_event("done", "[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+    # Models
+
+    def list_models(self, query, body):
+        if self.headers.get("authorization") == "Bearer sk-invalid":
+            return self._json({"error": {"message": "Incorrect API key provided"}}, 401)
+        model = {"id": "gpt-4-turbo", "object": "model", "created": 0, "owned_by": "mock"}
+        self._json({"object": "list", "data": [model]})
+
+    # Files and uploads
+
+    def list_files(self, query, body):
+        files = self.mock.state.files.values()
+        if "purpose" in query:
+            files = [file for file in files if file["purpose"] == query["purpose"]]
+        self._json({"object": "list", "data": list(files), "has_more": False})
+
+    def create_file(self, query, body):
+        filename, content = self._multipart_file(body)
+        self._json(self.mock.state.create_file(filename, content))
+
+    def get_file(self, file_id, query, body):
+        self._json(self.mock.state.files[file_id])
+
+    def get_file_content(self, file_id, query, body):
+        content = self.mock.state.file_contents[file_id]
+        self.send_response(200)
+        self.send_header("content-type", "application/octet-stream")
+        self.send_header("content-length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def create_upload(self, query, body):
+        payload = self._body_json(body)
+        upload = {
+            "id": self.mock.state.new_id("upload_"),
+            "object": "upload",
+            "bytes": payload["bytes"],
+            "filename": payload["filename"],
+            "purpose": payload["purpose"],
+            "status": "pending",
+            "created_at": int(time.time()),
+            "expires_at": int(time.time()) + 3600,
+            "parts": {},
+        }
+        self.mock.state.uploads[upload["id"]] = upload
+        self._json({key: value for key, value in upload.items() if key != "parts"})
+
+    def add_upload_part(self, upload_id, query, body):
+        _, content = self._multipart_file(body)
+        part_id = self.mock.state.new_id("part_")
+        self.mock.state.uploads[upload_id]["parts"][part_id] = content
+        self._json(
+            {
+                "id": part_id,
+                "object": "upload.part",
+                "upload_id": upload_id,
+                "created_at": int(time.time()),
+            }
+        )
+
+    def complete_upload(self, upload_id, query, body):
+        upload = self.mock.state.uploads[upload_id]
+        content = b"".join(upload["parts"][part_id] for part_id in self._body_json(body)["part_ids"])
+        upload["status"] = "completed"
+        upload["file"] = self.mock.state.create_file(upload["filename"], content, upload["purpose"])
+        self._json({key: value for key, value in upload.items() if key != "parts"})
+
+
+_ID = r"([A-Za-z0-9_-]+)"
+_ROUTES = [
+    (method, re.compile(pattern.replace("{id}", _ID)), handler)
+    for method, pattern, handler in [
+        ("GET", "/assistants", _Handler.list_assistants),
+        ("POST", "/assistants", _Handler.create_assistant),
+        ("GET", "/assistants/{id}", _Handler.get_assistant),
+        ("POST", "/assistants/{id}", _Handler.update_assistant),
+        ("DELETE", "/assistants/{id}", _Handler.delete_assistant),
+        ("GET", "/assistants/{id}/files", _Handler.list_assistant_files),
+        ("POST", "/assistants/{id}/files", _Handler.create_assistant_file),
+        ("POST", "/threads", _Handler.create_thread),
+        ("GET", "/threads/{id}", _Handler.get_thread),
+        ("GET", "/threads/{id}/messages", _Handler.list_messages),
+        ("POST", "/threads/{id}/messages", _Handler.create_message),
+        ("POST", "/threads/{id}/runs", _Handler.create_run),
+        ("GET", "/threads/{id}/runs/{id}", _Handler.get_run),
+        ("POST", "/threads/{id}/runs/{id}/cancel", _Handler.cancel_run),
+        ("GET", "/models", _Handler.list_models),
+        ("GET", "/files", _Handler.list_files),
+        ("POST", "/files", _Handler.create_file),
+        ("GET", "/files/{id}", _Handler.get_file),
+        ("GET", "/files/{id}/content", _Handler.get_file_content),
+        ("POST", "/uploads", _Handler.create_upload),
+        ("POST", "/uploads/{id}/parts", _Handler.add_upload_part),
+        ("POST", "/uploads/{id}/complete", _Handler.complete_upload),
+    ]
+]
+
+
+class MockServer:
+    """
+    Serves a MockState on localhost from a background thread.
+
+    Use it as a context manager and point clients at `base_url`.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, **state_options):
+        """
+        Args:
+            host (str): Interface to listen on.
+            port (int): Port to listen on; 0 picks a free one.
+            latency (float): Seconds added to every request.
+            **state_options: Passed to MockState.
+        """
+        self.latency = latency
+        self.state = MockState(**state_options)
+        self.calls = Counter()
+        self._calls_lock = threading.Lock()
+        handler = type("Handler", (_Handler,), {"mock": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def record_call(self, endpoint):
+        with self._calls_lock:
+            self.calls[endpoint] += 1
+
+    def reset_calls(self):
+        """
+        Returns the calls counted so far and starts counting afresh.
+        """
+        with self._calls_lock:
+            calls, self.calls = self.calls, Counter()
+        return calls
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Assistants API.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds per request")
+    parser.add_argument("--payload", type=int, default=200, help="Characters per message")
+    parser.add_argument("--deltas", type=int, default=500, help="Deltas per streamed run")
+    parser.add_argument("--assistants", type=int, default=3, help="Assistants to seed")
+    args = parser.parse_args()
+
+    server = MockServer(
+        port=args.port,
+        latency=args.latency / 1000,
+        payload_size=args.payload,
+        stream_deltas=args.deltas,
+    )
+    server.state.seed_assistants(args.assistants)
+    print(f"Serving on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Offline benchmarks of the CLI's hot paths against the mock Assistants API.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --latency 20 --json > baseline.json
+    python -m benchmarks.run --baseline baseline.json
+
+Each scenario reports its median wall time and the API calls it made. With
+`--baseline`, a scenario that makes more calls than before, or is slower by
+more than `--tolerance`, fails the run.
+"""
+
+import argparse
+import atexit
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Keep benchmark state away from the user's history, caches and indexes, and
+# let the mock server take requests as fast as they come.
+_HOME = tempfile.mkdtemp(prefix="assistant-gpt-bench-")
+atexit.register(shutil.rmtree, _HOME, ignore_errors=True)
+os.environ["HOME"] = _HOME
+os.environ["XDG_CACHE_HOME"] = os.path.join(_HOME, ".cache")
+os.environ["ASSISTANT_GPT_RPM"] = "0"
+
+from rich.console import Console  # noqa: E402
+from rich.table import Table  # noqa: E402
+
+from assistant import ui_utils  # noqa: E402
+from assistant.api_wrapper import AssistantAPIWrapper, EventHandler  # noqa: E402
+from assistant.ingest import ingest  # noqa: E402
+from assistant.percentiles import percentile  # noqa: E402
+from assistant.stream_renderer import create_renderer  # noqa: E402
+
+from .mock_server import MockServer  # noqa: E402
+
+SCENARIOS = {}
+
+
+def scenario(function):
+    """
+    Registers a benchmark. A scenario gets the server and the options, sets
+    up its data and returns the callable to time.
+    """
+    SCENARIOS[function.__name__] = function
+    return function
+
+
+def _api(server):
+    return AssistantAPIWrapper("sk-benchmark", "benchmark", base_url=server.base_url)
+
+
+@scenario
+def list_assistants(server, options):
+    """
+    Lists every assistant of an account with many assistants.
+    """
+    server.state.seed_assistants(options.assistants)
+    api = _api(server)
+    return lambda: sum(1 for _ in api.iter_assistants(prefetch=True))
+
+
+@scenario
+def large_history(server, options):
+    """
+    Opens a long thread in a fresh message store and pages back through
+    its whole history, as "Show older messages" does.
+    """
+    thread = server.state.seed_thread(options.messages)
+
+    def run():
+        api = _api(server)
+        api.thread = api.get_thread(thread["id"])
+        messages = api.sync_messages()
+        count, has_older = len(messages), api.get_message_store().has_older
+        oldest_id = messages[0].id if messages else None
+        while has_older:
+            older, has_older = api.get_older_messages(oldest_id)
+            if not older:
+                break
+            count += len(older)
+            oldest_id = older[0].id
+        return count
+
+    return run
+
+
+@scenario
+def many_attachments(server, options):
+    """
+    Resolves the filenames of many attached files with a cold cache.
+    """
+    file_ids = [file["id"] for file in server.state.seed_files(options.files)]
+
+    def run():
+        return len(_api(server).get_filenames(file_ids))
+
+    return run
+
+
+@scenario
+def bulk_upload(server, options):
+    """
+    Ingests a directory of files, a tenth of them duplicates, into a fresh
+    hash index.
+    """
+    directory = tempfile.mkdtemp(dir=_HOME)
+    for index in range(options.files):
+        content = f"{index % max(1, options.files - options.files // 10)}\n"
+        with open(os.path.join(directory, f"{index}.txt"), "w") as file:
+            file.write(content * (options.file_size // len(content)))
+
+    def run():
+        index_path = os.path.join(_HOME, ".assistant-gpt-file-index.json")
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        return len(ingest(_api(server).client, directory)["uploaded"])
+
+    return run
+
+
+@scenario
+def delta_stream(server, options):
+    """
+    Streams a run with a high rate of small text deltas through the
+    rendering event handler and the default (Markdown) renderer.
+    """
+    server.state.stream_deltas = options.deltas
+    api = _api(server)
+    api.assistant = api.get_assistants(server.state.create_assistant()["id"])
+    api.create_thread()
+    output = Console(file=io.StringIO(), force_terminal=True, width=100)
+
+    def run():
+        handler = EventHandler(renderer=create_renderer(output=output))
+        api.send_message_and_stream(handler)
+        return options.deltas
+
+    return run
+
+
+def run_scenarios(names, options):
+    """
+    Runs scenarios against a fresh mock server each.
+
+    Returns:
+        dict: Per scenario, the median `wall_ms`, the `calls` per endpoint of
+        one repetition and its `total_calls`.
+    """
+    results = {}
+    for name in names:
+        with MockServer(
+            latency=options.latency / 1000, payload_size=options.payload
+        ) as server:
+            run = SCENARIOS[name](server, options)
+            server.reset_calls()
+            timings = []
+            for _ in range(options.repeat):
+                start = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - start) * 1000)
+            calls = server.reset_calls()
+        per_run = {endpoint: count // options.repeat for endpoint, count in calls.items()}
+        results[name] = {
+            "wall_ms": round(percentile(timings, 50), 2),
+            "total_calls": sum(per_run.values()),
+            "calls": dict(sorted(per_run.items())),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the regressions of `results` against a baseline run.
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if result["total_calls"] > before["total_calls"]:
+            regressions.append(
+                f"{name}: {before['total_calls']} -> {result['total_calls']} calls"
+            )
+        if result["wall_ms"] > before["wall_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {before['wall_ms']:.1f} -> {result['wall_ms']:.1f} ms"
+            )
+    return regressions
+
+
+def print_results(results, console):
+    table = Table(title="Benchmarks")
+    table.add_column("Scenario")
+    table.add_column("Wall ms", justify="right")
+    table.add_column("Calls", justify="right")
+    table.add_column("Busiest endpoints")
+    for name, result in results.items():
+        busiest = sorted(result["calls"].items(), key=lambda item: -item[1])[:3]
+        table.add_row(
+            name,
+            f"{result['wall_ms']:.1f}",
+            str(result["total_calls"]),
+            ", ".join(f"{endpoint} x{count}" for endpoint, count in busiest),
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmarks.")
+    parser.add_argument(
+        "scenarios", nargs="*", help=f"Scenarios to run: {', '.join(SCENARIOS)}"
+    )
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds per request")
+    parser.add_argument("--payload", type=int, default=200, help="Characters per message")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--assistants", type=int, default=500)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--file-size", type=int, default=4096)
+    parser.add_argument("--deltas", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed slowdown, e.g. 0.25"
+    )
+    options = parser.parse_args()
+    unknown = set(options.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # Progress bars and headers of the code under test are not benchmarked.
+    ui_utils.console.quiet = True
+    results = run_scenarios(options.scenarios or list(SCENARIOS), options)
+
+    console = Console()
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results, console)
+
+    if options.baseline:
+        with open(options.baseline) as file:
+            regressions = compare(results, json.load(file), options.tolerance)
+        errors = Console(stderr=True)
+        for regression in regressions:
+            errors.print(f"[bold red]Regression: {regression}[/bold red]")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
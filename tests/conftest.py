@@ -0,0 +1,37 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Module-level paths (thread history, search index, metrics...) are resolved
+# from HOME when `assistant` is first imported, so point HOME at a scratch
+# directory before any test module imports it.
+_HOME = tempfile.mkdtemp(prefix="assistant-gpt-tests-")
+atexit.register(shutil.rmtree, _HOME, ignore_errors=True)
+os.environ["HOME"] = _HOME
+os.environ["XDG_CACHE_HOME"] = os.path.join(_HOME, ".cache")
+os.environ["ASSISTANT_GPT_RPM"] = "0"
+os.environ.pop("OPENAI_API_KEY", None)
+
+import pytest  # noqa: E402
+
+from benchmarks.mock_server import MockServer  # noqa: E402
+
+
+@pytest.fixture
+def mock_server():
+    """
+    A mock Assistants API serving fresh state.
+    """
+    with MockServer(stream_deltas=10, delta_interval=0) as server:
+        yield server
+
+
+@pytest.fixture
+def client(mock_server):
+    """
+    An OpenAI client talking to the mock server.
+    """
+    from assistant.client_factory import create_client
+
+    return create_client("sk-test", base_url=mock_server.base_url)
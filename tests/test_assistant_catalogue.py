@@ -0,0 +1,105 @@
+import os
+import time
+
+from openai.types.beta import Assistant
+
+from assistant.assistant_catalogue import AssistantCatalogue, catalogue_path
+
+
+def assistant(assistant_id, name="Assistant", created_at=0):
+    return Assistant.model_validate(
+        {
+            "id": assistant_id,
+            "object": "assistant",
+            "created_at": created_at,
+            "name": name,
+            "description": None,
+            "model": "gpt-4",
+            "instructions": None,
+            "tools": [],
+            "file_ids": [],
+            "metadata": {},
+        }
+    )
+
+
+def test_reconcile_reports_changes(tmp_path):
+    catalogue = AssistantCatalogue(str(tmp_path / "catalogue.json"))
+    catalogue.put_many([assistant("asst_1"), assistant("asst_2")])
+    started_at = time.time() + 1
+
+    changes = catalogue.reconcile(
+        [assistant("asst_2", name="Renamed"), assistant("asst_3")], started_at
+    )
+
+    assert changes == {
+        "added": ["asst_3"],
+        "updated": ["asst_2"],
+        "removed": ["asst_1"],
+    }
+    assert catalogue.get("asst_1") is None
+    assert catalogue.get("asst_2").name == "Renamed"
+    assert catalogue.synced_at == started_at
+
+
+def test_reconcile_keeps_local_writes_made_during_listing(tmp_path):
+    catalogue = AssistantCatalogue(str(tmp_path / "catalogue.json"))
+    catalogue.put(assistant("asst_1"))
+    started_at = time.time()
+    # Written after the listing was requested, so the listing cannot know.
+    catalogue.put(assistant("asst_1", name="Edited"))
+    catalogue.put(assistant("asst_new"))
+
+    changes = catalogue.reconcile([assistant("asst_1", name="Stale")], started_at)
+
+    assert changes == {"added": [], "updated": [], "removed": []}
+    assert catalogue.get("asst_1").name == "Edited"
+    assert catalogue.get("asst_new") is not None
+
+
+def test_catalogue_persists_newest_first(tmp_path):
+    path = str(tmp_path / "catalogue.json")
+    catalogue = AssistantCatalogue(path)
+    catalogue.put_many(
+        [assistant("asst_old", created_at=1), assistant("asst_new", created_at=2)]
+    )
+    catalogue.remove("asst_missing")
+
+    reopened = AssistantCatalogue(path)
+
+    assert [a.id for a in reopened.all()] == ["asst_new", "asst_old"]
+
+
+def test_one_catalogue_per_api_key():
+    assert catalogue_path("sk-one") != catalogue_path("sk-two")
+    assert "sk-one" not in catalogue_path("sk-one")
+
+
+def test_opening_a_catalogue_leaves_other_files_alone(tmp_path, monkeypatch):
+    from assistant import assistant_catalogue
+
+    monkeypatch.setattr(
+        assistant_catalogue,
+        "ASSISTANT_CATALOGUE",
+        str(tmp_path / "assistants-{key}.json"),
+    )
+    unrelated = tmp_path / "assistants.json"
+    unrelated.write_text("{}")
+
+    assistant_catalogue.get_assistant_catalogue("sk-test").put(assistant("asst_1"))
+
+    assert unrelated.exists()
+    assert os.path.exists(catalogue_path("sk-test"))
+
+
+def test_get_fresh_ignores_old_entries(tmp_path):
+    catalogue = AssistantCatalogue(str(tmp_path / "catalogue.json"), max_age=60)
+    catalogue.put(assistant("asst_1"))
+
+    assert catalogue.get_fresh("asst_1").id == "asst_1"
+    assert catalogue.get_fresh("asst_missing") is None
+
+    catalogue.max_age = 0
+    time.sleep(0.01)
+    assert catalogue.get_fresh("asst_1") is None
+    assert catalogue.get("asst_1") is not None
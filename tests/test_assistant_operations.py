@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+import pytest
+
+from assistant import assistant_operations
+from assistant.assistant_operations import (
+    ASSISTANT_PAGE_SIZE,
+    LOAD_MORE_ASSISTANTS,
+    handle_assistant_selection,
+)
+
+
+class FakeCatalogue:
+    def __init__(self):
+        self.assistants = []
+
+    def put_many(self, assistants):
+        self.assistants.extend(assistants)
+
+
+def select_after_loading_all(monkeypatch, count):
+    """
+    Runs the selection screen over `count` assistants, choosing "Load more"
+    while it is offered, and returns the `has_more` flag of every prompt.
+    """
+    offers = []
+
+    def choose_assistant(assistants, has_more=False):
+        offers.append(has_more)
+        return LOAD_MORE_ASSISTANTS if has_more else assistants[-1].id
+
+    monkeypatch.setattr(assistant_operations, "choose_assistant", choose_assistant)
+    api = SimpleNamespace(catalogue=FakeCatalogue(), assistant=None)
+    assistants = iter([SimpleNamespace(id=f"asst_{i}") for i in range(count)])
+
+    handle_assistant_selection(api, assistants)
+
+    assert len(api.catalogue.assistants) == count
+    assert api.assistant.id == f"asst_{count - 1}"
+    return offers
+
+
+@pytest.mark.parametrize(
+    "count, offers",
+    [
+        (1, [False]),
+        (ASSISTANT_PAGE_SIZE, [False]),
+        (ASSISTANT_PAGE_SIZE + 1, [True, False]),
+        (2 * ASSISTANT_PAGE_SIZE, [True, False]),
+    ],
+)
+def test_load_more_is_offered_only_when_more_exist(monkeypatch, count, offers):
+    assert select_after_loading_all(monkeypatch, count) == offers
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from assistant.batch import completed_ids, read_prompts, run_batch
+
+
+@pytest.fixture
+def assistant_id(mock_server):
+    return mock_server.state.create_assistant()["id"]
+
+
+def write_prompts(path, count):
+    path.write_text(
+        "".join(
+            json.dumps({"id": f"p{index}", "prompt": f"Prompt {index}"}) + "\n"
+            for index in range(count)
+        )
+    )
+    return str(path)
+
+
+def read_results(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def test_read_prompts_numbers_lines_without_id(tmp_path):
+    path = tmp_path / "prompts.jsonl"
+    path.write_text('{"prompt": "a"}\n\n{"prompt": "b", "id": "named"}\n')
+
+    assert [record["id"] for record in read_prompts(str(path))] == ["1", "named"]
+
+
+def test_batch_runs_every_prompt(client, assistant_id, tmp_path):
+    input_path = write_prompts(tmp_path / "prompts.jsonl", 5)
+    output_path = str(tmp_path / "results.jsonl")
+
+    stats = run_batch(client, assistant_id, input_path, output_path, concurrency=2)
+
+    assert stats["processed"] == 5
+    assert stats["statuses"] == {"completed": 5}
+    assert stats["latency"]["count"] == 5
+    results = read_results(output_path)
+    assert sorted(result["id"] for result in results) == [f"p{i}" for i in range(5)]
+    assert all(result["reply"] for result in results)
+
+
+def test_batch_resumes_after_partial_line(client, assistant_id, tmp_path):
+    input_path = write_prompts(tmp_path / "prompts.jsonl", 3)
+    output = tmp_path / "results.jsonl"
+    # A completed prompt, then a line cut short when the last run was killed.
+    output.write_text(
+        json.dumps({"id": "p0", "status": "completed"}) + '\n{"id": "p1", "sta'
+    )
+
+    stats = run_batch(client, assistant_id, input_path, str(output))
+
+    assert stats["skipped"] == 1
+    assert stats["processed"] == 2
+    assert completed_ids(str(output)) == {"p0", "p1", "p2"}
+
+
+def test_interrupted_batch_records_prompts_in_flight(client, assistant_id, tmp_path):
+    input_path = write_prompts(tmp_path / "prompts.jsonl", 6)
+    output_path = str(tmp_path / "results.jsonl")
+    seen = []
+
+    def interrupt_once(result):
+        seen.append(result["id"])
+        if len(seen) == 1:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        run_batch(
+            client,
+            assistant_id,
+            input_path,
+            output_path,
+            concurrency=2,
+            on_result=interrupt_once,
+        )
+
+    # Only the prompts already in flight were run and recorded.
+    recorded = read_results(output_path)
+    assert 1 <= len(recorded) <= 2
+    assert [result["id"] for result in recorded] == seen
+
+    stats = run_batch(client, assistant_id, input_path, output_path)
+    assert stats["skipped"] == len(recorded)
+    assert stats["processed"] == 6 - len(recorded)
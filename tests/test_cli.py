@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_cli(mock_server, tmp_path, *args, **env):
+    """
+    Runs `python -m assistant` against the mock server and returns the
+    completed process.
+    """
+    home = tmp_path / "home"
+    home.mkdir(exist_ok=True)
+    env = {
+        **os.environ,
+        "HOME": str(home),
+        "XDG_CACHE_HOME": str(home / ".cache"),
+        "OPENAI_API_KEY": "sk-test",
+        "OPENAI_BASE_URL": mock_server.base_url,
+        **env,
+    }
+    return subprocess.run(
+        [sys.executable, "-m", "assistant", *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_files_upload_json_is_parseable(mock_server, tmp_path):
+    small = tmp_path / "small.txt"
+    small.write_text("hello")
+    large = tmp_path / "large.bin"
+    large.write_bytes(os.urandom(3 * 1024 * 1024 // 2))
+
+    result = run_cli(
+        mock_server,
+        tmp_path,
+        "files",
+        "upload",
+        str(small),
+        str(large),
+        "--json",
+        ASSISTANT_GPT_MULTIPART_MB="1",
+        ASSISTANT_GPT_PART_MB="1",
+    )
+
+    assert result.returncode == 0, result.stderr
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [record["filename"] for record in records] == ["small.txt", "large.bin"]
+    assert mock_server.state.file_contents[records[1]["id"]] == large.read_bytes()
+
+
+def test_files_ingest_json_is_parseable(mock_server, tmp_path):
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    (directory / "a.txt").write_text("alpha")
+    (directory / "b.txt").write_text("beta")
+
+    result = run_cli(mock_server, tmp_path, "files", "ingest", str(directory), "--json")
+
+    assert result.returncode == 0, result.stderr
+    summary = json.loads(result.stdout)
+    assert len(summary["uploaded"]) == 2
@@ -0,0 +1,55 @@
+import os
+
+from assistant.image_cache import ImageCache
+
+
+def test_store_and_lookup(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=1000)
+
+    path = cache.store("file-1", b"image")
+
+    assert cache.path_for("file-1") == path
+    assert open(path, "rb").read() == b"image"
+    assert cache.path_for("file-2") is None
+
+
+def test_identical_images_are_stored_once(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=1000)
+
+    assert cache.store("file-1", b"image") == cache.store("file-2", b"image")
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".png")]) == 1
+
+
+def test_least_recently_used_images_are_evicted(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=100)
+    cache.store("file-1", b"1" * 40)
+    cache.store("file-2", b"2" * 40)
+    cache.path_for("file-1")
+
+    cache.store("file-3", b"3" * 40)
+
+    assert cache.path_for("file-1") is not None
+    assert cache.path_for("file-2") is None
+    assert cache.path_for("file-3") is not None
+
+
+def test_image_larger_than_cache_is_kept(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=100)
+    cache.store("file-1", b"1" * 40)
+
+    path = cache.store("file-big", b"b" * 500)
+
+    assert os.path.exists(path)
+    assert cache.path_for("file-big") == path
+    assert cache.path_for("file-1") is None
+
+
+def test_size_survives_reopening(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=100)
+    cache.store("file-1", b"1" * 60)
+
+    reopened = ImageCache(str(tmp_path), max_bytes=100)
+    reopened.store("file-2", b"2" * 60)
+
+    assert reopened.path_for("file-1") is None
+    assert reopened.path_for("file-2") is not None
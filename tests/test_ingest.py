@@ -0,0 +1,61 @@
+import pytest
+
+from assistant.ingest import FileHashIndex, collect_paths, ingest
+
+
+@pytest.fixture
+def documents(tmp_path):
+    directory = tmp_path / "docs"
+    (directory / "nested").mkdir(parents=True)
+    (directory / "a.txt").write_text("alpha")
+    (directory / "nested" / "copy-of-a.txt").write_text("alpha")
+    (directory / "b.txt").write_text("beta")
+    (directory / ".hidden").write_text("secret")
+    return directory
+
+
+def test_collect_paths_skips_hidden_files(documents):
+    names = [path.rsplit("/", 1)[-1] for path in collect_paths(str(documents))]
+
+    assert names == ["a.txt", "b.txt", "copy-of-a.txt"]
+
+
+def test_duplicate_content_is_uploaded_once(client, mock_server, documents, tmp_path):
+    index = FileHashIndex(str(tmp_path / "index.json"))
+
+    summary = ingest(client, str(documents), index=index)
+
+    assert len(summary["uploaded"]) == 2
+    assert summary["skipped"] == [
+        {"path": str(documents / "nested" / "copy-of-a.txt"), "reason": "duplicate"}
+    ]
+    assert summary["failed"] == []
+    assert mock_server.reset_calls()["POST /v1/files"] == 2
+
+
+def test_indexed_content_is_not_uploaded_again(
+    client, mock_server, documents, tmp_path
+):
+    index_path = str(tmp_path / "index.json")
+    first = ingest(client, str(documents), index=FileHashIndex(index_path))
+    mock_server.reset_calls()
+
+    second = ingest(client, str(documents), index=FileHashIndex(index_path))
+
+    assert second["uploaded"] == []
+    reasons = sorted(entry["reason"] for entry in second["skipped"])
+    assert reasons == ["already uploaded", "already uploaded", "duplicate"]
+    assert {entry["file_id"] for entry in first["uploaded"]} == {
+        entry["file_id"] for entry in second["skipped"] if "file_id" in entry
+    }
+    assert "POST /v1/files" not in mock_server.reset_calls()
+
+
+def test_index_remove(tmp_path):
+    path = str(tmp_path / "index.json")
+    index = FileHashIndex(path)
+    index.put("hash", type("File", (), {"id": "file-1", "filename": "a.txt"}))
+    index.remove("hash")
+    index.remove("unknown")
+
+    assert FileHashIndex(path).get("hash") is None
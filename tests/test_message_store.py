@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+from assistant.message_store import MessageStore, is_settled, settled_prefix
+
+
+def message(message_id, status="completed"):
+    return SimpleNamespace(id=message_id, status=status)
+
+
+def test_append_tracks_newest_message():
+    store = MessageStore("thread_1")
+
+    store.append([message("msg_1"), message("msg_2")])
+
+    assert store.last_message_id == "msg_2"
+    assert store.index("msg_2") == 1
+    assert store.index("msg_3") is None
+    assert not store.has_older
+
+
+def test_settled_prefix_stops_at_in_progress_message():
+    messages = [message("msg_1"), message("msg_2", "in_progress"), message("msg_3")]
+
+    assert not is_settled(messages[1])
+    assert is_settled(SimpleNamespace(id="msg_4"))
+    assert [m.id for m in settled_prefix(messages)] == ["msg_1"]
+
+
+def make_api(mock_server, thread):
+    from assistant.api_wrapper import AssistantAPIWrapper
+
+    api = AssistantAPIWrapper("sk-test", "tester", base_url=mock_server.base_url)
+    api.thread = SimpleNamespace(id=thread["id"])
+    return api
+
+
+def test_sync_only_fetches_new_messages(mock_server):
+    state = mock_server.state
+    thread = state.seed_thread(3)
+    api = make_api(mock_server, thread)
+    assert len(api.sync_messages()) == 3
+
+    new = state.create_message(thread["id"], text="new")
+
+    assert [m.id for m in api.sync_messages()] == [new["id"]]
+    assert api.sync_messages() == []
+    assert len(api.get_message_store()) == 4
+
+
+def test_messages_after_an_in_progress_one_are_yielded_once(mock_server):
+    state = mock_server.state
+    thread = state.seed_thread(2)
+    api = make_api(mock_server, thread)
+    api.sync_messages()
+
+    reply = state.create_message(thread["id"], role="assistant", text="partial")
+    reply["status"] = "in_progress"
+    later = state.create_message(thread["id"], text="later")
+
+    assert api.sync_messages() == []
+    store = api.get_message_store()
+    assert len(store) == 2
+
+    reply["status"] = "completed"
+    reply["content"][0]["text"]["value"] = "complete"
+    ids = [m.id for m in api.sync_messages()]
+    assert ids == [reply["id"], later["id"]]
+    assert store.messages[-2].content[0].text.value == "complete"
+    assert store.last_message_id == later["id"]
+    assert api.sync_messages() == []
+
+
+def test_append_caps_the_store():
+    store = MessageStore("thread_1", max_messages=3)
+
+    store.append([message(f"msg_{index}") for index in range(5)])
+
+    assert [m.id for m in store.messages] == ["msg_2", "msg_3", "msg_4"]
+    assert store.last_message_id == "msg_4"
+    assert store.has_older
+
+
+def test_sync_seeds_latest_page_only(mock_server, monkeypatch):
+    from assistant import api_wrapper
+
+    monkeypatch.setattr(api_wrapper, "HISTORY_PAGE_SIZE", 5)
+    thread = mock_server.state.seed_thread(12)
+    api = make_api(mock_server, thread)
+
+    messages = api.sync_messages()
+    store = api.get_message_store()
+
+    assert len(messages) == len(store) == 5
+    assert store.has_older
+    older, has_older = api.get_older_messages(messages[0].id, limit=5)
+    assert len(older) == 5 and has_older
+    assert older[-1].created_at <= messages[0].created_at
@@ -0,0 +1,24 @@
+from assistant.percentiles import percentile, summarize
+
+
+def test_percentile_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+
+    assert percentile(values, 50) == 3
+    assert percentile(values, 90) == 5
+    assert percentile(values, 0) == 1
+    assert percentile([], 50) is None
+
+
+def test_summarize():
+    summary = summarize([10, 20, 30, 40])
+
+    assert summary == {
+        "count": 4,
+        "mean": 25,
+        "max": 40,
+        "p50": 20,
+        "p90": 40,
+        "p99": 40,
+    }
+    assert summarize([])["mean"] is None
@@ -0,0 +1,150 @@
+import email.utils
+import time
+
+import httpx
+import pytest
+
+from assistant import rate_limiter
+from assistant.rate_limiter import (
+    RETRY_MAX_DELAY,
+    RateLimitedTransport,
+    RequestScheduler,
+    TokenBucket,
+    can_resend,
+    parse_retry_after,
+)
+
+
+def test_bucket_allows_a_minute_of_tokens_then_waits():
+    bucket = TokenBucket(60)
+
+    assert all(bucket.reserve() == 0 for _ in range(60))
+    assert bucket.reserve() == pytest.approx(1, abs=0.05)
+    assert bucket.reserve() == pytest.approx(2, abs=0.05)
+
+
+def test_bucket_caps_oversized_reservations():
+    bucket = TokenBucket(60)
+
+    # A request larger than the bucket waits for a full bucket, not forever.
+    assert bucket.reserve(600) == 0
+    assert bucket.reserve() == pytest.approx(1, abs=0.05)
+
+
+def test_bucket_follows_server_limits():
+    bucket = TokenBucket(60)
+    bucket.sync(remaining=0, reset_seconds=5)
+
+    assert bucket.reserve() == pytest.approx(5, abs=0.05)
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"retry-after-ms": "1500"}, 1.5),
+        ({"retry-after": "3"}, 3.0),
+        ({"retry-after-ms": "bad", "retry-after": "2"}, 2.0),
+        ({}, None),
+    ],
+)
+def test_parse_retry_after(headers, expected):
+    assert parse_retry_after(headers) == expected
+
+
+def test_parse_retry_after_http_date():
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+
+    assert parse_retry_after({"retry-after": date}) == pytest.approx(30, abs=1.5)
+
+
+def response(status_code, **headers):
+    return httpx.Response(status_code, headers=headers)
+
+
+def test_retry_delay_honours_retry_after():
+    scheduler = RequestScheduler(max_retries=3)
+
+    assert scheduler.retry_delay(0, response(429, **{"retry-after": "7"})) == 7
+
+
+def test_retry_delay_gives_up_when_retry_after_is_too_long():
+    scheduler = RequestScheduler(max_retries=3)
+    too_long = str(int(RETRY_MAX_DELAY) + 1)
+
+    assert scheduler.retry_delay(0, response(429, **{"retry-after": too_long})) is None
+
+
+def test_retry_delay_gives_up():
+    scheduler = RequestScheduler(max_retries=2)
+
+    assert scheduler.retry_delay(2) is None
+    assert scheduler.retry_delay(0, response(400)) is None
+    no_retry = response(503, **{"x-should-retry": "false"})
+    assert scheduler.retry_delay(0, no_retry) is None
+
+
+def test_retry_delay_backs_off_exponentially():
+    scheduler = RequestScheduler(max_retries=10)
+
+    first = scheduler.retry_delay(0)
+    third = scheduler.retry_delay(2, response(503))
+
+    assert 0.75 <= first <= 1.25
+    assert 3 <= third <= 5
+    assert scheduler.retry_delay(9) <= RETRY_MAX_DELAY * 1.25
+
+
+@pytest.mark.parametrize(
+    "method, error, headers, expected",
+    [
+        ("GET", httpx.ReadTimeout("slow"), {}, True),
+        ("POST", httpx.ConnectError("refused"), {}, True),
+        ("POST", httpx.PoolTimeout("busy"), {}, True),
+        ("POST", httpx.ReadTimeout("slow"), {}, False),
+        ("POST", httpx.RemoteProtocolError("closed"), {}, False),
+        ("POST", httpx.ReadTimeout("slow"), {"Idempotency-Key": "key"}, True),
+    ],
+)
+def test_can_resend(method, error, headers, expected):
+    request = httpx.Request(method, "https://api.test/v1/threads", headers=headers)
+
+    assert can_resend(request, error) is expected
+
+
+class FailingTransport(httpx.BaseTransport):
+    """
+    Fails the first request with an error, then answers 200.
+    """
+
+    def __init__(self, error):
+        self.error = error
+        self.requests = 0
+
+    def handle_request(self, request):
+        self.requests += 1
+        if self.requests == 1:
+            raise self.error
+        return httpx.Response(200)
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "RETRY_BASE_DELAY", 0)
+
+
+def test_post_is_not_resent_after_read_timeout(no_backoff):
+    failing = FailingTransport(httpx.ReadTimeout("slow"))
+    transport = RateLimitedTransport(RequestScheduler(0, 0), failing)
+
+    with pytest.raises(httpx.ReadTimeout):
+        transport.handle_request(httpx.Request("POST", "https://api.test/v1/threads"))
+    assert failing.requests == 1
+
+
+def test_post_is_resent_after_connect_error(no_backoff):
+    failing = FailingTransport(httpx.ConnectError("refused"))
+    transport = RateLimitedTransport(RequestScheduler(0, 0), failing)
+
+    request = httpx.Request("POST", "https://api.test/v1/threads")
+    assert transport.handle_request(request).status_code == 200
+    assert failing.requests == 2
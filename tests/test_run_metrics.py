@@ -0,0 +1,89 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from assistant.run_metrics import MetricsStore, RunMetrics, tokens_per_second
+
+
+def record(assistant="asst_1", model="gpt-4", status="completed", **fields):
+    return {
+        "run_id": "run",
+        "thread": "thread",
+        "assistant": assistant,
+        "model": model,
+        "status": status,
+        "started_at": fields.pop("started_at", 1000.0),
+        "ttft_ms": 100.0,
+        "total_ms": 1100.0,
+        "prompt_tokens": 10,
+        "completion_tokens": 50,
+        "total_tokens": 60,
+        **fields,
+    }
+
+
+def test_tokens_per_second():
+    assert tokens_per_second(record()) == 50
+    assert tokens_per_second(record(ttft_ms=None)) is None
+    assert tokens_per_second(record(completion_tokens=0)) is None
+
+
+def run(status):
+    return SimpleNamespace(id="run", model="gpt-4", status=status, usage=None)
+
+
+@pytest.mark.parametrize(
+    "last_run, status",
+    [
+        (run("completed"), "completed"),
+        (run("requires_action"), "requires_action"),
+        (run("in_progress"), "error"),
+        (None, "error"),
+    ],
+)
+def test_unfinished_streams_are_errors(last_run, status):
+    assert RunMetrics("thread", "asst_1").finish(last_run)["status"] == status
+
+
+def test_stats_per_assistant_and_model(tmp_path):
+    store = MetricsStore(str(tmp_path / "metrics.db"))
+    for status in ("completed", "completed", "requires_action", "failed", "error"):
+        store.record(record(status=status))
+    store.record(record(model="gpt-3.5", total_ms=500.0))
+    store.record(record(assistant="asst_2"))
+
+    stats = {(row["assistant"], row["model"]): row for row in store.stats()}
+
+    gpt4 = stats[("asst_1", "gpt-4")]
+    assert gpt4["runs"] == 5
+    assert gpt4["failed"] == 2
+    assert gpt4["completion_tokens"] == 250
+    assert gpt4["ttft_ms"]["p50"] == 100
+    assert gpt4["tokens_per_second"]["p50"] == 50
+    assert stats[("asst_1", "gpt-3.5")]["total_ms"]["p50"] == 500
+    assert [row["assistant"] for row in store.stats("asst_2")] == ["asst_2"]
+
+
+def test_stats_since(tmp_path):
+    store = MetricsStore(str(tmp_path / "metrics.db"))
+    store.record(record(started_at=100.0))
+    store.record(record(started_at=200.0))
+
+    assert store.stats(since=150.0)[0]["runs"] == 1
+
+
+def test_concurrent_records(tmp_path):
+    store = MetricsStore(str(tmp_path / "metrics.db"))
+
+    def add():
+        for _ in range(50):
+            store.record(record())
+
+    workers = [threading.Thread(target=add) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(store.runs()) == 8 * 50
@@ -0,0 +1,96 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from assistant.run_poller import RunPoller, RunWaitCancelled, RunWaitTimeout
+
+
+class FakeRuns:
+    """
+    Serves runs that stay queued for a number of polls, then complete.
+    """
+
+    def __init__(self, pending_polls):
+        self.pending_polls = dict(pending_polls)
+        self.polls = {run_id: [] for run_id in pending_polls}
+        self.cancelled = []
+
+    def retrieve(self, thread_id, run_id):
+        self.polls[run_id].append(time.monotonic())
+        done = len(self.polls[run_id]) > self.pending_polls[run_id]
+        return SimpleNamespace(id=run_id, status="completed" if done else "queued")
+
+    def cancel(self, thread_id, run_id):
+        self.cancelled.append(run_id)
+
+
+def make_poller(runs, **options):
+    client = SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(runs=runs)))
+    return RunPoller(client, **options)
+
+
+def test_wait_returns_final_run():
+    runs = FakeRuns({"run_1": 2})
+    poller = make_poller(runs, initial_delay=0.001)
+
+    assert poller.wait("thread", "run_1").status == "completed"
+    assert len(runs.polls["run_1"]) == 3
+
+
+def test_backoff_grows_to_max_delay():
+    runs = FakeRuns({"run_1": 4})
+    poller = make_poller(
+        runs, initial_delay=0.02, multiplier=2, max_delay=0.05, jitter=0
+    )
+
+    poller.wait("thread", "run_1")
+
+    polls = runs.polls["run_1"]
+    gaps = [later - earlier for earlier, later in zip(polls, polls[1:])]
+    for gap, expected in zip(gaps, [0.02, 0.04, 0.05, 0.05]):
+        assert gap >= expected * 0.9
+    assert max(gaps) < 0.5
+
+
+def test_wait_many_polls_runs_independently():
+    runs = FakeRuns({"fast": 0, "slow": 3})
+    poller = make_poller(runs, initial_delay=0.001)
+
+    results = poller.wait_many([("thread", "fast"), ("thread", "slow")])
+
+    assert set(results) == {"fast", "slow"}
+    assert len(runs.polls["fast"]) == 1
+    assert len(runs.polls["slow"]) == 4
+
+
+def test_deadline_raises_with_finished_runs():
+    runs = FakeRuns({"fast": 0, "stuck": 10**6})
+    poller = make_poller(runs, initial_delay=0.01, max_delay=0.01)
+
+    started = time.monotonic()
+    with pytest.raises(RunWaitTimeout) as raised:
+        poller.wait_many(
+            [("thread", "fast"), ("thread", "stuck")], timeout=0.1, cancel_runs=True
+        )
+
+    assert time.monotonic() - started < 1
+    assert raised.value.pending_run_ids == ["stuck"]
+    assert set(raised.value.results) == {"fast"}
+    assert runs.cancelled == ["stuck"]
+
+
+def test_cancel_event_aborts_wait():
+    runs = FakeRuns({"stuck": 10**6})
+    poller = make_poller(runs, initial_delay=5)
+    cancel_event = threading.Event()
+    threading.Timer(0.05, cancel_event.set).start()
+
+    started = time.monotonic()
+    with pytest.raises(RunWaitCancelled) as raised:
+        poller.wait("thread", "stuck", cancel_event=cancel_event)
+
+    assert time.monotonic() - started < 1
+    assert raised.value.pending_run_ids == ["stuck"]
+    assert runs.cancelled == []
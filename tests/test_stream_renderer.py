@@ -0,0 +1,57 @@
+from assistant.stream_renderer import MarkdownBlocks
+
+
+def feed_all(blocks, chunks):
+    completed = []
+    for chunk in chunks:
+        completed.extend(blocks.feed(chunk))
+    return completed
+
+
+def test_splits_paragraphs_at_blank_lines():
+    blocks = MarkdownBlocks()
+
+    completed = feed_all(blocks, ["First para", "graph.\n", "\nSecond", " one"])
+
+    assert completed == ["First paragraph.\n\n"]
+    assert blocks.trailing == "Second one"
+    assert blocks.finish() == "Second one"
+
+
+def test_heading_is_a_block_of_its_own():
+    blocks = MarkdownBlocks()
+
+    completed = blocks.feed("# Title\nText under it\n")
+
+    assert completed == ["# Title\n"]
+    assert blocks.trailing == "Text under it\n"
+
+
+def test_fenced_code_keeps_blank_lines():
+    blocks = MarkdownBlocks()
+
+    completed = feed_all(
+        blocks,
+        ["Intro\n", "```python\n", "a = 1\n", "\n", "b = 2\n", "```", "\n", "After"],
+    )
+
+    assert completed == ["Intro\n", "```python\na = 1\n\nb = 2\n```\n"]
+    assert blocks.trailing == "After"
+
+
+def test_only_the_trailing_block_is_kept():
+    blocks = MarkdownBlocks()
+
+    for index in range(100):
+        blocks.feed(f"Paragraph {index}.\n\n")
+
+    assert blocks.text == ""
+
+
+def test_finish_resets():
+    blocks = MarkdownBlocks()
+    blocks.feed("```\nunterminated")
+
+    assert blocks.finish() == "```\nunterminated"
+    assert blocks.fence is None
+    assert blocks.finish() is None
@@ -0,0 +1,80 @@
+import json
+import threading
+
+from assistant.thread_store import ThreadHistoryStore
+
+LEGACY_RECORDS = [
+    {"assistant": assistant, "thread": thread, "thread_name": name, "user": user}
+    for assistant, thread, name, user in [
+        ("asst_1", "thread_1", "First", "ada"),
+        ("asst_1", "thread_2", "Second", "ada"),
+        ("asst_2", "thread_3", "Other", "bob"),
+    ]
+]
+
+
+def write_legacy(tmp_path, records=LEGACY_RECORDS):
+    legacy_path = tmp_path / "threads.json"
+    legacy_path.write_text(json.dumps(records))
+    return legacy_path
+
+
+def test_migrates_json_history(tmp_path):
+    legacy_path = write_legacy(tmp_path)
+
+    store = ThreadHistoryStore(str(tmp_path / "threads.db"), str(legacy_path))
+
+    assert store.all() == LEGACY_RECORDS
+    threads = [record["thread"] for record in store.list_threads("asst_1")]
+    assert threads == ["thread_1", "thread_2"]
+    assert store.find_by_name("asst_2", "Other")["thread"] == "thread_3"
+    assert not legacy_path.exists()
+    assert (tmp_path / "threads.json.migrated").exists()
+
+
+def test_migration_happens_once(tmp_path):
+    legacy_path = write_legacy(tmp_path)
+    db_path = str(tmp_path / "threads.db")
+    ThreadHistoryStore(db_path, str(legacy_path))
+
+    # A JSON file showing up again (e.g. an older version writing it) is
+    # merged without duplicating the threads already migrated.
+    write_legacy(tmp_path)
+    store = ThreadHistoryStore(db_path, str(legacy_path))
+
+    assert len(store.all()) == len(LEGACY_RECORDS)
+
+
+def test_rename_and_delete(tmp_path):
+    store = ThreadHistoryStore(str(tmp_path / "threads.db"), None)
+    for record in LEGACY_RECORDS:
+        store.add(record)
+
+    store.rename("thread_1", "Renamed")
+    store.delete("thread_2")
+
+    assert store.get("thread_1")["thread_name"] == "Renamed"
+    assert store.get("thread_2") is None
+
+
+def test_concurrent_writes(tmp_path):
+    store = ThreadHistoryStore(str(tmp_path / "threads.db"), None)
+
+    def add(worker):
+        for index in range(50):
+            store.add(
+                {
+                    "assistant": "asst_1",
+                    "thread": f"thread_{worker}_{index}",
+                    "thread_name": str(index),
+                    "user": "ada",
+                }
+            )
+
+    workers = [threading.Thread(target=add, args=(worker,)) for worker in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(store.all()) == 8 * 50
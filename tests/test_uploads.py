@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from assistant import uploads
+from assistant.uploads import UploadCheckpoint, _ProgressPart, upload_file
+
+PART_SIZE = 1024
+
+
+@pytest.fixture
+def small_parts(monkeypatch):
+    monkeypatch.setattr(uploads, "PART_SIZE", PART_SIZE)
+    monkeypatch.setattr(uploads, "MULTIPART_THRESHOLD", PART_SIZE)
+    monkeypatch.setattr(uploads, "UPLOAD_WORKERS", 1)
+
+
+@pytest.fixture
+def large_file(tmp_path):
+    path = tmp_path / "large.bin"
+    path.write_bytes(os.urandom(PART_SIZE * 4 + 100))
+    return str(path)
+
+
+class FailingPartClient:
+    """
+    Forwards to a client but fails the upload of one part.
+    """
+
+    def __init__(self, client, failing_part):
+        self.client = client
+        self.failing_part = failing_part
+
+    def post(self, path, **options):
+        if path.endswith("/parts"):
+            name = options["files"][0][1][0]
+            if name == f"part-{self.failing_part}":
+                raise ConnectionError("network down")
+        return self.client.post(path, **options)
+
+
+def test_small_files_are_uploaded_in_one_request(client, mock_server, tmp_path):
+    path = tmp_path / "small.txt"
+    path.write_text("hello")
+
+    file = upload_file(client, str(path))
+
+    assert file.filename == "small.txt"
+    assert mock_server.reset_calls() == {"POST /v1/files": 1}
+
+
+def test_multipart_upload(client, mock_server, large_file, small_parts):
+    file = upload_file(client, large_file)
+
+    assert mock_server.state.file_contents[file.id] == open(large_file, "rb").read()
+    assert mock_server.reset_calls()["POST /v1/uploads/{id}/parts"] == 5
+    assert not os.path.exists(UploadCheckpoint(large_file).path)
+
+
+def test_interrupted_upload_resumes(client, mock_server, large_file, small_parts):
+    with pytest.raises(ConnectionError):
+        upload_file(FailingPartClient(client, failing_part=2), large_file)
+
+    checkpoint = UploadCheckpoint(large_file)
+    done = checkpoint.completed_parts()
+    assert {0, 1} <= set(done) and 2 not in done
+    mock_server.reset_calls()
+
+    file = upload_file(client, large_file)
+
+    calls = mock_server.reset_calls()
+    assert "POST /v1/uploads" not in calls
+    assert calls["POST /v1/uploads/{id}/parts"] == 5 - len(done)
+    assert mock_server.state.file_contents[file.id] == open(large_file, "rb").read()
+    assert not os.path.exists(checkpoint.path)
+
+
+def test_expired_upload_starts_over(client, mock_server, large_file, small_parts):
+    with pytest.raises(ConnectionError):
+        upload_file(FailingPartClient(client, failing_part=0), large_file)
+    mock_server.state.uploads.clear()
+    mock_server.reset_calls()
+
+    file = upload_file(client, large_file)
+
+    calls = mock_server.reset_calls()
+    assert calls["POST /v1/uploads"] == 1
+    assert mock_server.state.file_contents[file.id] == open(large_file, "rb").read()
+
+
+def test_part_streams_its_byte_range(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(bytes(range(256)) * 4)
+    progress = []
+
+    with _ProgressPart(str(path), 100, 50, progress.append) as part:
+        assert part.seek(0, os.SEEK_END) == 50
+        part.seek(0)
+        chunks = [part.read(20), part.read(20), part.read(20), part.read()]
+        part.seek(0)
+        again = part.read()
+
+    assert b"".join(chunks) == again == path.read_bytes()[100:150]
+    assert sum(progress) == 50